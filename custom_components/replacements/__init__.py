@@ -2,48 +2,153 @@
 import logging
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import discovery
 from homeassistant.helpers.entity_component import EntityComponent
 from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, PLATFORM, STARTUP_MESSAGE
+from .alerts import LowStockAlerts
+from .clock import LocalToday
+from .const import (
+    CONF_NOTIFY,
+    CONF_STATISTICS,
+    CONF_WATCHDOG,
+    CONF_WATCHDOG_THRESHOLD,
+    DATA_ALERTS,
+    DATA_GROUPS,
+    DATA_INDEX,
+    DATA_POOLS,
+    DATA_PROFILES,
+    DATA_TODAY,
+    DATA_WATCHDOG,
+    DEFAULT_NOTIFY,
+    DEFAULT_STATISTICS,
+    DEFAULT_WATCHDOG,
+    DEFAULT_WATCHDOG_THRESHOLD,
+    DOMAIN,
+    PLATFORMS,
+    STARTUP_MESSAGE,
+)
+from .digest import ReplacementsDigest, parse_targets
+from .groups import ReplacementGroups
+from .index import ReplacementIndex
+from .migration import async_import_replacements, async_migrate
+from .pools import InventoryPools
+from .profiles import ReplacementProfiles
+from .services import async_register_services
+from .statistics import ReplacementsStatistics
+from .storage import ReplacementsStore
+from .watchdog import LoopWatchdog, watched
+from .websocket_api import async_register_websocket_commands
 
 _LOGGER = logging.getLogger(__name__)
 
 
-# async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-#     """Handle migration of a previous version config entry."""
-#     _LOGGER.debug("Migrating from version %s", entry.version)
-#     data = {**entry.data}
-#     if entry.version == 1:
-#         data.pop("login_response", None)
-#         await hass.async_add_executor_job(_reauth_flow_wrapper, hass, data)
-#         return False
-#     if entry.version == 2:
-#         await hass.async_add_executor_job(_reauth_flow_wrapper, hass, data)
-#         return False
-#     return True
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Handle migration of a previous version config entry."""
+    return await async_migrate(hass, entry)
 
 
+@watched
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up this integration using UI."""
     # Get the integration reference inside hass
-    if hass.data.get(DOMAIN) is None:
-        hass.data.setdefault(DOMAIN, {})
+    hass.data.setdefault(DOMAIN, {})
+    if DATA_INDEX not in hass.data[DOMAIN]:
         _LOGGER.info(STARTUP_MESSAGE)
 
+        # Share a single cached local date between all entries, unless
+        #  another clock was injected before the first setup
+        if DATA_TODAY not in hass.data[DOMAIN]:
+            hass.data[DOMAIN][DATA_TODAY] = LocalToday(hass)
+
+        # Summaries of all replacements, served through the WebSocket API
+        hass.data[DOMAIN][DATA_INDEX] = ReplacementIndex(hass)
+        hass.data[DOMAIN][DATA_GROUPS] = ReplacementGroups(hass)
+        async_register_websocket_commands(hass)
+        async_register_services(hass)
+
+        # Inventory pools and low stock alerts of every entry
+        hass.data[DOMAIN][DATA_POOLS] = {}
+        hass.data[DOMAIN][DATA_ALERTS] = {}
+
+        # Profiles that replacements of any entry can reference
+        profiles = ReplacementProfiles(hass)
+        await profiles.async_load()
+        hass.data[DOMAIN][DATA_PROFILES] = profiles
+
+    # Load the replacement definitions of the entry
+    store = ReplacementsStore(hass, entry.entry_id)
+    await store.async_load()
+
+    # Move the replacements created by the config flow into our own storage,
+    #  so changes do not rewrite the config entries of every integration
+    if DOMAIN in entry.data:
+        data = await async_import_replacements(hass, entry, store)
+        hass.config_entries.async_update_entry(entry, data=data)
+
+    # Load the stock of the inventory pools of the entry
+    pools = InventoryPools(hass, entry.entry_id)
+    await pools.async_load()
+
     # Store the entry under our domain to allow multiple entries
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry.data
+    hass.data[DOMAIN][entry.entry_id] = store
+    hass.data[DOMAIN][DATA_POOLS][entry.entry_id] = pools
+    hass.data[DOMAIN][DATA_ALERTS][entry.entry_id] = LowStockAlerts()
+
+    # Feed the long-term statistics, if enabled in the options
+    if entry.options.get(CONF_STATISTICS, DEFAULT_STATISTICS):
+        statistics = ReplacementsStatistics(hass, entry.entry_id, store)
+        statistics.async_start()
+        entry.async_on_unload(statistics.async_stop)
+
+    # Notify the replacements needing attention every day, if enabled
+    if targets := parse_targets(entry.options.get(CONF_NOTIFY, DEFAULT_NOTIFY)):
+        digest = ReplacementsDigest(hass, store, targets)
+        digest.async_start()
+        entry.async_on_unload(digest.async_stop)
 
-    # Forward the setup to the platform
-    hass.async_add_job(hass.config_entries.async_forward_entry_setup(entry, PLATFORM))
+    # Watch the calls that block the event loop, if enabled in the options
+    if entry.options.get(CONF_WATCHDOG, DEFAULT_WATCHDOG):
+        async_start_watchdog(hass, entry)
+
+    # Forward the setup to the platforms
+    for platform in PLATFORMS:
+        hass.async_add_job(
+            hass.config_entries.async_forward_entry_setup(entry, platform)
+        )
 
     entry.async_on_unload(entry.add_update_listener(config_entry_update_listener))
     return True
 
 
+@callback
+def async_start_watchdog(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Use the watchdog of the integration for an entry, until it is unloaded.
+
+    The watchdog is started by the first entry enabling it, and stopped when
+    the last one is unloaded.
+    """
+    threshold = entry.options.get(CONF_WATCHDOG_THRESHOLD, DEFAULT_WATCHDOG_THRESHOLD)
+    if (watchdog := hass.data[DOMAIN].get(DATA_WATCHDOG)) is None:
+        watchdog = LoopWatchdog(hass)
+        hass.data[DOMAIN][DATA_WATCHDOG] = watchdog
+    watchdog.async_add_entry(entry.entry_id, threshold / 1000)
+    watchdog.async_start()
+
+    @callback
+    def async_stop_watchdog() -> None:
+        """Stop the watchdog, unless other entries still use it."""
+        if watchdog.async_remove_entry(entry.entry_id):
+            return
+        watchdog.async_stop()
+        if hass.data[DOMAIN].get(DATA_WATCHDOG) is watchdog:
+            hass.data[DOMAIN].pop(DATA_WATCHDOG)
+
+    entry.async_on_unload(async_stop_watchdog)
+
+
 async def config_entry_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Update listener, called when the config entry options are changed."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -51,7 +156,19 @@ async def config_entry_update_listener(hass: HomeAssistant, entry: ConfigEntry)
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORM):
-        hass.data[DOMAIN].pop(entry.entry_id)
+    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        store = hass.data[DOMAIN].pop(entry.entry_id)
+        pools = hass.data[DOMAIN][DATA_POOLS].pop(entry.entry_id)
+        hass.data[DOMAIN][DATA_ALERTS].pop(entry.entry_id)
+
+        # Write pending changes before the entry is set up again
+        await store.async_flush()
+        await pools.async_flush()
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored replacements and pools of a config entry."""
+    await ReplacementsStore(hass, entry.entry_id).async_remove()
+    await InventoryPools(hass, entry.entry_id).async_remove()
@@ -0,0 +1,63 @@
+"""Intervals learned from the actual replacements."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from math import sqrt
+from typing import Any
+
+from .const import ADAPTIVE_EWMA_ALPHA
+
+
+@dataclass
+class IntervalStatistics:
+    """Running statistics of the days between replacements.
+
+    The mean and variance are updated with Welford's algorithm, and the
+    exponentially weighted moving average follows recent changes, so no
+    history of the replacements needs to be kept.
+    """
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    ewma: float = 0.0
+
+    def add(self, days: int) -> None:
+        """Add the days between two replacements."""
+        self.count += 1
+        delta = days - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (days - self.mean)
+
+        if self.count == 1:
+            self.ewma = float(days)
+        else:
+            self.ewma += ADAPTIVE_EWMA_ALPHA * (days - self.ewma)
+
+    @property
+    def variance(self) -> float:
+        """Return the sample variance, or 0 with less than two intervals."""
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (self.count - 1)
+
+    @property
+    def stddev(self) -> float:
+        """Return the sample standard deviation."""
+        return sqrt(self.variance)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation of the statistics."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, restored: dict[str, Any] | None) -> IntervalStatistics:
+        """Initialize the statistics from a dict, empty if not available."""
+        if not restored:
+            return cls()
+        return cls(
+            int(restored["count"]),
+            float(restored["mean"]),
+            float(restored["m2"]),
+            float(restored["ewma"]),
+        )
@@ -0,0 +1,40 @@
+"""Low stock alerts of the Replacements integration."""
+from __future__ import annotations
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+
+class LowStockAlerts:
+    """Low stock flags of the replacements of a config entry.
+
+    The replacements report their stock after every change, but the flag of
+    a replacement only changes, and its listeners are only notified, when
+    the stock crosses its reorder level. The binary sensors are then never
+    polled, nor written on any other change.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the alerts of a config entry."""
+        self.low: dict[str, bool] = {}
+        self._listeners: dict[str, list[CALLBACK_TYPE]] = {}
+
+    @callback
+    def async_update(self, unique_id: str, stock: int, reorder_level: int) -> None:
+        """Update the flag of a replacement, notifying it if it changed."""
+        if self.low.get(unique_id) == (low := stock <= reorder_level):
+            return
+
+        self.low[unique_id] = low
+        for listener in list(self._listeners.get(unique_id, [])):
+            listener()
+
+    @callback
+    def async_listen(self, unique_id: str, listener: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for changes of a flag, returning a function to stop listening."""
+        self._listeners.setdefault(unique_id, []).append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners[unique_id].remove(listener)
+
+        return remove_listener
@@ -0,0 +1,124 @@
+"""Low stock binary sensors of the Replacements integration."""
+from __future__ import annotations
+
+from homeassistant import config_entries
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.const import CONF_NAME, CONF_UNIQUE_ID
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .alerts import LowStockAlerts
+from .const import CONF_POOL, CONF_REORDER_LEVEL, DATA_ALERTS, DATA_POOLS, DOMAIN
+from .pools import InventoryPools
+
+# Attributes
+ATTR_POOL = "pool"
+ATTR_REORDER_LEVEL = "reorder_level"
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: config_entries.ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the low stock binary sensors of a config entry."""
+    store = hass.data[DOMAIN][config_entry.entry_id]
+    pools = hass.data[DOMAIN][DATA_POOLS][config_entry.entry_id]
+    alerts = hass.data[DOMAIN][DATA_ALERTS][config_entry.entry_id]
+
+    # One sensor for each replacement with a reorder level, or for its pool,
+    #  at the highest level of the replacements sharing the pool
+    entities: list[BinarySensorEntity] = []
+    pool_levels: dict[str, int] = {}
+    for replacement in store.items.values():
+        if (level := replacement.get(CONF_REORDER_LEVEL)) is None:
+            continue
+        if pool := replacement.get(CONF_POOL):
+            pool_levels[pool] = max(level, pool_levels.get(pool, level))
+        else:
+            entities.append(ReplacementLowStock(alerts, replacement))
+
+    entities.extend(
+        PoolLowStock(config_entry.entry_id, pools, pool, level)
+        for pool, level in sorted(pool_levels.items())
+    )
+    async_add_entities(entities)
+
+
+class ReplacementLowStock(BinarySensorEntity):
+    """Low stock alert of a replacement.
+
+    Only written when the replacement reports its stock crossed the reorder
+    level, e.g., after a replace action or renewing the stock.
+    """
+
+    _attr_should_poll = False
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+
+    def __init__(self, alerts: LowStockAlerts, replacement: dict) -> None:
+        """Initialize the binary sensor."""
+        self._alerts = alerts
+        self._replacement_id = replacement[CONF_UNIQUE_ID]
+        self._attr_name = f"{replacement[CONF_NAME]} low stock"
+        self._attr_unique_id = f"{self._replacement_id}_low_stock"
+        self._attr_extra_state_attributes = {
+            ATTR_REORDER_LEVEL: replacement[CONF_REORDER_LEVEL]
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Run when entity about to be added."""
+        self.async_on_remove(
+            self._alerts.async_listen(self._replacement_id, self.async_write_ha_state)
+        )
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if the stock is at or below the reorder level."""
+        return self._alerts.low.get(self._replacement_id)
+
+
+class PoolLowStock(BinarySensorEntity):
+    """Low stock alert of an inventory pool.
+
+    The level of the pool is checked on each of its changes, but the state
+    is only written when it crosses the reorder level.
+    """
+
+    _attr_should_poll = False
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+
+    def __init__(
+        self, entry_id: str, pools: InventoryPools, pool: str, reorder_level: int
+    ) -> None:
+        """Initialize the binary sensor."""
+        self._pools = pools
+        self._pool = pool
+        self._reorder_level = reorder_level
+        self._attr_name = f"{pool} pool low stock"
+        self._attr_unique_id = f"{entry_id}_pool_{pool}_low_stock"
+        self._attr_extra_state_attributes = {
+            ATTR_POOL: pool,
+            ATTR_REORDER_LEVEL: reorder_level,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Run when entity about to be added."""
+        self._attr_is_on = self._low
+        self.async_on_remove(
+            self._pools.async_listen(self._pool, self._async_pool_changed)
+        )
+
+    @property
+    def _low(self) -> bool:
+        """Return True if the stock of the pool is at or below the level."""
+        return self._pools.levels.get(self._pool, 0) <= self._reorder_level
+
+    @callback
+    def _async_pool_changed(self) -> None:
+        """Write the state only when the stock crosses the reorder level."""
+        if (low := self._low) != self._attr_is_on:
+            self._attr_is_on = low
+            self.async_write_ha_state()
@@ -0,0 +1,71 @@
+"""Date keeping for the Replacements integration."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+
+from homeassistant.const import EVENT_CORE_CONFIG_UPDATE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+import homeassistant.util.dt as dt_util
+
+
+class LocalToday:
+    """Today's date in the time zone configured in Home Assistant.
+
+    The date is calculated once and kept until the next local midnight, or
+    until the core configuration (and possibly the time zone) changes, so
+    the replacements do not query the clock on every calculation.
+
+    Another clock returning the current UTC time can be injected, e.g., to
+    run months of simulated days in seconds. No midnight timer is scheduled
+    for it, so moving it forward must be followed by a call to invalidate.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, utcnow: Callable[[], datetime] | None = None
+    ) -> None:
+        """Initialize the cached date and listen for time zone changes."""
+        self._hass = hass
+        self._utcnow = utcnow
+        self._today: date | None = None
+        self._unsub_midnight: CALLBACK_TYPE | None = None
+
+        hass.bus.async_listen(EVENT_CORE_CONFIG_UPDATE, self._async_config_updated)
+
+    @property
+    def today(self) -> date:
+        """Return today's date in the local time zone."""
+        if self._today is None and self._utcnow is not None:
+            # The injected clock is invalidated by its owner
+            self._today = dt_util.as_local(self._utcnow()).date()
+        elif self._today is None:
+            self._today = dt_util.as_local(dt_util.utcnow()).date()
+
+            # Forget the date once the next local day starts
+            self._unsub_midnight = async_track_point_in_utc_time(
+                self._hass,
+                self._async_midnight,
+                dt_util.start_of_local_day(self._today + timedelta(days=1)),
+            )
+
+        return self._today
+
+    @callback
+    def invalidate(self) -> None:
+        """Forget the cached date, it will be calculated again when needed."""
+        self._today = None
+        if self._unsub_midnight is not None:
+            self._unsub_midnight()
+            self._unsub_midnight = None
+
+    @callback
+    def _async_midnight(self, _now: datetime) -> None:
+        """Handle the start of a new local day."""
+        self._unsub_midnight = None
+        self.invalidate()
+
+    @callback
+    def _async_config_updated(self, _event: Event) -> None:
+        """Handle a core configuration update, the time zone might have changed."""
+        self.invalidate()
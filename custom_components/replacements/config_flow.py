@@ -1,13 +1,12 @@
 """ Config flow """
 from __future__ import annotations
 
-from copy import deepcopy
 from turtle import update
 from typing import Any
 
 from homeassistant import config_entries
-from homeassistant.const import CONF_NAME, CONF_UNIQUE_ID
-from homeassistant.core import callback
+from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.entity_registry import (
     async_entries_for_config_entry,
@@ -17,27 +16,63 @@ import voluptuous as vol
 
 from .const import (
     COMPONENT_NAME,
+    CONF_ADAPTIVE,
     CONF_ADD_ANOTHER,
     CONF_DAYS_INTERVAL,
+    CONF_HOLIDAYS,
     CONF_ICON_EXPIRED,
     CONF_ICON_NORMAL,
     CONF_ICON_SOON,
     CONF_ICON_TODAY,
     CONF_INTERVAL_EXCLUSION_ERROR,
+    CONF_MONTHS_INTERVAL,
+    CONF_NOTIFY,
+    CONF_PARENT,
+    CONF_POOL,
     CONF_PREFIX,
+    CONF_PROFILE,
+    CONF_REORDER_LEVEL,
+    CONF_RRULE,
+    CONF_SKIP_WEEKENDS,
     CONF_SOON,
+    CONF_STATISTICS,
+    CONF_TIMESTAMP,
+    CONF_TODO,
     CONF_UNIT_OF_MEASUREMENT,
+    CONF_USAGE_ENTITY,
+    CONF_USAGE_LIMIT,
+    CONF_USAGE_MODE,
+    CONF_WATCHDOG,
+    CONF_WATCHDOG_THRESHOLD,
     CONF_WEEKS_INTERVAL,
+    CONF_YEARS_INTERVAL,
+    CONFIG_ENTRY_VERSION,
+    DATA_PROFILES,
+    DEFAULT_ADAPTIVE,
+    DEFAULT_HOLIDAYS,
     DEFAULT_ICON_EXPIRED,
     DEFAULT_ICON_NORMAL,
     DEFAULT_ICON_SOON,
     DEFAULT_ICON_TODAY,
+    DEFAULT_NOTIFY,
     DEFAULT_PREFIX,
+    DEFAULT_SKIP_WEEKENDS,
     DEFAULT_SOON,
+    DEFAULT_STATISTICS,
+    DEFAULT_TIMESTAMP,
+    DEFAULT_TODO,
     DEFAULT_UNIT_OF_MEASUREMENT,
+    DEFAULT_USAGE_MODE,
+    DEFAULT_WATCHDOG,
+    DEFAULT_WATCHDOG_THRESHOLD,
     DOMAIN,
     GROUP_INTERVAL,
+    INTERVAL_MODES,
+    USAGE_MODES,
 )
+from .recurrence import RRuleRecurrence
+from .watchdog import watched
+from .workdays import parse_holidays
 
 ENTRY_SCHEMA = vol.Schema(
     {
@@ -51,6 +86,15 @@ ENTRY_SCHEMA = vol.Schema(
         vol.Exclusive(
             CONF_WEEKS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
         ): cv.positive_int,
+        vol.Exclusive(
+            CONF_MONTHS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+        ): cv.positive_int,
+        vol.Exclusive(
+            CONF_YEARS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+        ): cv.positive_int,
+        vol.Exclusive(
+            CONF_RRULE, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+        ): cv.string,
         vol.Optional(CONF_SOON, default=DEFAULT_SOON): cv.positive_int,
         vol.Optional(
             CONF_UNIT_OF_MEASUREMENT, default=DEFAULT_UNIT_OF_MEASUREMENT
@@ -59,6 +103,15 @@ ENTRY_SCHEMA = vol.Schema(
         vol.Optional(CONF_ICON_SOON, default=DEFAULT_ICON_SOON): cv.string,
         vol.Optional(CONF_ICON_TODAY, default=DEFAULT_ICON_TODAY): cv.string,
         vol.Optional(CONF_ICON_EXPIRED, default=DEFAULT_ICON_EXPIRED): cv.string,
+        vol.Optional(CONF_TIMESTAMP, default=DEFAULT_TIMESTAMP): cv.boolean,
+        vol.Optional(CONF_POOL): cv.string,
+        vol.Optional(CONF_PROFILE): cv.slug,
+        vol.Optional(CONF_USAGE_ENTITY): cv.entity_id,
+        vol.Optional(CONF_USAGE_LIMIT): vol.Coerce(float),
+        vol.Optional(CONF_USAGE_MODE, default=DEFAULT_USAGE_MODE): vol.In(USAGE_MODES),
+        vol.Optional(CONF_ADAPTIVE, default=DEFAULT_ADAPTIVE): cv.boolean,
+        vol.Optional(CONF_PARENT): cv.string,
+        vol.Optional(CONF_REORDER_LEVEL): cv.positive_int,
         vol.Optional(CONF_ADD_ANOTHER): cv.boolean,
     }
 )
@@ -75,6 +128,15 @@ OPTIONS_SCHEMA = vol.Schema(
         vol.Exclusive(
             CONF_WEEKS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
         ): cv.positive_int,
+        vol.Exclusive(
+            CONF_MONTHS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+        ): cv.positive_int,
+        vol.Exclusive(
+            CONF_YEARS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+        ): cv.positive_int,
+        vol.Exclusive(
+            CONF_RRULE, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+        ): cv.string,
         vol.Optional(CONF_SOON, default=DEFAULT_SOON): cv.positive_int,
         vol.Optional(
             CONF_UNIT_OF_MEASUREMENT, default=DEFAULT_UNIT_OF_MEASUREMENT
@@ -83,10 +145,30 @@ OPTIONS_SCHEMA = vol.Schema(
         vol.Optional(CONF_ICON_SOON, default=DEFAULT_ICON_SOON): cv.string,
         vol.Optional(CONF_ICON_TODAY, default=DEFAULT_ICON_TODAY): cv.string,
         vol.Optional(CONF_ICON_EXPIRED, default=DEFAULT_ICON_EXPIRED): cv.string,
+        vol.Optional(CONF_TIMESTAMP, default=DEFAULT_TIMESTAMP): cv.boolean,
+        vol.Optional(CONF_POOL): cv.string,
+        vol.Optional(CONF_PROFILE): cv.slug,
+        vol.Optional(CONF_USAGE_ENTITY): cv.entity_id,
+        vol.Optional(CONF_USAGE_LIMIT): vol.Coerce(float),
+        vol.Optional(CONF_USAGE_MODE, default=DEFAULT_USAGE_MODE): vol.In(USAGE_MODES),
+        vol.Optional(CONF_ADAPTIVE, default=DEFAULT_ADAPTIVE): cv.boolean,
+        vol.Optional(CONF_PARENT): cv.string,
+        vol.Optional(CONF_REORDER_LEVEL): cv.positive_int,
         vol.Optional(CONF_ADD_ANOTHER): cv.boolean,
     }
 )
 
+# Options of the whole entry, with their defaults
+ENTRY_OPTIONS = {
+    CONF_STATISTICS: DEFAULT_STATISTICS,
+    CONF_NOTIFY: DEFAULT_NOTIFY,
+    CONF_TODO: DEFAULT_TODO,
+    CONF_SKIP_WEEKENDS: DEFAULT_SKIP_WEEKENDS,
+    CONF_HOLIDAYS: DEFAULT_HOLIDAYS,
+    CONF_WATCHDOG: DEFAULT_WATCHDOG,
+    CONF_WATCHDOG_THRESHOLD: DEFAULT_WATCHDOG_THRESHOLD,
+}
+
 
 def validate_soon(user_input=None):
     """Validate the 'interval' and 'soon' configurations.
@@ -95,20 +177,78 @@ def validate_soon(user_input=None):
 
     Raises ValueError if 'soon' is lower than 'interval'
     """
+    # Recurrence rules have no fixed interval to compare against, and
+    #  profiles were validated when they were set
+    if CONF_RRULE in user_input or CONF_PROFILE in user_input:
+        return
+
     # Check if in days or weeks mode
     if CONF_DAYS_INTERVAL in user_input:
         if user_input[CONF_SOON] > user_input[CONF_DAYS_INTERVAL]:
             raise ValueError
 
+    # Months and years have a variable length, so compare against
+    #  the shortest possible interval in days
+    elif CONF_MONTHS_INTERVAL in user_input:
+        if user_input[CONF_SOON] > user_input[CONF_MONTHS_INTERVAL] * 28:
+            raise ValueError
+
+    elif CONF_YEARS_INTERVAL in user_input:
+        if user_input[CONF_SOON] > user_input[CONF_YEARS_INTERVAL] * 365:
+            raise ValueError
+
     # We are in weeks mode
     else:
         if user_input[CONF_SOON] > user_input[CONF_WEEKS_INTERVAL]:
             raise ValueError
 
 
+def validate_rrule(user_input=None):
+    """Validate the 'rrule' configuration, if present.
+
+    Raises ValueError if the recurrence rule cannot be parsed
+    """
+    if CONF_RRULE in user_input:
+        RRuleRecurrence(user_input[CONF_RRULE])
+
+
+def validate_usage(user_input=None):
+    """Validate the 'usage_entity' and 'usage_limit' configurations.
+
+    Raises ValueError if only one of them is set, or the limit is not positive
+    """
+    if (CONF_USAGE_ENTITY in user_input) != (CONF_USAGE_LIMIT in user_input):
+        raise ValueError
+
+    if user_input.get(CONF_USAGE_LIMIT, 1) <= 0:
+        raise ValueError
+
+
+def validate_parent(names, user_input=None):
+    """Validate the 'parent' configuration, if present.
+
+    Raises ValueError if the parent is not another replacement of the entry
+    """
+    if CONF_PARENT in user_input and user_input[CONF_PARENT] not in names:
+        raise ValueError
+
+
+def validate_profile(hass: HomeAssistant, user_input=None):
+    """Validate the 'profile' configuration, if present.
+
+    Raises ValueError if the profile does not exist
+    """
+    if CONF_PROFILE in user_input:
+        profiles = hass.data.get(DOMAIN, {}).get(DATA_PROFILES)
+        if profiles is None or user_input[CONF_PROFILE] not in profiles.profiles:
+            raise ValueError
+
+
 class ReplacementsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Config flow for Replacements."""
 
+    VERSION = CONFIG_ENTRY_VERSION
+
     data: dict[str, Any] | None
 
     @staticmethod
@@ -117,6 +257,7 @@ class ReplacementsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Get the options flow for this handler."""
         return ReplacementsOptionsFlow(config_entry)
 
+    @watched
     async def async_step_user(self, user_input=None):
         """Create config entry. Show the setup form to the user."""
         errors = {}
@@ -134,6 +275,33 @@ class ReplacementsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             if not errors:
                 # Validate some parameters
+                try:
+                    validate_rrule(user_input)
+                except ValueError:
+                    errors["base"] = "invalid_rrule"
+
+            if not errors:
+                try:
+                    validate_profile(self.hass, user_input)
+                except ValueError:
+                    errors["base"] = "unknown_profile"
+
+            if not errors:
+                try:
+                    validate_parent(
+                        [replacement[CONF_NAME] for replacement in self.data[DOMAIN]],
+                        user_input,
+                    )
+                except ValueError:
+                    errors["base"] = "unknown_parent"
+
+            if not errors:
+                try:
+                    validate_usage(user_input)
+                except ValueError:
+                    errors["base"] = "invalid_usage"
+
+            if not errors:
                 try:
                     validate_soon(user_input)
                 except ValueError:
@@ -158,73 +326,113 @@ class ReplacementsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 class ReplacementsOptionsFlow(config_entries.OptionsFlow):
     """Replacements config flow options handler."""
 
-    data: dict[str, Any] | None
-
     def __init__(self, config_entry):
         """Initialize options flow."""
         self.config_entry = config_entry
         self.options = dict(config_entry.options)
 
+    @watched
     async def async_step_init(self, user_input: dict[str, Any] | None = None):
         """Manage the options."""
         errors: dict[str, str] = {}
 
         # Grab all configured replacements from the entity registry so we can populate the
         # multi-select dropdown that will allow a user to remove or edit the repalcement.
+        # The pools, to do list and alerts of the entry are not replacements
         entity_registry = await async_get_registry(self.hass)
-        entries = async_entries_for_config_entry(
-            entity_registry, self.config_entry.entry_id
-        )
+        store = self.hass.data[DOMAIN][self.config_entry.entry_id]
+        entries = [
+            entry
+            for entry in async_entries_for_config_entry(
+                entity_registry, self.config_entry.entry_id
+            )
+            if entry.unique_id in store
+        ]
 
         # Default value for our multi-select.
         all_entities = {e.entity_id: e.original_name for e in entries}
         entity_map = {e.entity_id: e for e in entries}
 
         if user_input is not None:
-            updated_entities = deepcopy(self.config_entry.data[DOMAIN])
+            # Validate the new replacement, if one was configured
+            add_replacement = any(
+                user_input.get(mode) for mode in (*INTERVAL_MODES, CONF_PROFILE)
+            )
+            if add_replacement:
+                try:
+                    validate_rrule(user_input)
+                except ValueError:
+                    errors["base"] = "invalid_rrule"
 
-            if not hasattr(self, "data"):
-                self.data = {}
-                self.data[DOMAIN] = []
+                if not errors:
+                    try:
+                        validate_profile(self.hass, user_input)
+                    except ValueError:
+                        errors["base"] = "unknown_profile"
 
-            # Remove any unchecked replacements.
-            removed_entities = [
-                entity_id
-                for entity_id in entity_map.keys()
-                if entity_id not in user_input[DOMAIN]
-            ]
+                if not errors:
+                    try:
+                        validate_parent(
+                            [item[CONF_NAME] for item in store.items.values()],
+                            user_input,
+                        )
+                    except ValueError:
+                        errors["base"] = "unknown_parent"
 
-            for entity_id in removed_entities:
-                # Unregister from HA
-                entity_registry.async_remove(entity_id)
+                if not errors:
+                    try:
+                        validate_usage(user_input)
+                    except ValueError:
+                        errors["base"] = "invalid_usage"
 
-                # Remove from our configured replacements
-                entry = entity_map[entity_id]
-                entry_id = entry.unique_id
+                if not errors:
+                    try:
+                        validate_soon(user_input)
+                    except ValueError:
+                        errors["base"] = "invalid_soon"
 
-                updated_entities = [
-                    e for e in updated_entities if e[CONF_UNIQUE_ID] != entry_id
+            if not errors:
+                try:
+                    parse_holidays(user_input.get(CONF_HOLIDAYS, DEFAULT_HOLIDAYS))
+                except ValueError:
+                    errors["base"] = "invalid_holidays"
+
+            if not errors:
+                # Save the options of the whole entry
+                for option, default in ENTRY_OPTIONS.items():
+                    self.options[option] = user_input.pop(
+                        option, self.options.get(option, default)
+                    )
+
+                # Remove any unchecked replacements.
+                removed_entities = [
+                    entity_id
+                    for entity_id in entity_map.keys()
+                    if entity_id not in user_input[DOMAIN]
                 ]
 
-            if user_input.get(CONF_DAYS_INTERVAL) or user_input.get(
-                CONF_WEEKS_INTERVAL
-            ):
+                for entity_id in removed_entities:
+                    # Unregister from HA
+                    entity_registry.async_remove(entity_id)
 
-                # Validate some parameters
-                try:
-                    validate_soon(user_input)
-                except ValueError:
-                    errors["base"] = "invalid_soon"
+                    # Remove from our stored replacements
+                    store.async_remove_item(entity_map[entity_id].unique_id)
 
-                if not errors:
-                    # Append the entry into the dictionary
+                if add_replacement:
+                    # Add the new replacement to our stored replacements
                     user_input.pop(DOMAIN)
-                    self.data[DOMAIN].append(user_input)
-
-            # User is done adding replacements, create the config entry
-            if not errors:
-                self.data[DOMAIN] = self.data[DOMAIN] + updated_entities
-                return self.async_create_entry(title=COMPONENT_NAME, data=self.data)
+                    store.async_add(user_input)
+
+                # Only the changed replacements are written to storage, reload
+                #  the entry so the entities match them. Changed options
+                #  already reload it through the update listener
+                if self.options == self.config_entry.options:
+                    self.hass.async_create_task(
+                        self.hass.config_entries.async_reload(
+                            self.config_entry.entry_id
+                        )
+                    )
+                return self.async_create_entry(title=COMPONENT_NAME, data=self.options)
 
         # Create a schema with the list of all configured entities
         remove_schema = vol.Schema(
@@ -232,6 +440,36 @@ class ReplacementsOptionsFlow(config_entries.OptionsFlow):
                 vol.Optional(
                     DOMAIN, default=list(all_entities.keys())
                 ): cv.multi_select(all_entities),
+                vol.Optional(
+                    CONF_STATISTICS,
+                    default=self.options.get(CONF_STATISTICS, DEFAULT_STATISTICS),
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_NOTIFY,
+                    default=self.options.get(CONF_NOTIFY, DEFAULT_NOTIFY),
+                ): cv.string,
+                vol.Optional(
+                    CONF_TODO,
+                    default=self.options.get(CONF_TODO, DEFAULT_TODO),
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_SKIP_WEEKENDS,
+                    default=self.options.get(CONF_SKIP_WEEKENDS, DEFAULT_SKIP_WEEKENDS),
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_HOLIDAYS,
+                    default=self.options.get(CONF_HOLIDAYS, DEFAULT_HOLIDAYS),
+                ): cv.string,
+                vol.Optional(
+                    CONF_WATCHDOG,
+                    default=self.options.get(CONF_WATCHDOG, DEFAULT_WATCHDOG),
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_WATCHDOG_THRESHOLD,
+                    default=self.options.get(
+                        CONF_WATCHDOG_THRESHOLD, DEFAULT_WATCHDOG_THRESHOLD
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
             },
             extra=vol.ALLOW_EXTRA,
         )
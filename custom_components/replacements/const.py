@@ -7,20 +7,67 @@ import voluptuous as vol
 COMPONENT_NAME = "Replacements"
 DOMAIN = "replacements"
 PLATFORM = "sensor"
+BINARY_SENSOR_PLATFORM = "binary_sensor"
+PLATFORMS = [PLATFORM, BINARY_SENSOR_PLATFORM]
 VERSION = "1.0.0"
 
 DOMAIN_DATA = f"{DOMAIN}_data"
+DATA_TODAY = "today"
+DATA_INDEX = "index"
+DATA_POOLS = "pools"
+DATA_PROFILES = "profiles"
+DATA_WATCHDOG = "watchdog"
+DATA_GROUPS = "groups"
+DATA_ALERTS = "alerts"
+
+# Events
+EVENT_QUERY_RESULT = f"{DOMAIN}_query_result"
+EVENT_PROJECTION_RESULT = f"{DOMAIN}_projection_result"
+EVENT_SIMULATION_RESULT = f"{DOMAIN}_simulation_result"
+
+# Storage
+STORAGE_VERSION = 1
+STORAGE_KEY = DOMAIN + ".{}"
+STORAGE_CHUNK_SIZE = 100
+
+# Version of the config entries, and replacements migrated between two
+#  yields to the event loop
+CONFIG_ENTRY_VERSION = 2
+MIGRATION_CHUNK_SIZE = 250
+STORAGE_SAVE_DELAY = 10
+
+# Unique ID of the replacements, generated from the prefix and name
+UNIQUE_ID_FORMAT = "{}"
 ISSUE_URL = "https://github.com/carlosposse/Replacements/issues"
 ATTRIBUTION = "Data calculated by Replacements Integration"
 
 # Basic Configuration
 CONF_DAYS_INTERVAL = "days_interval"
 CONF_WEEKS_INTERVAL = "weeks_interval"
+CONF_MONTHS_INTERVAL = "months_interval"
+CONF_YEARS_INTERVAL = "years_interval"
+CONF_RRULE = "rrule"
 CONF_SOON = "soon_interval"
 CONF_ICON_NORMAL = "icon_normal"
 CONF_ICON_SOON = "icon_soon"
 CONF_ICON_TODAY = "icon_today"
 CONF_ICON_EXPIRED = "icon_expired"
+CONF_TIMESTAMP = "timestamp"
+CONF_STATISTICS = "statistics"
+CONF_POOL = "pool"
+CONF_PROFILE = "profile"
+CONF_USAGE_ENTITY = "usage_entity"
+CONF_USAGE_LIMIT = "usage_limit"
+CONF_USAGE_MODE = "usage_mode"
+CONF_ADAPTIVE = "adaptive"
+CONF_PARENT = "parent"
+CONF_REORDER_LEVEL = "reorder_level"
+CONF_WATCHDOG = "watchdog"
+CONF_WATCHDOG_THRESHOLD = "watchdog_threshold"
+CONF_NOTIFY = "notify"
+CONF_TODO = "todo"
+CONF_SKIP_WEEKENDS = "skip_weekends"
+CONF_HOLIDAYS = "holidays"
 
 # Config Flow Configuration
 CONF_ADD_ANOTHER = "add_another"
@@ -33,6 +80,80 @@ DEFAULT_ICON_TODAY = "mdi:calendar-star"
 DEFAULT_ICON_EXPIRED = "mdi:calendar-remove"
 DEFAULT_UNIT_OF_MEASUREMENT = "Days"
 DEFAULT_PREFIX = "replace_"
+DEFAULT_TIMESTAMP = False
+DEFAULT_STATISTICS = False
+DEFAULT_ICON_POOL = "mdi:package-variant"
+DEFAULT_ICON_TODO = "mdi:clipboard-list"
+DEFAULT_USAGE_MODE = "total"
+DEFAULT_ADAPTIVE = False
+DEFAULT_WATCHDOG = False
+DEFAULT_WATCHDOG_THRESHOLD = 100
+DEFAULT_NOTIFY = ""
+DEFAULT_TODO = False
+DEFAULT_SKIP_WEEKENDS = False
+DEFAULT_HOLIDAYS = ""
+
+# Interval modes, in the order they are checked in a configuration
+INTERVAL_MODES = (
+    CONF_DAYS_INTERVAL,
+    CONF_WEEKS_INTERVAL,
+    CONF_MONTHS_INTERVAL,
+    CONF_YEARS_INTERVAL,
+    CONF_RRULE,
+)
+
+# Fields defined by a profile, items using a profile do not store them
+PROFILE_FIELDS = (
+    *INTERVAL_MODES,
+    CONF_SOON,
+    CONF_UNIT_OF_MEASUREMENT,
+    CONF_ICON_NORMAL,
+    CONF_ICON_SOON,
+    CONF_ICON_TODAY,
+    CONF_ICON_EXPIRED,
+    CONF_TIMESTAMP,
+)
+
+# Usage modes: the increase of a cumulative value (e.g., runtime hours or
+#  litres pumped), or the number of times the source entity turns on
+USAGE_MODE_TOTAL = "total"
+USAGE_MODE_CYCLES = "cycles"
+USAGE_MODES = (USAGE_MODE_TOTAL, USAGE_MODE_CYCLES)
+
+# Adaptive intervals: weight of the last interval in the moving average, and
+#  number of replacements needed before the learned interval is used
+ADAPTIVE_EWMA_ALPHA = 0.3
+ADAPTIVE_MIN_SAMPLES = 3
+
+# Number of replace actions each replacement can undo
+UNDO_HISTORY_SIZE = 10
+
+# Maximum number of projections kept by the projection cache
+PROJECTION_CACHE_SIZE = 32
+
+# Longest horizon of the simulations, in days
+SIMULATION_MAX_DAYS = 5 * 366
+
+# Number of hourly statistics samples imported together into the recorder
+STATISTICS_IMPORT_HOURS = 6
+
+# Daily digest: replacements listed in each notification, and seconds
+#  between two notifications to the same target
+DIGEST_BATCH_SIZE = 25
+DIGEST_SEND_INTERVAL = 2
+
+# Buckets of the replacements, according to the days remaining
+BUCKET_EXPIRED = "expired"
+BUCKET_TODAY = "today"
+BUCKET_SOON = "soon"
+BUCKET_NORMAL = "normal"
+BUCKETS = (BUCKET_EXPIRED, BUCKET_TODAY, BUCKET_SOON, BUCKET_NORMAL)
+
+# Start of the recurrence rules that do not define their own DTSTART
+DEFAULT_RRULE_DTSTART = "20220101T000000"
+
+# Maximum number of (start date, interval) results kept by the date cache
+CALENDAR_CACHE_SIZE = 4096
 
 STARTUP_MESSAGE = f"""
 -------------------------------------------------------------------
@@ -47,17 +168,13 @@ If you have any issues with this you need to open an issue here:
 # Schema Exclusions
 GROUP_INTERVAL = "interval"
 
-CONF_INTERVAL_EXCLUSION_ERROR = "Configuration cannot include both `days_interval` and `weeks_interval`. configure ONLY ONE"
-CONF_INTERVAL_REQD_ERROR = "Either `days_interval` or `weeks_interval` is Required"
+CONF_INTERVAL_EXCLUSION_ERROR = "Configuration cannot include more than one of `days_interval`, `weeks_interval`, `months_interval`, `years_interval` or `rrule`. configure ONLY ONE"
+CONF_INTERVAL_REQD_ERROR = "One of `days_interval`, `weeks_interval`, `months_interval`, `years_interval` or `rrule` is Required"
 
 # Schema definitions
 INTERVAL_SCHEMA = vol.Schema(
     {
-        vol.Required(
-            vol.Any(
-                CONF_DAYS_INTERVAL, CONF_WEEKS_INTERVAL, msg=CONF_INTERVAL_REQD_ERROR
-            )
-        ): object,
+        vol.Required(vol.Any(*INTERVAL_MODES, msg=CONF_INTERVAL_REQD_ERROR)): object,
     },
     extra=vol.ALLOW_EXTRA,
 )
@@ -71,6 +188,15 @@ REPLACEMENT_CONFIG_SCHEMA = vol.Schema(
             vol.Exclusive(
                 CONF_WEEKS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
             ): cv.positive_int,
+            vol.Exclusive(
+                CONF_MONTHS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+            ): cv.positive_int,
+            vol.Exclusive(
+                CONF_YEARS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+            ): cv.positive_int,
+            vol.Exclusive(
+                CONF_RRULE, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+            ): cv.string,
             vol.Optional(CONF_NAME): cv.string,
             vol.Optional(CONF_SOON, default=DEFAULT_SOON): cv.positive_int,
             vol.Optional(CONF_ICON_NORMAL, default=DEFAULT_ICON_NORMAL): cv.icon,
@@ -81,6 +207,19 @@ REPLACEMENT_CONFIG_SCHEMA = vol.Schema(
                 CONF_UNIT_OF_MEASUREMENT, default=DEFAULT_UNIT_OF_MEASUREMENT
             ): cv.string,
             vol.Optional(CONF_PREFIX, default=DEFAULT_PREFIX): cv.string,
+            vol.Optional(CONF_TIMESTAMP, default=DEFAULT_TIMESTAMP): cv.boolean,
+            vol.Optional(CONF_POOL): cv.string,
+            vol.Optional(CONF_PROFILE): cv.slug,
+            vol.Inclusive(CONF_USAGE_ENTITY, CONF_USAGE_LIMIT): cv.entity_id,
+            vol.Inclusive(CONF_USAGE_LIMIT, CONF_USAGE_LIMIT): vol.All(
+                vol.Coerce(float), vol.Range(min=0, min_included=False)
+            ),
+            vol.Optional(CONF_USAGE_MODE, default=DEFAULT_USAGE_MODE): vol.In(
+                USAGE_MODES
+            ),
+            vol.Optional(CONF_ADAPTIVE, default=DEFAULT_ADAPTIVE): cv.boolean,
+            vol.Optional(CONF_PARENT): cv.string,
+            vol.Optional(CONF_REORDER_LEVEL): cv.positive_int,
         }
     )
 )
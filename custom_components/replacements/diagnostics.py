@@ -0,0 +1,34 @@
+"""Diagnostics support for the Replacements integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_INDEX, DATA_POOLS, DATA_PROFILES, DATA_WATCHDOG, DOMAIN
+
+# Diagnostics fields
+ATTR_INDEX_ROWS = "index_rows"
+ATTR_OPTIONS = "options"
+ATTR_POOLS = "pools"
+ATTR_PROFILES = "profiles"
+ATTR_REPLACEMENTS = "replacements"
+ATTR_WATCHDOG = "watchdog"
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the diagnostics of a config entry."""
+    data = hass.data[DOMAIN]
+    watchdog = data.get(DATA_WATCHDOG)
+
+    return {
+        ATTR_OPTIONS: dict(entry.options),
+        ATTR_REPLACEMENTS: len(data[entry.entry_id].items),
+        ATTR_POOLS: dict(data[DATA_POOLS][entry.entry_id].levels),
+        ATTR_PROFILES: sorted(data[DATA_PROFILES].profiles),
+        ATTR_INDEX_ROWS: len(data[DATA_INDEX].rows),
+        ATTR_WATCHDOG: watchdog.as_dict() if watchdog is not None else None,
+    }
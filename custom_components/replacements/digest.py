@@ -0,0 +1,183 @@
+"""Daily digest notifications of the Replacements integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime
+from itertools import groupby
+import logging
+
+from homeassistant.components.notify import (
+    ATTR_MESSAGE,
+    ATTR_TITLE,
+    DOMAIN as NOTIFY_DOMAIN,
+)
+from homeassistant.const import CONF_NAME
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import area_registry as ar, entity_registry as er
+from homeassistant.helpers.event import async_track_time_change
+import homeassistant.util.dt as dt_util
+
+from .const import (
+    BUCKET_EXPIRED,
+    BUCKET_SOON,
+    BUCKET_TODAY,
+    COMPONENT_NAME,
+    DATA_GROUPS,
+    DATA_INDEX,
+    DATA_PROFILES,
+    DIGEST_BATCH_SIZE,
+    DIGEST_SEND_INTERVAL,
+    DOMAIN,
+    PLATFORM,
+)
+from .storage import ReplacementsStore
+
+_LOGGER = logging.getLogger(__name__)
+
+# Order and headings of the buckets in the digest
+DIGEST_BUCKETS = {
+    BUCKET_EXPIRED: "Overdue",
+    BUCKET_TODAY: "Today",
+    BUCKET_SOON: "Soon",
+}
+NO_AREA = "No area"
+
+
+def parse_targets(targets: str) -> list[str]:
+    """Return the notify services of a comma separated list of targets."""
+    return [
+        target.strip().removeprefix(f"{NOTIFY_DOMAIN}.")
+        for target in targets.split(",")
+        if target.strip()
+    ]
+
+
+class ReplacementsDigest:
+    """Daily notification of the replacements that need attention.
+
+    The digest is computed once at the start of every local day from the
+    dates of the replacements, grouped by bucket and area, and sent in
+    batches of DIGEST_BATCH_SIZE, at most one notification every
+    DIGEST_SEND_INTERVAL seconds per target, instead of one per entity.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        store: ReplacementsStore,
+        targets: list[str],
+    ) -> None:
+        """Initialize the digest of a config entry."""
+        self._hass = hass
+        self._store = store
+        self._targets = targets
+        self._unsub: CALLBACK_TYPE | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @callback
+    def async_start(self) -> None:
+        """Send the digest at every local midnight."""
+        self._unsub = async_track_time_change(
+            self._hass, self._async_midnight, hour=0, minute=0, second=0
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop sending the digest, cancelling the pending notifications."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        for task in self._tasks:
+            task.cancel()
+
+    @callback
+    def _async_midnight(self, now: datetime) -> None:
+        """Compute the digest of the new day, and send it to every target."""
+        if not (messages := self.async_messages(dt_util.as_local(now).date())):
+            return
+
+        for target in self._targets:
+            task = self._hass.async_create_task(self._async_send(target, messages))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @callback
+    def async_messages(self, today: date) -> list[dict[str, str]]:
+        """Return the notifications of the replacements needing attention."""
+        entity_registry = er.async_get(self._hass)
+        area_registry = ar.async_get(self._hass)
+        rows = self._hass.data[DOMAIN][DATA_INDEX].rows
+        groups = self._hass.data[DOMAIN][DATA_GROUPS]
+        profiles = self._hass.data[DOMAIN][DATA_PROFILES]
+        items = []
+
+        for unique_id, replacement in self._store.items.items():
+            entity_id = entity_registry.async_get_entity_id(PLATFORM, DOMAIN, unique_id)
+            if (row := rows.get(entity_id)) is None:
+                continue
+            if (profile := profiles.profile_for(replacement)) is None:
+                continue
+
+            # From the date, since the rows are only updated on the next poll
+            days = row.date - today.toordinal()
+            if days < 0:
+                bucket = BUCKET_EXPIRED
+            elif days == 0:
+                bucket = BUCKET_TODAY
+            elif days <= profile.soon:
+                bucket = BUCKET_SOON
+            else:
+                continue
+
+            area = NO_AREA
+            if (area_id := groups.area_of(entity_id)) is not None:
+                if area_entry := area_registry.async_get_area(area_id):
+                    area = area_entry.name
+            items.append((bucket, area, replacement[CONF_NAME], days))
+
+        order = list(DIGEST_BUCKETS)
+        items.sort(key=lambda item: (order.index(item[0]), item[1], item[2]))
+        batches = [
+            items[start : start + DIGEST_BATCH_SIZE]
+            for start in range(0, len(items), DIGEST_BATCH_SIZE)
+        ]
+
+        messages = []
+        for number, batch in enumerate(batches, 1):
+            title = f"{COMPONENT_NAME}: {len(items)} need attention"
+            if len(batches) > 1:
+                title += f" ({number}/{len(batches)})"
+            messages.append({ATTR_TITLE: title, ATTR_MESSAGE: _format(batch)})
+        return messages
+
+    async def _async_send(self, target: str, messages: list[dict[str, str]]) -> None:
+        """Send the notifications to a target, waiting between them."""
+        for number, message in enumerate(messages):
+            if number:
+                await asyncio.sleep(DIGEST_SEND_INTERVAL)
+            try:
+                await self._hass.services.async_call(
+                    NOTIFY_DOMAIN, target, message, blocking=True
+                )
+            except HomeAssistantError as err:
+                _LOGGER.warning("Unable to send the digest to %s: %s", target, err)
+                return
+
+
+def _format(items: list[tuple[str, str, str, int]]) -> str:
+    """Return the lines of a batch, grouped by bucket and area."""
+    lines = []
+    for bucket, bucket_items in groupby(items, key=lambda item: item[0]):
+        lines.append(f"{DIGEST_BUCKETS[bucket]}:")
+        for area, area_items in groupby(bucket_items, key=lambda item: item[1]):
+            names = []
+            for _bucket, _area, name, days in area_items:
+                if days < 0:
+                    names.append(f"{name} ({-days} days late)")
+                elif days > 0:
+                    names.append(f"{name} (in {days} days)")
+                else:
+                    names.append(name)
+            lines.append(f"- {area}: {', '.join(names)}")
+    return "\n".join(lines)
@@ -0,0 +1,67 @@
+"""Area groups of the replacements."""
+from __future__ import annotations
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+
+
+class ReplacementGroups:
+    """Members of every area, kept up to date with the entity registry.
+
+    Filtering by area would otherwise look up every replacement in the
+    registry for every query. The memberships are indexed once, and then
+    only the entities of each registry change, so the operations on a
+    group only visit its members.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the groups and listen for registry changes."""
+        self._hass = hass
+        self._registry = er.async_get(hass)
+        self._members: dict[str, set[str]] = {}
+        self._areas: dict[str, str] = {}
+
+        for entry in self._registry.entities.values():
+            if entry.platform == DOMAIN:
+                self._add(entry.entity_id, entry.area_id)
+
+        hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_registry_updated
+        )
+
+    def members(self, area_id: str) -> set[str]:
+        """Return the entity IDs in an area, the set must not be modified."""
+        return self._members.get(area_id, set())
+
+    def area_of(self, entity_id: str) -> str | None:
+        """Return the area of an entity, if any."""
+        return self._areas.get(entity_id)
+
+    def _add(self, entity_id: str, area_id: str | None) -> None:
+        """Add an entity to the group of its area."""
+        if area_id is not None:
+            self._members.setdefault(area_id, set()).add(entity_id)
+            self._areas[entity_id] = area_id
+
+    def _remove(self, entity_id: str) -> None:
+        """Remove an entity from the group of its area."""
+        if (area_id := self._areas.pop(entity_id, None)) is None:
+            return
+
+        members = self._members[area_id]
+        members.discard(entity_id)
+        if not members:
+            del self._members[area_id]
+
+    @callback
+    def _async_registry_updated(self, event: Event) -> None:
+        """Index the entity of a registry change again."""
+        self._remove(event.data.get("old_entity_id", event.data["entity_id"]))
+        if event.data["action"] == "remove":
+            return
+
+        entry = self._registry.async_get(event.data["entity_id"])
+        if entry is not None and entry.platform == DOMAIN:
+            self._add(entry.entity_id, entry.area_id)
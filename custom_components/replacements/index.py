@@ -0,0 +1,180 @@
+"""In-memory index of all the replacements."""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterable
+from typing import NamedTuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+
+class ReplacementRow(NamedTuple):
+    """Compact summary of a replacement."""
+
+    entity_id: str
+    name: str
+    date: int
+    days_remaining: int
+    stock: int
+    bucket: str
+
+
+# Called with the changed rows and the removed entity IDs
+IndexListener = Callable[[list[ReplacementRow], list[str]], None]
+
+
+def row_filter(
+    buckets: list[str] | None = None,
+    max_days_remaining: int | None = None,
+    max_stock: int | None = None,
+) -> Callable[[ReplacementRow], bool]:
+    """Return a function that checks if a row matches all the given filters."""
+
+    def matches(row: ReplacementRow) -> bool:
+        if buckets is not None and row.bucket not in buckets:
+            return False
+        if max_days_remaining is not None and row.days_remaining > max_days_remaining:
+            return False
+        if max_stock is not None and row.stock > max_stock:
+            return False
+        return True
+
+    return matches
+
+
+def _remove(sorted_list: list[tuple[int, str]], key: tuple[int, str]) -> None:
+    """Remove a key from a sorted list."""
+    del sorted_list[bisect_left(sorted_list, key)]
+
+
+class ReplacementIndex:
+    """Latest summary of every replacement entity, shared by all entries.
+
+    The entities publish their rows after every change. Listeners are only
+    notified about rows that actually changed, in a single batch per event
+    loop iteration, e.g., one batch for the whole fleet at the day rollover.
+
+    The rows are also kept sorted by date and by stock, so range queries
+    only visit the matching rows.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty index."""
+        self._hass = hass
+        self.rows: dict[str, ReplacementRow] = {}
+        self._by_date: list[tuple[int, str]] = []
+        self._by_stock: list[tuple[int, str]] = []
+        self._listeners: list[IndexListener] = []
+        # Pending changes, as dicts to notify them in order
+        self._changed: dict[str, None] = {}
+        self._removed: dict[str, None] = {}
+        self._flush_scheduled = False
+
+    def query(
+        self,
+        matches: Callable[[ReplacementRow], bool],
+        sort_by: str = "date",
+        descending: bool = False,
+        entity_ids: Iterable[str] | None = None,
+    ) -> list[ReplacementRow]:
+        """Return the matching rows, sorted by one of the row fields.
+
+        Only the rows of the given entity IDs are visited, if any, e.g., the
+        members of a group.
+        """
+        field = ReplacementRow._fields.index(sort_by)
+        rows = self.rows.values() if entity_ids is None else self.rows_of(entity_ids)
+        return sorted(
+            (row for row in rows if matches(row)),
+            key=lambda row: (row[field], row.entity_id),
+            reverse=descending,
+        )
+
+    def rows_of(self, entity_ids: Iterable[str]) -> list[ReplacementRow]:
+        """Return the rows of the given entity IDs that are replacements."""
+        rows = self.rows
+        return [rows[entity_id] for entity_id in entity_ids if entity_id in rows]
+
+    def due_between(
+        self, start: int | None = None, end: int | None = None
+    ) -> list[ReplacementRow]:
+        """Return the rows with a date ordinal in a range, sorted by date."""
+        low = 0 if start is None else bisect_left(self._by_date, (start,))
+        high = (
+            len(self._by_date)
+            if end is None
+            else bisect_left(self._by_date, (end + 1,))
+        )
+        return [self.rows[entity_id] for _, entity_id in self._by_date[low:high]]
+
+    def stock_below(self, threshold: int) -> list[ReplacementRow]:
+        """Return the rows with less stock than a threshold, sorted by stock."""
+        high = bisect_left(self._by_stock, (threshold,))
+        return [self.rows[entity_id] for _, entity_id in self._by_stock[:high]]
+
+    @callback
+    def async_update(self, row: ReplacementRow) -> None:
+        """Add or update the row of a replacement."""
+        if (previous := self.rows.get(row.entity_id)) == row:
+            return
+
+        # Only a changed date or stock moves the row in the sorted lists
+        if previous is None or previous.date != row.date:
+            if previous is not None:
+                _remove(self._by_date, (previous.date, row.entity_id))
+            insort(self._by_date, (row.date, row.entity_id))
+        if previous is None or previous.stock != row.stock:
+            if previous is not None:
+                _remove(self._by_stock, (previous.stock, row.entity_id))
+            insort(self._by_stock, (row.stock, row.entity_id))
+
+        self.rows[row.entity_id] = row
+        self._changed[row.entity_id] = None
+        self._removed.pop(row.entity_id, None)
+        self._async_schedule_flush()
+
+    @callback
+    def async_remove(self, entity_id: str) -> None:
+        """Remove the row of a replacement."""
+        if (previous := self.rows.pop(entity_id, None)) is None:
+            return
+
+        self._remove_sorted(previous)
+        self._changed.pop(entity_id, None)
+        self._removed[entity_id] = None
+        self._async_schedule_flush()
+
+    def _remove_sorted(self, row: ReplacementRow) -> None:
+        """Remove a row from the sorted lists."""
+        _remove(self._by_date, (row.date, row.entity_id))
+        _remove(self._by_stock, (row.stock, row.entity_id))
+
+    @callback
+    def async_listen(self, listener: IndexListener) -> CALLBACK_TYPE:
+        """Listen for changed rows, returning a function to stop listening."""
+        self._listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def _async_schedule_flush(self) -> None:
+        """Notify the listeners once the current changes are done."""
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._hass.loop.call_soon(self._async_flush)
+
+    @callback
+    def _async_flush(self) -> None:
+        """Notify the listeners of the pending changes."""
+        changed = [self.rows[entity_id] for entity_id in self._changed]
+        removed = list(self._removed)
+        self._changed.clear()
+        self._removed.clear()
+        self._flush_scheduled = False
+
+        for listener in list(self._listeners):
+            listener(changed, removed)
@@ -0,0 +1,71 @@
+"""Kits of replacements, replaced together with their parent."""
+from __future__ import annotations
+
+from collections import deque
+import logging
+from typing import Any
+
+from homeassistant.const import CONF_NAME
+
+from .const import CONF_PARENT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ReplacementKits:
+    """Parent and child replacements of a config entry.
+
+    Each replacement references its parent by name, so the kits form a
+    forest. The descendants of a replacement are listed parents first and
+    cached, so a replace action only visits the replacements it affects.
+    """
+
+    def __init__(self, items: dict[str, dict[str, Any]]) -> None:
+        """Initialize the kits from the replacement definitions, by unique ID."""
+        by_name = {item[CONF_NAME]: unique_id for unique_id, item in items.items()}
+        self.parents: dict[str, str] = {}
+        for unique_id, item in items.items():
+            if (parent := item.get(CONF_PARENT)) is None:
+                continue
+            if (parent_id := by_name.get(parent)) is None:
+                _LOGGER.error(
+                    "Unknown parent %s of %s, it is replaced on its own",
+                    parent,
+                    item[CONF_NAME],
+                )
+                continue
+            self.parents[unique_id] = parent_id
+
+        # Break the cycles, which would replace a kit forever
+        for unique_id in list(self.parents):
+            seen = {unique_id}
+            current = self.parents.get(unique_id)
+            while current is not None:
+                if current in seen:
+                    _LOGGER.error(
+                        "The parents of %s form a cycle, it is replaced on its own",
+                        items[unique_id][CONF_NAME],
+                    )
+                    del self.parents[unique_id]
+                    break
+                seen.add(current)
+                current = self.parents.get(current)
+
+        self.children: dict[str, list[str]] = {}
+        for child, parent in self.parents.items():
+            self.children.setdefault(parent, []).append(child)
+
+        # Entities of the replacements, by unique ID, set by the platform
+        self.entities: dict[str, Any] = {}
+        self._descendants: dict[str, tuple[str, ...]] = {}
+
+    def descendants(self, unique_id: str) -> tuple[str, ...]:
+        """Return the descendants of a replacement, parents before children."""
+        if (descendants := self._descendants.get(unique_id)) is None:
+            order = []
+            queue = deque(self.children.get(unique_id, ()))
+            while queue:
+                order.append(child := queue.popleft())
+                queue.extend(self.children.get(child, ()))
+            descendants = self._descendants[unique_id] = tuple(order)
+        return descendants
@@ -0,0 +1,89 @@
+"""Migration of the config entries of the Replacements integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+import logging
+from typing import Any, TypeVar
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONFIG_ENTRY_VERSION, DOMAIN, MIGRATION_CHUNK_SIZE
+from .storage import ReplacementsStore
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Called with a config entry of the previous version, returns its new data
+MigrationStep = Callable[[HomeAssistant, ConfigEntry], Awaitable[dict[str, Any]]]
+
+
+async def async_chunks(items: Sequence[_T]) -> AsyncIterator[Sequence[_T]]:
+    """Yield the items in chunks, yielding to the event loop between them."""
+    for start in range(0, len(items), MIGRATION_CHUNK_SIZE):
+        if start:
+            await asyncio.sleep(0)
+        yield items[start : start + MIGRATION_CHUNK_SIZE]
+
+
+async def async_import_replacements(
+    hass: HomeAssistant, entry: ConfigEntry, store: ReplacementsStore
+) -> dict[str, Any]:
+    """Move the replacements of the entry data into the store.
+
+    Returns the entry data without them. Existing replacements are replaced
+    in place, so an interrupted import can simply run again.
+    """
+    async for chunk in async_chunks(entry.data.get(DOMAIN, [])):
+        for replacement in chunk:
+            store.async_add(replacement)
+    await store.async_flush()
+
+    return {key: value for key, value in entry.data.items() if key != DOMAIN}
+
+
+async def _async_migrate_to_2(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Move the replacements of a version 1 entry into the chunked storage.
+
+    The options flow of version 1 also copied them into the entry options,
+    where they are dropped too.
+    """
+    store = ReplacementsStore(hass, entry.entry_id)
+    await store.async_load()
+    data = await async_import_replacements(hass, entry, store)
+
+    if DOMAIN in entry.options:
+        options = {key: value for key, value in entry.options.items() if key != DOMAIN}
+        hass.config_entries.async_update_entry(entry, options=options)
+    return data
+
+
+# Steps migrating the entries of each version to the next one
+MIGRATIONS: dict[int, MigrationStep] = {
+    1: _async_migrate_to_2,
+}
+
+
+async def async_migrate(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate a config entry to the current version, one version at a time.
+
+    The entry is updated after every step, so a failed migration resumes
+    from the last completed version.
+    """
+    if entry.version > CONFIG_ENTRY_VERSION:
+        _LOGGER.error(
+            "Cannot migrate %s from version %s, downgrading is not supported",
+            entry.title,
+            entry.version,
+        )
+        return False
+
+    while entry.version < CONFIG_ENTRY_VERSION:
+        _LOGGER.debug("Migrating %s from version %s", entry.title, entry.version)
+        data = await MIGRATIONS[entry.version](hass, entry)
+        entry.version += 1
+        hass.config_entries.async_update_entry(entry, data=data)
+
+    return True
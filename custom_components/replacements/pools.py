@@ -0,0 +1,111 @@
+"""Inventory pools shared by several replacements."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import STORAGE_KEY, STORAGE_SAVE_DELAY, STORAGE_VERSION
+
+# Storage fields
+DATA_LEVELS = "levels"
+
+
+class InventoryPools:
+    """Stock levels of the inventory pools of a config entry.
+
+    Replacements that use the same part reference the same pool, so the
+    stock is kept in a single place. Changes are made under a lock, so
+    concurrent replace actions never lose a decrement, and the listeners
+    of a pool are notified once per batch of changes.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the pools of a config entry."""
+        self._hass = hass
+        self._store = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY.format(entry_id)}.pools"
+        )
+        self._lock = asyncio.Lock()
+        self.levels: dict[str, int] = {}
+        self._listeners: dict[str, list[CALLBACK_TYPE]] = {}
+        self._changed: set[str] = set()
+        self._flush_scheduled = False
+        self._dirty = False
+
+    async def async_load(self) -> None:
+        """Load the stock levels."""
+        data = await self._store.async_load() or {DATA_LEVELS: {}}
+        self.levels = data[DATA_LEVELS]
+
+    async def async_flush(self) -> None:
+        """Write the pending changes now."""
+        if self._dirty:
+            await self._store.async_save(self._data())
+
+    async def async_remove(self) -> None:
+        """Remove the file of the config entry."""
+        await self._store.async_remove()
+
+    async def async_set(self, pool: str, level: int) -> None:
+        """Set the stock level of a pool."""
+        async with self._lock:
+            self._async_changed(pool, level)
+
+    async def async_consume(self, pool: str) -> int:
+        """Take one unit from a pool, if available, and return the new level."""
+        async with self._lock:
+            level = max(0, self.levels.get(pool, 0) - 1)
+            self._async_changed(pool, level)
+            return level
+
+    async def async_release(self, pool: str) -> int:
+        """Give one unit back to a pool, and return the new level."""
+        async with self._lock:
+            level = self.levels.get(pool, 0) + 1
+            self._async_changed(pool, level)
+            return level
+
+    @callback
+    def async_listen(self, pool: str, listener: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for changes of a pool, returning a function to stop listening."""
+        self._listeners.setdefault(pool, []).append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners[pool].remove(listener)
+
+        return remove_listener
+
+    @callback
+    def _async_changed(self, pool: str, level: int) -> None:
+        """Save a new level and notify it once the current changes are done."""
+        if self.levels.get(pool) == level:
+            return
+
+        self.levels[pool] = level
+        self._changed.add(pool)
+        self._dirty = True
+        self._store.async_delay_save(self._data, STORAGE_SAVE_DELAY)
+
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._hass.loop.call_soon(self._async_notify)
+
+    @callback
+    def _async_notify(self) -> None:
+        """Notify the listeners of the changed pools."""
+        changed = self._changed
+        self._changed = set()
+        self._flush_scheduled = False
+
+        for pool in changed:
+            for listener in list(self._listeners.get(pool, [])):
+                listener()
+
+    def _data(self) -> dict[str, Any]:
+        """Return the data to save."""
+        self._dirty = False
+        return {DATA_LEVELS: self.levels}
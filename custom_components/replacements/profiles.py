@@ -0,0 +1,129 @@
+"""Replacement profiles, shared by all the replacements that use them."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.const import CONF_UNIT_OF_MEASUREMENT
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    CONF_ICON_EXPIRED,
+    CONF_ICON_NORMAL,
+    CONF_ICON_SOON,
+    CONF_ICON_TODAY,
+    CONF_PROFILE,
+    CONF_SOON,
+    CONF_TIMESTAMP,
+    DEFAULT_TIMESTAMP,
+    INTERVAL_MODES,
+    PROFILE_FIELDS,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+
+# Storage fields
+DATA_PROFILES = "profiles"
+
+
+@dataclass(frozen=True)
+class ReplacementProfile:
+    """Schedule and display settings of one or more replacements."""
+
+    interval_mode: str
+    interval: Any
+    soon: int
+    unit_of_measurement: str
+    icon_normal: str
+    icon_soon: str
+    icon_today: str
+    icon_expired: str
+    timestamp: bool
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> ReplacementProfile:
+        """Create a profile from a validated configuration."""
+        # Exactly one of the interval modes is defined according to the schema
+        interval_mode = next(mode for mode in INTERVAL_MODES if mode in config)
+        return cls(
+            interval_mode,
+            config[interval_mode],
+            config[CONF_SOON],
+            config[CONF_UNIT_OF_MEASUREMENT],
+            config[CONF_ICON_NORMAL],
+            config[CONF_ICON_SOON],
+            config[CONF_ICON_TODAY],
+            config[CONF_ICON_EXPIRED],
+            # Replacements stored before the timestamp option show the days
+            config.get(CONF_TIMESTAMP, DEFAULT_TIMESTAMP),
+        )
+
+
+ProfileListener = Callable[[ReplacementProfile], None]
+
+
+class ReplacementProfiles:
+    """Profiles that replacements reference by ID, shared by all entries.
+
+    Each profile is validated and created once, and every replacement using
+    it holds the same object. Changing a profile swaps that object in all
+    its replacements in a single pass, without reloading the entries.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the profiles."""
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY.format(DATA_PROFILES))
+        self._configs: dict[str, dict[str, Any]] = {}
+        self.profiles: dict[str, ReplacementProfile] = {}
+        self._listeners: dict[str, list[ProfileListener]] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored profiles."""
+        data = await self._store.async_load() or {DATA_PROFILES: {}}
+        self._configs = data[DATA_PROFILES]
+        self.profiles = {
+            profile_id: ReplacementProfile.from_config(config)
+            for profile_id, config in self._configs.items()
+        }
+
+    def profile_for(self, replacement: dict[str, Any]) -> ReplacementProfile | None:
+        """Return the profile of a replacement, or None if it is unknown.
+
+        Replacements without a profile get their own one, from their settings.
+        """
+        if CONF_PROFILE in replacement:
+            return self.profiles.get(replacement[CONF_PROFILE])
+        return ReplacementProfile.from_config(replacement)
+
+    @callback
+    def async_set(self, profile_id: str, config: dict[str, Any]) -> None:
+        """Add or change a profile from a validated configuration."""
+        config = {key: value for key, value in config.items() if key in PROFILE_FIELDS}
+        profile = ReplacementProfile.from_config(config)
+        if self.profiles.get(profile_id) == profile:
+            return
+
+        self._configs[profile_id] = config
+        self.profiles[profile_id] = profile
+        self._store.async_delay_save(self._data, STORAGE_SAVE_DELAY)
+
+        for listener in list(self._listeners.get(profile_id, [])):
+            listener(profile)
+
+    @callback
+    def async_listen(self, profile_id: str, listener: ProfileListener) -> CALLBACK_TYPE:
+        """Listen for changes of a profile, returning a function to stop listening."""
+        self._listeners.setdefault(profile_id, []).append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners[profile_id].remove(listener)
+
+        return remove_listener
+
+    def _data(self) -> dict[str, Any]:
+        """Return the data to save."""
+        return {DATA_PROFILES: self._configs}
@@ -0,0 +1,145 @@
+"""Projection of the future replacements, e.g., to plan purchases."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import date
+from functools import lru_cache
+from itertools import takewhile
+from typing import Any, NamedTuple
+
+from dateutil.relativedelta import relativedelta
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_NAME
+
+from .const import CONF_RRULE, PROJECTION_CACHE_SIZE
+from .recurrence import RRuleRecurrence, next_date
+from .sensor import ATTR_POOL, ATTR_STOCK
+
+# Projection fields
+ATTR_DEMAND = "demand"
+ATTR_DEPLETED = "depleted"
+ATTR_PERIODS = "periods"
+ATTR_POOLS = "pools"
+ATTR_REPLACEMENTS = "replacements"
+ATTR_SHORTFALL = "shortfall"
+ATTR_TOTAL = "total"
+ATTR_TOTALS = "totals"
+
+PERIOD_FORMAT = "%Y-%m"
+
+
+class ProjectionItem(NamedTuple):
+    """Schedule and stock of a replacement, as needed for the projection."""
+
+    entity_id: str
+    name: str
+    date: int
+    mode: str
+    interval: Any
+    stock: int
+    pool: str | None = None
+
+
+def replacement_dates(item: ProjectionItem, today: date) -> Iterator[date]:
+    """Lazily generate the next dates of a replacement, starting on its date.
+
+    Every replacement is assumed to happen on its due date, and an overdue
+    replacement today, once, with the following dates counted from today.
+    """
+    current: date | None = date.fromordinal(item.date)
+    recurrence = RRuleRecurrence(item.interval) if item.mode == CONF_RRULE else None
+
+    if current < today:
+        current = today
+
+    while current is not None:
+        yield current
+        if recurrence is None:
+            current = next_date(current, item.mode, item.interval)
+        else:
+            current = recurrence.next_date(current)
+
+
+def _depleted(periods: list[str], demand: list[int], stock: int) -> str | None:
+    """Return the first period in which the stock does not cover the demand."""
+    consumed = 0
+    for period, count in zip(periods, demand):
+        consumed += count
+        if consumed > stock:
+            return period
+    return None
+
+
+@lru_cache(maxsize=PROJECTION_CACHE_SIZE)
+def project(
+    items: tuple[ProjectionItem, ...], today: date, months: int
+) -> dict[str, Any]:
+    """Count the replacements per month, from this month on.
+
+    Overdue replacements count once, today. The replacements of a
+    pool take their units from the same stock, so their shortfall and
+    depletion are those of the whole pool. The results are cached, since the
+    same horizon is usually queried again before anything changes.
+    """
+    first = today.replace(day=1)
+    end = first + relativedelta(months=months)
+    periods = [
+        (first + relativedelta(months=month)).strftime(PERIOD_FORMAT)
+        for month in range(months)
+    ]
+    totals = [0] * months
+    demands = []
+    pools: dict[str, dict[str, Any]] = {}
+
+    for item in items:
+        demand = [0] * months
+        for replacement_date in takewhile(
+            lambda replacement_date: replacement_date < end,
+            replacement_dates(item, today),
+        ):
+            # Months elapsed since the first period
+            month = (
+                (replacement_date.year - first.year) * 12
+                + replacement_date.month
+                - first.month
+            )
+            demand[month] += 1
+            totals[month] += 1
+        demands.append(demand)
+
+        # The replacements of a pool all report the stock of the pool
+        if item.pool is not None:
+            pool = pools.setdefault(
+                item.pool, {ATTR_STOCK: item.stock, ATTR_DEMAND: [0] * months}
+            )
+            pool[ATTR_DEMAND] = [a + b for a, b in zip(pool[ATTR_DEMAND], demand)]
+
+    for pool in pools.values():
+        pool[ATTR_TOTAL] = sum(pool[ATTR_DEMAND])
+        pool[ATTR_SHORTFALL] = max(0, pool[ATTR_TOTAL] - pool[ATTR_STOCK])
+        pool[ATTR_DEPLETED] = _depleted(periods, pool[ATTR_DEMAND], pool[ATTR_STOCK])
+
+    replacements = []
+    for item, demand in zip(items, demands):
+        total = sum(demand)
+        result = {
+            ATTR_ENTITY_ID: item.entity_id,
+            ATTR_NAME: item.name,
+            ATTR_STOCK: item.stock,
+            ATTR_DEMAND: demand,
+            ATTR_TOTAL: total,
+        }
+        if item.pool is None:
+            result[ATTR_SHORTFALL] = max(0, total - item.stock)
+            result[ATTR_DEPLETED] = _depleted(periods, demand, item.stock)
+        else:
+            result[ATTR_POOL] = item.pool
+            result[ATTR_SHORTFALL] = pools[item.pool][ATTR_SHORTFALL]
+            result[ATTR_DEPLETED] = pools[item.pool][ATTR_DEPLETED]
+        replacements.append(result)
+
+    return {
+        ATTR_PERIODS: periods,
+        ATTR_TOTALS: totals,
+        ATTR_REPLACEMENTS: replacements,
+        ATTR_POOLS: pools,
+    }
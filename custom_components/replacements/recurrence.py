@@ -0,0 +1,78 @@
+"""Calendar arithmetic for the replacement intervals."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import date, datetime
+from functools import lru_cache
+
+from dateutil.relativedelta import relativedelta
+from dateutil.rrule import rrule, rruleset, rrulestr
+
+from .const import (
+    CALENDAR_CACHE_SIZE,
+    CONF_DAYS_INTERVAL,
+    CONF_MONTHS_INTERVAL,
+    CONF_WEEKS_INTERVAL,
+    CONF_YEARS_INTERVAL,
+    DEFAULT_RRULE_DTSTART,
+)
+
+# Map each interval mode to the matching relativedelta argument
+RELATIVEDELTA_ARGS = {
+    CONF_DAYS_INTERVAL: "days",
+    CONF_WEEKS_INTERVAL: "weeks",
+    CONF_MONTHS_INTERVAL: "months",
+    CONF_YEARS_INTERVAL: "years",
+}
+
+
+@lru_cache(maxsize=CALENDAR_CACHE_SIZE)
+def next_date(start: date, mode: str, interval: int) -> date:
+    """Return the date one interval after start.
+
+    Months and years are added on the calendar, clamping to the last day
+    of the month when needed, e.g., January 31st plus one month is the
+    last day of February. The results are cached, since every replacement
+    with the same interval calculates the same date on the same day.
+    """
+    return start + relativedelta(**{RELATIVEDELTA_ARGS[mode]: interval})
+
+
+class RRuleRecurrence:
+    """Next dates of an RFC 5545 recurrence rule, e.g., "FREQ=MONTHLY;BYDAY=1MO".
+
+    The rule is expanded lazily by a single iterator which is only advanced,
+    never restarted, while the requested start dates keep moving forward.
+    Since "today" only moves forward, every occurrence is generated once and
+    each new date costs amortized O(1).
+    """
+
+    def __init__(self, rule: str) -> None:
+        """Parse the rule, raising ValueError if it is not valid."""
+        self._rule: rrule | rruleset = rrulestr(
+            rule,
+            dtstart=datetime.strptime(DEFAULT_RRULE_DTSTART, "%Y%m%dT%H%M%S"),
+            ignoretz=True,
+        )
+        self._iterator: Iterator[datetime] | None = None
+        self._occurrence: date | None = None
+        self._start: date | None = None
+
+    def _advance(self) -> date | None:
+        """Return the next occurrence, or None once the rule is exhausted."""
+        occurrence = next(self._iterator, None)
+        return None if occurrence is None else occurrence.date()
+
+    def next_date(self, start: date) -> date | None:
+        """Return the first occurrence after start, None if there is none."""
+
+        # Only expand the rule from DTSTART again when going back in time
+        if self._iterator is None or start < self._start:
+            self._iterator = iter(self._rule)
+            self._occurrence = self._advance()
+        self._start = start
+
+        while self._occurrence is not None and self._occurrence <= start:
+            self._occurrence = self._advance()
+
+        return self._occurrence
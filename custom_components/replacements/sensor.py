@@ -1,333 +1,1017 @@
-"""Platform for sensor integration."""
-from __future__ import annotations
-
-from dataclasses import dataclass
-from datetime import date, datetime
-from decimal import InvalidOperation
-import logging
-from typing import Any
-
-from dateutil.relativedelta import relativedelta
-from homeassistant import config_entries
-from homeassistant.components.sensor import RestoreSensor, SensorExtraStoredData
-from homeassistant.const import (
-    ATTR_DATE,
-    CONF_NAME,
-    CONF_UNIQUE_ID,
-    CONF_UNIT_OF_MEASUREMENT,
-)
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers import entity_platform
-import homeassistant.helpers.config_validation as cv
-from homeassistant.helpers.config_validation import make_entity_service_schema
-from homeassistant.helpers.dispatcher import async_dispatcher_connect
-from homeassistant.helpers.entity import generate_entity_id
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-import homeassistant.util.dt as dt_util
-import voluptuous as vol
-
-from .const import (
-    CONF_DAYS_INTERVAL,
-    CONF_ICON_EXPIRED,
-    CONF_ICON_NORMAL,
-    CONF_ICON_SOON,
-    CONF_ICON_TODAY,
-    CONF_PREFIX,
-    CONF_SOON,
-    CONF_WEEKS_INTERVAL,
-    DOMAIN,
-    PLATFORM,
-)
-
-_LOGGER = logging.getLogger(__name__)
-
-# Attributes
-ATTR_DAYS_INTERVAL = "days_interval"
-ATTR_WEEKS_INTERVAL = "weeks_interval"
-ATTR_SOON = "soon"
-ATTR_STOCK = "stock"
-ATTR_NEW_DATE = "new_date"
-
-# Services
-SERVICE_STOCK = "renew_stock"
-SERVICE_STOCK_SCHEMA = make_entity_service_schema({vol.Required(ATTR_STOCK): int})
-SERVICE_DATE = "set_date"
-SERVICE_DATE_SCHEMA = make_entity_service_schema(
-    {vol.Required(ATTR_NEW_DATE): cv.string}
-)
-SERVICE_REPLACED = "replace_action"
-SERVICE_REPLACED_SCHEMA = make_entity_service_schema({})
-
-# Helpers
-UNIQUE_ID_FORMAT = "{}"
-ENTITY_ID_FORMAT = PLATFORM + ".{}"
-DATA_UPDATED = "replacements_updated"
-
-
-async def async_setup_entry(
-    hass: HomeAssistant,
-    config_entry: config_entries.ConfigEntry,
-    async_add_entities,
-):
-    """Setup sensors from a config entry created in the integrations UI."""
-
-    # Instantiate device and add to the platform
-    config = hass.data[DOMAIN][config_entry.entry_id]
-
-    # Generate a unique ID for each entity
-    for entry in config[DOMAIN]:
-        entry[CONF_UNIQUE_ID] = generate_entity_id(
-            UNIQUE_ID_FORMAT, entry[CONF_PREFIX] + entry[CONF_NAME], []
-        )
-
-    replacements = [Replacement(entry) for entry in config[DOMAIN]]
-
-    async_add_entities(replacements)
-
-    # Get the platform reference
-    platform = entity_platform.async_get_current_platform()
-
-    ## Register all platform services
-
-    # Register the stock update service
-    platform.async_register_entity_service(
-        SERVICE_STOCK, SERVICE_STOCK_SCHEMA, "async_handle_renew_stock"
-    )
-
-    # Register the set date service
-    platform.async_register_entity_service(
-        SERVICE_DATE, SERVICE_DATE_SCHEMA, "async_handle_set_date"
-    )
-
-    # Register the replacement action service
-    platform.async_register_entity_service(
-        SERVICE_REPLACED, SERVICE_REPLACED_SCHEMA, "async_handle_replace_action"
-    )
-
-
-@dataclass
-class ReplacementSensorExtraStoredData(SensorExtraStoredData):
-    """Object to hold extra stored data."""
-
-    stock: int
-    next_date: datetime | None
-
-    def as_dict(self) -> dict[str, Any]:
-        """Return a dict representation of the replacement sensor data."""
-        data = super().as_dict()
-
-        data[ATTR_STOCK] = self.stock
-        data[ATTR_DATE] = None
-        if isinstance(self.next_date, (datetime)):
-            data[ATTR_DATE] = self.next_date.isoformat()
-        return data
-
-    @classmethod
-    def from_dict(
-        cls, restored: dict[str, Any]
-    ) -> ReplacementSensorExtraStoredData | None:
-        """Initialize a stored sensor state from a dict."""
-        # Read the default SensorExtraStoredData, i.e., the native_value and
-        # native_unit_of_measurement
-        extra = SensorExtraStoredData.from_dict(restored)
-        if extra is None:
-            return None
-
-        # Read the rest of the parameters
-        try:
-            stock: int = int(restored[ATTR_STOCK])
-            next_date: datetime | None = dt_util.parse_datetime(restored[ATTR_DATE])
-        except KeyError:
-            # restored is a dict, but does not have all values
-            return None
-
-        return cls(
-            extra.native_value, extra.native_unit_of_measurement, stock, next_date
-        )
-
-
-class Replacement(RestoreSensor):
-    """Representation of a replacement sensor."""
-
-    def __init__(self, replacement: dict[str, str]) -> None:
-        """Initialize the Replacement sensor."""
-
-        # Save all fields to identify the sensor
-        self._unique_id = replacement[CONF_UNIQUE_ID]
-        self.entity_id = ENTITY_ID_FORMAT.format(self._unique_id)
-        self._name = replacement[CONF_NAME]
-
-        ## Initialize all parameters that might be in the configuration
-
-        # Get required configuration, one of these two must be defined
-        #  according to the schema
-        if CONF_DAYS_INTERVAL in replacement:
-            self._days_interval = replacement[CONF_DAYS_INTERVAL]
-            self._days_mode = True
-        else:
-            self._weeks_interval = replacement[CONF_WEEKS_INTERVAL]
-            self._days_mode = False
-
-        # Get additional optional parameters
-        self._soon = replacement[CONF_SOON]
-        self._unit_of_measurement = replacement[CONF_UNIT_OF_MEASUREMENT]
-        self._icon_normal = replacement[CONF_ICON_NORMAL]
-        self._icon_soon = replacement[CONF_ICON_SOON]
-        self._icon_today = replacement[CONF_ICON_TODAY]
-        self._icon_expired = replacement[CONF_ICON_EXPIRED]
-
-        # Initialize the icon variable to the normal icon
-        self._icon = self._icon_normal
-
-        ## Initialize state and attributes
-
-        # This initialization is usually replaced during state restore
-        self._days_remaining = 0
-        self._date = None
-        self._stock = 0
-
-    def _calculate_new_date(self):
-        """Calculate a new replacement date according to the defined interval"""
-
-        # Calculate the new date according to the interval
-        if self._days_mode:
-            next_date = date.today() + relativedelta(days=self._days_interval)
-        else:
-            next_date = date.today() + relativedelta(weeks=self._weeks_interval)
-
-        # Replace new date with datetime
-        self._date = datetime(next_date.year, next_date.month, next_date.day)
-
-    async def async_added_to_hass(self):
-        """Run when entity about to be added."""
-        await super().async_added_to_hass()
-
-        # Recover last sensor data
-        restored = await self.async_get_last_sensor_data()
-
-        if restored is None or restored.next_date is None:
-            # We need to ensure a new date is calculated if the restored
-            #  data is non-existent or corrupted
-            self._calculate_new_date()
-            return
-
-        # Restore all saved attributes
-        self._days_remaining = restored.native_value
-        self._unit_of_measurement = restored.native_unit_of_measurement
-        self._stock = restored.stock
-        self._date = restored.next_date
-
-    @property
-    def unique_id(self):
-        """Return a unique ID to use for this sensor."""
-        return self._unique_id
-
-    @property
-    def name(self):
-        """Return the name of the sensor."""
-        return self._name
-
-    @property
-    def native_value(self):
-        """Return the state of the sensor."""
-        return self._days_remaining
-
-    @property
-    def native_unit_of_measurement(self):
-        """Return the unit the value is expressed in."""
-        return self._unit_of_measurement
-
-    @property
-    def extra_state_attributes(self):
-        """Return the state attributes of the sensor."""
-        res = {}
-
-        # Return the interval according to the mode
-        if self._days_mode:
-            res[ATTR_DAYS_INTERVAL] = self._days_interval
-        else:
-            res[ATTR_WEEKS_INTERVAL] = self._weeks_interval
-
-        # Return all other attributes
-        res[ATTR_DATE] = self._date.strftime("%Y-%m-%d")
-        res[ATTR_STOCK] = self._stock
-        return res
-
-    @property
-    def icon(self):
-        return self._icon
-
-    @property
-    def extra_restore_state_data(self) -> ReplacementSensorExtraStoredData:
-        """Return sensor specific state data to be restored."""
-        return ReplacementSensorExtraStoredData(
-            self.native_value, self.native_unit_of_measurement, self._stock, self._date
-        )
-
-    async def async_get_last_sensor_data(
-        self,
-    ) -> ReplacementSensorExtraStoredData | None:
-        """Restore Replacement Sensor Extra Stored Data."""
-        if (restored_last_extra_data := await self.async_get_last_extra_data()) is None:
-            return None
-
-        return ReplacementSensorExtraStoredData.from_dict(
-            restored_last_extra_data.as_dict()
-        )
-
-    async def async_handle_renew_stock(self, stock=-1) -> None:
-        """Assign the new available stock"""
-        self._stock = stock
-        await self.async_update_ha_state()
-
-    async def async_handle_set_date(self, new_date=None) -> None:
-        """Assign a new date to replace"""
-
-        # Verify the date is in the correct format
-        try:
-            try_date = datetime.strptime(new_date, "%Y-%m-%d")
-        except ValueError as wrong_date_format:
-            _LOGGER.warning('Invalid date, please input a date in format "YYYY-MM-DD"')
-            raise AttributeError from wrong_date_format
-
-        # Make sure the new date is not in the past
-        if (try_date.date() - date.today()).days < 0:
-            _LOGGER.warning("Invalid date, please input a date that is not in the past")
-            raise ValueError
-
-        # Assign the new date and update the state
-        self._date = try_date
-        await self.async_update_ha_state()
-
-    async def async_handle_replace_action(self) -> None:
-        """Handle what happens when a replacement occurs"""
-
-        # Calculate new date from today
-        self._calculate_new_date()
-
-        # Decrement the stock
-        if self._stock > 0:
-            self._stock = self._stock - 1
-
-        # Update the core state
-        await self.async_update_ha_state()
-
-    async def async_update(self) -> None:
-        """update the sensor"""
-        # Get today's date and calculate remaining days
-        today = date.today()
-        days_remaining = (self._date.date() - today).days
-
-        # Assign icon according to number of days remaining
-        if days_remaining < 0:
-            self._icon = self._icon_expired
-        elif days_remaining == 0:
-            self._icon = self._icon_today
-        elif days_remaining <= self._soon:
-            self._icon = self._icon_soon
-        else:
-            self._icon = self._icon_normal
-
-        # Update internal state
-        self._days_remaining = days_remaining
+"""Platform for sensor integration."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
+from decimal import InvalidOperation
+import logging
+from math import ceil
+from typing import Any
+
+from homeassistant import config_entries
+from homeassistant.components.sensor import (
+    RestoreSensor,
+    SensorDeviceClass,
+    SensorEntity,
+    SensorExtraStoredData,
+)
+from homeassistant.const import (
+    ATTR_DATE,
+    ATTR_ENTITY_ID,
+    ATTR_NAME,
+    CONF_NAME,
+    CONF_UNIQUE_ID,
+    STATE_ON,
+)
+from homeassistant.core import Context, Event, HomeAssistant, ServiceCall, callback
+from homeassistant.helpers import entity_platform
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.config_validation import make_entity_service_schema
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
+import homeassistant.util.dt as dt_util
+import voluptuous as vol
+
+from .adaptive import IntervalStatistics
+from .alerts import LowStockAlerts
+from .const import (
+    ADAPTIVE_MIN_SAMPLES,
+    BUCKET_EXPIRED,
+    BUCKET_NORMAL,
+    BUCKET_SOON,
+    BUCKET_TODAY,
+    CONF_ADAPTIVE,
+    CONF_HOLIDAYS,
+    CONF_PARENT,
+    CONF_POOL,
+    CONF_PROFILE,
+    CONF_REORDER_LEVEL,
+    CONF_RRULE,
+    CONF_SKIP_WEEKENDS,
+    CONF_TODO,
+    CONF_USAGE_ENTITY,
+    CONF_USAGE_LIMIT,
+    CONF_USAGE_MODE,
+    DATA_ALERTS,
+    DATA_INDEX,
+    DATA_POOLS,
+    DATA_PROFILES,
+    DATA_TODAY,
+    DEFAULT_ADAPTIVE,
+    DEFAULT_HOLIDAYS,
+    DEFAULT_ICON_POOL,
+    DEFAULT_ICON_TODO,
+    DEFAULT_SKIP_WEEKENDS,
+    DEFAULT_TODO,
+    DEFAULT_USAGE_MODE,
+    DOMAIN,
+    PLATFORM,
+    UNDO_HISTORY_SIZE,
+    USAGE_MODE_CYCLES,
+)
+from .index import ReplacementRow
+from .kits import ReplacementKits
+from .pools import InventoryPools
+from .profiles import ReplacementProfile
+from .recurrence import RRuleRecurrence, next_date
+from .undo import ReplaceSnapshot
+from .watchdog import watched
+from .workdays import WorkingCalendar
+
+_LOGGER = logging.getLogger(__name__)
+
+# Attributes
+ATTR_DAYS_INTERVAL = "days_interval"
+ATTR_WEEKS_INTERVAL = "weeks_interval"
+ATTR_MONTHS_INTERVAL = "months_interval"
+ATTR_YEARS_INTERVAL = "years_interval"
+ATTR_RRULE = "rrule"
+ATTR_SOON = "soon"
+ATTR_STOCK = "stock"
+ATTR_POOL = "pool"
+ATTR_NEW_DATE = "new_date"
+ATTR_USAGE = "usage"
+ATTR_USAGE_REMAINING = "usage_remaining"
+ATTR_USAGE_DATE = "usage_date"
+ATTR_USAGE_SINCE = "usage_since"
+ATTR_INTERVALS = "intervals"
+ATTR_LAST_REPLACED = "last_replaced"
+ATTR_LEARNED_INTERVAL = "learned_interval"
+ATTR_HISTORY = "history"
+ATTR_ITEM = "item"
+ATTR_ITEMS = "items"
+ATTR_BUCKET = "bucket"
+
+# Services
+SERVICE_STOCK = "renew_stock"
+SERVICE_STOCK_SCHEMA = make_entity_service_schema({vol.Required(ATTR_STOCK): int})
+SERVICE_DATE = "set_date"
+SERVICE_DATE_SCHEMA = make_entity_service_schema(
+    {vol.Required(ATTR_NEW_DATE): cv.string}
+)
+SERVICE_REPLACED = "replace_action"
+SERVICE_REPLACED_SCHEMA = make_entity_service_schema({})
+SERVICE_UNDO = "undo"
+SERVICE_UNDO_SCHEMA = make_entity_service_schema({})
+SERVICE_COMPLETE = "complete_item"
+SERVICE_COMPLETE_SCHEMA = make_entity_service_schema(
+    {vol.Required(ATTR_ITEM): cv.string}
+)
+
+# Buckets of the replacements listed in the to do lists
+TODO_BUCKETS = (BUCKET_EXPIRED, BUCKET_TODAY, BUCKET_SOON)
+
+# Helpers
+ENTITY_ID_FORMAT = PLATFORM + ".{}"
+DATA_UPDATED = "replacements_updated"
+
+
+def _entity_service(
+    entity_class: type[Entity], method: str, with_context: bool = False
+) -> Callable[[Entity, ServiceCall], Awaitable[None]]:
+    """Return the handler of an entity service of one class of sensors.
+
+    The entity services are shared by all the sensors of the platform, e.g.,
+    when called with `entity_id: all` or an area, so the method is only
+    called on the sensors of the given class, and the others are skipped.
+    With `with_context`, the context of the call is also passed.
+    """
+
+    async def async_handle(entity: Entity, call: ServiceCall) -> None:
+        if not isinstance(entity, entity_class):
+            return
+
+        data = {
+            key: value
+            for key, value in call.data.items()
+            if key not in cv.ENTITY_SERVICE_FIELDS
+        }
+        if with_context:
+            data["context"] = call.context
+        await getattr(entity, method)(**data)
+
+    return async_handle
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: config_entries.ConfigEntry,
+    async_add_entities,
+):
+    """Setup sensors from a config entry created in the integrations UI."""
+
+    # Instantiate device and add to the platform
+    store = hass.data[DOMAIN][config_entry.entry_id]
+    pools = hass.data[DOMAIN][DATA_POOLS][config_entry.entry_id]
+    alerts = hass.data[DOMAIN][DATA_ALERTS][config_entry.entry_id]
+    profiles = hass.data[DOMAIN][DATA_PROFILES]
+    kits = ReplacementKits(store.items)
+
+    # The new dates of the entry skip the days without maintenance, if set
+    calendar = WorkingCalendar(
+        config_entry.options.get(CONF_SKIP_WEEKENDS, DEFAULT_SKIP_WEEKENDS),
+        config_entry.options.get(CONF_HOLIDAYS, DEFAULT_HOLIDAYS),
+    )
+
+    replacements = []
+    for entry in store.items.values():
+        if (profile := profiles.profile_for(entry)) is None:
+            _LOGGER.error(
+                "Unknown profile %s of %s", entry[CONF_PROFILE], entry[CONF_NAME]
+            )
+            continue
+        replacement = Replacement(
+            entry,
+            profile,
+            pools,
+            kits,
+            calendar if calendar.enabled else None,
+            alerts,
+        )
+        kits.entities[replacement.unique_id] = replacement
+        replacements.append(replacement)
+
+    # One sensor for each inventory pool in use
+    pool_names = {
+        entry[CONF_POOL] for entry in store.items.values() if entry.get(CONF_POOL)
+    }
+    pool_sensors = [
+        InventoryPool(config_entry.entry_id, pools, name) for name in sorted(pool_names)
+    ]
+
+    # One to do list of the due and soon replacements of the entry
+    todo_lists = []
+    if config_entry.options.get(CONF_TODO, DEFAULT_TODO):
+        todo_lists.append(ReplacementsTodoList(config_entry, replacements))
+
+    async_add_entities(replacements + pool_sensors + todo_lists)
+
+    # Get the platform reference
+    platform = entity_platform.async_get_current_platform()
+
+    ## Register all platform services, each one only applies to its own
+    ##  class of sensors of the platform
+
+    # Register the stock update service
+    platform.async_register_entity_service(
+        SERVICE_STOCK,
+        SERVICE_STOCK_SCHEMA,
+        _entity_service(Replacement, "async_handle_renew_stock"),
+    )
+
+    # Register the set date service
+    platform.async_register_entity_service(
+        SERVICE_DATE,
+        SERVICE_DATE_SCHEMA,
+        _entity_service(Replacement, "async_handle_set_date"),
+    )
+
+    # Register the replacement action service
+    platform.async_register_entity_service(
+        SERVICE_REPLACED,
+        SERVICE_REPLACED_SCHEMA,
+        _entity_service(Replacement, "async_handle_replace_action", True),
+    )
+
+    # Register the undo service
+    platform.async_register_entity_service(
+        SERVICE_UNDO,
+        SERVICE_UNDO_SCHEMA,
+        _entity_service(Replacement, "async_handle_undo"),
+    )
+
+    # Register the service completing an item of a to do list
+    platform.async_register_entity_service(
+        SERVICE_COMPLETE,
+        SERVICE_COMPLETE_SCHEMA,
+        _entity_service(ReplacementsTodoList, "async_handle_complete_item"),
+    )
+
+
+@dataclass
+class ReplacementSensorExtraStoredData(SensorExtraStoredData):
+    """Object to hold extra stored data."""
+
+    stock: int
+    next_date: datetime | None
+    usage: float = 0.0
+    usage_since: date | None = None
+    intervals: IntervalStatistics | None = None
+    last_replaced: date | None = None
+    history: list[ReplaceSnapshot] | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation of the replacement sensor data."""
+        data = super().as_dict()
+
+        data[ATTR_STOCK] = self.stock
+        data[ATTR_DATE] = None
+        if isinstance(self.next_date, (datetime)):
+            data[ATTR_DATE] = self.next_date.isoformat()
+        data[ATTR_USAGE] = self.usage
+        data[ATTR_USAGE_SINCE] = None
+        if isinstance(self.usage_since, date):
+            data[ATTR_USAGE_SINCE] = self.usage_since.isoformat()
+        data[ATTR_INTERVALS] = None
+        if self.intervals is not None:
+            data[ATTR_INTERVALS] = self.intervals.as_dict()
+        data[ATTR_LAST_REPLACED] = None
+        if isinstance(self.last_replaced, date):
+            data[ATTR_LAST_REPLACED] = self.last_replaced.isoformat()
+        data[ATTR_HISTORY] = [snapshot.as_dict() for snapshot in self.history or ()]
+        return data
+
+    @classmethod
+    def from_dict(
+        cls, restored: dict[str, Any]
+    ) -> ReplacementSensorExtraStoredData | None:
+        """Initialize a stored sensor state from a dict."""
+        # Read the default SensorExtraStoredData, i.e., the native_value and
+        # native_unit_of_measurement
+        extra = SensorExtraStoredData.from_dict(restored)
+        if extra is None:
+            return None
+
+        # Read the rest of the parameters
+        try:
+            stock: int = int(restored[ATTR_STOCK])
+            next_date: datetime | None = dt_util.parse_datetime(restored[ATTR_DATE])
+        except KeyError:
+            # restored is a dict, but does not have all values
+            return None
+
+        # The usage and intervals were not stored by previous versions
+        usage = float(restored.get(ATTR_USAGE) or 0)
+        usage_since = None
+        if restored.get(ATTR_USAGE_SINCE) is not None:
+            usage_since = dt_util.parse_date(restored[ATTR_USAGE_SINCE])
+        intervals = IntervalStatistics.from_dict(restored.get(ATTR_INTERVALS))
+        last_replaced = None
+        if restored.get(ATTR_LAST_REPLACED) is not None:
+            last_replaced = dt_util.parse_date(restored[ATTR_LAST_REPLACED])
+        history = [
+            ReplaceSnapshot.from_dict(snapshot)
+            for snapshot in restored.get(ATTR_HISTORY) or ()
+        ]
+
+        return cls(
+            extra.native_value,
+            extra.native_unit_of_measurement,
+            stock,
+            next_date,
+            usage,
+            usage_since,
+            intervals,
+            last_replaced,
+            history,
+        )
+
+
+class Replacement(RestoreSensor):
+    """Representation of a replacement sensor."""
+
+    def __init__(
+        self,
+        replacement: dict[str, str],
+        profile: ReplacementProfile,
+        pools: InventoryPools | None = None,
+        kits: ReplacementKits | None = None,
+        calendar: WorkingCalendar | None = None,
+        alerts: LowStockAlerts | None = None,
+    ) -> None:
+        """Initialize the Replacement sensor."""
+
+        # Save all fields to identify the sensor
+        self._unique_id = replacement[CONF_UNIQUE_ID]
+        self.entity_id = ENTITY_ID_FORMAT.format(self._unique_id)
+        self._name = replacement[CONF_NAME]
+
+        ## Initialize all parameters that might be in the configuration
+
+        # The schedule and display settings, shared by all the replacements
+        #  of the same profile
+        self._profile_id = replacement.get(CONF_PROFILE)
+        self._set_profile(profile)
+
+        # Replacements in an inventory pool use the stock of the pool
+        self._pool = replacement.get(CONF_POOL)
+        self._pools = pools
+
+        # Replacements that wear with use follow the state of another entity
+        self._usage_entity = replacement.get(CONF_USAGE_ENTITY)
+        self._usage_limit = replacement.get(CONF_USAGE_LIMIT)
+        self._usage_mode = replacement.get(CONF_USAGE_MODE, DEFAULT_USAGE_MODE)
+
+        # Replacements in a kit are also replaced with their parent
+        self._parent = replacement.get(CONF_PARENT)
+        self._kits = kits
+
+        # Adaptive replacements are scheduled from the learned intervals
+        self._adaptive = replacement.get(CONF_ADAPTIVE, DEFAULT_ADAPTIVE)
+
+        # New dates are moved to the next working day of the site
+        self._calendar = calendar
+
+        # The stock of a replacement without a pool can raise a low stock
+        #  alert, the reorder level of a pooled one applies to the pool
+        self._reorder_level = replacement.get(CONF_REORDER_LEVEL)
+        self._alerts = alerts
+
+        # Initialize the bucket and icon variables to the normal ones
+        self._bucket = BUCKET_NORMAL
+        self._icon = self._profile.icon_normal
+
+        ## Initialize state and attributes
+
+        # This initialization is usually replaced during state restore
+        self._days_remaining = 0
+        self._date = None
+        self._stock = 0
+
+        # Usage since the last replacement, and the date it is estimated
+        #  to reach the limit
+        self._usage = 0.0
+        self._usage_since = None
+        self._usage_date = None
+
+        # Days between the actual replacements
+        self._intervals = IntervalStatistics()
+        self._last_replaced = None
+
+        # Snapshots before the last replace actions, the oldest are dropped
+        #  once full
+        self._history: deque[ReplaceSnapshot] = deque(maxlen=UNDO_HISTORY_SIZE)
+
+        # Context ID of the last replace action call
+        self._replaced_context: str | None = None
+
+    def _set_profile(self, profile: ReplacementProfile) -> None:
+        """Use the settings of a profile."""
+        self._profile = profile
+
+        # Recurrence rules keep their own iterator over the next occurrences
+        self._recurrence = None
+        if profile.interval_mode == CONF_RRULE:
+            self._recurrence = RRuleRecurrence(profile.interval)
+
+    @callback
+    def _async_profile_changed(self, profile: ReplacementProfile) -> None:
+        """Use the new settings of the profile, keeping the current date."""
+        self._set_profile(profile)
+        self.async_schedule_update_ha_state(True)
+
+    @property
+    def _current_stock(self) -> int:
+        """Return the stock of the replacement, or of its pool."""
+        if self._pool is not None:
+            return self._pools.levels.get(self._pool, 0)
+        return self._stock
+
+    @property
+    def _today(self) -> date:
+        """Return today's date in the configured time zone."""
+        return self.hass.data[DOMAIN][DATA_TODAY].today
+
+    @property
+    def _due_date(self) -> datetime:
+        """Return the replacement date, or the usage date if it is earlier."""
+        if self._usage_date is not None and self._usage_date < self._date:
+            return self._usage_date
+        return self._date
+
+    @callback
+    def _async_usage_changed(self, event: Event) -> None:
+        """Add the usage of a state change of the source entity.
+
+        Only the usage in memory changes, it is written with the state on the
+        next update and persisted with the restore state, so high-frequency
+        sources do not cause a state write per change.
+        """
+        old_state = event.data.get("old_state")
+        new_state = event.data.get("new_state")
+        if old_state is None or new_state is None:
+            return
+        if new_state.state == old_state.state:
+            return
+
+        if self._usage_mode == USAGE_MODE_CYCLES:
+            if new_state.state == STATE_ON:
+                self._usage += 1
+            return
+
+        try:
+            increase = float(new_state.state) - float(old_state.state)
+        except ValueError:
+            return
+
+        # A decrease is a reset of the source, e.g., a daily meter
+        if increase > 0:
+            self._usage += increase
+
+    def _estimate_usage_date(self, today: date) -> datetime | None:
+        """Estimate the date the usage reaches the limit.
+
+        The estimate uses the average usage per day since the last replacement.
+        """
+        if (remaining := self._usage_limit - self._usage) <= 0:
+            due = today
+        else:
+            days = (today - self._usage_since).days
+            if days <= 0 or self._usage <= 0:
+                return None
+            due = today + timedelta(days=ceil(remaining * days / self._usage))
+        return datetime(due.year, due.month, due.day)
+
+    def _calculate_new_date(self):
+        """Calculate a new replacement date according to the defined interval"""
+
+        today = self._today
+
+        # Calculate the new date according to the learned interval, once
+        #  there are enough replacements, or the interval or recurrence rule
+        if self._adaptive and self._intervals.count >= ADAPTIVE_MIN_SAMPLES:
+            new_date = today + timedelta(days=max(1, round(self._intervals.ewma)))
+        elif self._recurrence is None:
+            new_date = next_date(
+                today, self._profile.interval_mode, self._profile.interval
+            )
+        else:
+            new_date = self._recurrence.next_date(today)
+
+        # A finished recurrence rule keeps the last date, or is due today
+        if new_date is None:
+            _LOGGER.warning(
+                "The recurrence rule of %s has no more occurrences", self.entity_id
+            )
+            if self._date is not None:
+                return
+            new_date = today
+
+        if self._calendar is not None:
+            new_date = self._calendar.next_working_day(new_date)
+
+        # Replace new date with datetime
+        self._date = datetime(new_date.year, new_date.month, new_date.day)
+
+    @watched
+    async def async_added_to_hass(self):
+        """Run when entity about to be added."""
+        await super().async_added_to_hass()
+
+        # Recover last sensor data
+        restored = await self.async_get_last_sensor_data()
+
+        if restored is None or restored.next_date is None:
+            # We need to ensure a new date is calculated if the restored
+            #  data is non-existent or corrupted
+            self._calculate_new_date()
+        else:
+            # Restore all saved attributes
+            self._days_remaining = restored.native_value
+            self._stock = restored.stock
+            self._date = restored.next_date
+            self._usage = restored.usage
+            self._usage_since = restored.usage_since
+            self._intervals = restored.intervals or IntervalStatistics()
+            self._last_replaced = restored.last_replaced
+            self._history.extend(restored.history or ())
+
+        if self._usage_entity is not None:
+            if self._usage_since is None:
+                self._usage_since = self._today
+            self.async_on_remove(
+                async_track_state_change_event(
+                    self.hass, [self._usage_entity], self._async_usage_changed
+                )
+            )
+
+        if self._profile_id is not None:
+            self.async_on_remove(
+                self.hass.data[DOMAIN][DATA_PROFILES].async_listen(
+                    self._profile_id, self._async_profile_changed
+                )
+            )
+
+        self._async_update_index()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Run when entity will be removed."""
+        self.hass.data[DOMAIN][DATA_INDEX].async_remove(self.entity_id)
+
+    @callback
+    def _async_update_index(self) -> None:
+        """Publish the current summary of the replacement."""
+        self.hass.data[DOMAIN][DATA_INDEX].async_update(
+            ReplacementRow(
+                self.entity_id,
+                self._name,
+                self._due_date.date().toordinal(),
+                self._days_remaining,
+                self._current_stock,
+                self._bucket,
+            )
+        )
+
+        # The alert only notifies its binary sensor when the level is crossed
+        if self._alerts is not None and self._reorder_level is not None:
+            if self._pool is None:
+                self._alerts.async_update(
+                    self._unique_id, self._stock, self._reorder_level
+                )
+
+    @property
+    def unique_id(self):
+        """Return a unique ID to use for this sensor."""
+        return self._unique_id
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return self._name
+
+    @property
+    def device_class(self):
+        """Return the device class of the sensor."""
+        if self._profile.timestamp:
+            return SensorDeviceClass.TIMESTAMP
+        return None
+
+    @property
+    def native_value(self):
+        """Return the state of the sensor."""
+        # The next date only changes on replacements, unlike the days
+        #  remaining, which change every day
+        if self._profile.timestamp:
+            return dt_util.start_of_local_day(self._due_date.date())
+        return self._days_remaining
+
+    @property
+    def native_unit_of_measurement(self):
+        """Return the unit the value is expressed in."""
+        if self._profile.timestamp:
+            return None
+        return self._profile.unit_of_measurement
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes of the sensor."""
+        res = {}
+
+        # Return the interval according to the mode, the attribute
+        #  names match the configuration keys. The pool, profile and parent
+        #  never change, and are recorded with every state, so they are
+        #  only kept in the configuration
+        res[self._profile.interval_mode] = self._profile.interval
+
+        # Return all other attributes, the stock of a pool is in its own
+        #  sensor, so using it does not change all the replacements
+        res[ATTR_DATE] = self._date.strftime("%Y-%m-%d")
+        if self._pool is None:
+            res[ATTR_STOCK] = self._stock
+
+        # Return the usage, rounded to avoid changing the attributes with
+        #  every small increase of the source
+        if self._usage_entity is not None:
+            res[ATTR_USAGE] = round(self._usage, 1)
+            res[ATTR_USAGE_REMAINING] = round(
+                max(0.0, self._usage_limit - self._usage), 1
+            )
+            res[ATTR_USAGE_DATE] = None
+            if self._usage_date is not None:
+                res[ATTR_USAGE_DATE] = self._usage_date.strftime("%Y-%m-%d")
+
+        # Return the learned interval, in days, the other statistics are
+        #  only kept in the restore data, so they are not recorded
+        if self._adaptive:
+            res[ATTR_LEARNED_INTERVAL] = round(self._intervals.ewma, 1)
+        return res
+
+    @property
+    def icon(self):
+        return self._icon
+
+    @property
+    def extra_restore_state_data(self) -> ReplacementSensorExtraStoredData:
+        """Return sensor specific state data to be restored."""
+        return ReplacementSensorExtraStoredData(
+            self._days_remaining,
+            self._profile.unit_of_measurement,
+            self._stock,
+            self._date,
+            self._usage,
+            self._usage_since,
+            self._intervals,
+            self._last_replaced,
+            list(self._history),
+        )
+
+    async def async_get_last_sensor_data(
+        self,
+    ) -> ReplacementSensorExtraStoredData | None:
+        """Restore Replacement Sensor Extra Stored Data."""
+        if (restored_last_extra_data := await self.async_get_last_extra_data()) is None:
+            return None
+
+        return ReplacementSensorExtraStoredData.from_dict(
+            restored_last_extra_data.as_dict()
+        )
+
+    @watched
+    async def async_handle_renew_stock(self, stock=-1) -> None:
+        """Assign the new available stock"""
+        if self._pool is not None:
+            await self._pools.async_set(self._pool, stock)
+        else:
+            self._stock = stock
+        self._async_update_index()
+        await self.async_update_ha_state()
+
+    @watched
+    async def async_handle_set_date(self, new_date=None) -> None:
+        """Assign a new date to replace"""
+
+        # Verify the date is in the correct format
+        try:
+            try_date = datetime.strptime(new_date, "%Y-%m-%d")
+        except ValueError as wrong_date_format:
+            _LOGGER.warning('Invalid date, please input a date in format "YYYY-MM-DD"')
+            raise AttributeError from wrong_date_format
+
+        # Make sure the new date is not in the past
+        if (try_date.date() - self._today).days < 0:
+            _LOGGER.warning("Invalid date, please input a date that is not in the past")
+            raise ValueError
+
+        # Assign the new date and update the state
+        self._date = try_date
+        self._async_update_index()
+        await self.async_update_ha_state()
+
+    @property
+    def kit_parts(self) -> list[Replacement]:
+        """Return the loaded parts of the kit of the replacement, if any."""
+        if self._kits is None:
+            return []
+        return [
+            entity
+            for unique_id in self._kits.descendants(self._unique_id)
+            if (entity := self._kits.entities.get(unique_id)) is not None
+            and entity.hass is not None
+        ]
+
+    @watched
+    async def async_handle_replace_action(self, context: Context | None = None) -> None:
+        """Handle what happens when a replacement occurs"""
+
+        # The parts of a kit are replaced with it, parents before children
+        replacements = [self, *self.kit_parts]
+
+        # A call can target a kit and its parts, e.g., with `entity_id: all`,
+        #  each one is only replaced once per call. They are all marked
+        #  before any await, since the targets are replaced concurrently
+        if context is not None:
+            replacements = [
+                replacement
+                for replacement in replacements
+                if replacement._replaced_context != context.id
+            ]
+            if not replacements or replacements[0] is not self:
+                return
+            for replacement in replacements:
+                replacement._replaced_context = context.id
+        parts = replacements[1:]
+
+        await self.async_replace(parts=tuple(part.unique_id for part in parts))
+        for part in parts:
+            await part.async_replace(kit=self._unique_id)
+
+        for replacement in replacements:
+            await replacement.async_update()
+
+        # Write the states of the whole kit at once
+        for replacement in replacements:
+            replacement.async_write_ha_state()
+
+    async def async_replace(
+        self, kit: str | None = None, parts: tuple[str, ...] = ()
+    ) -> None:
+        """Replace the part, without writing the state.
+
+        The kit it is replaced with, or the parts replaced with it, are kept
+        to undo the whole kit at once.
+        """
+
+        # Keep everything the replacement changes, to undo it
+        self._history.append(
+            ReplaceSnapshot(
+                self._date.toordinal(),
+                self._current_stock,
+                replace(self._intervals),
+                self._last_replaced,
+                self._usage,
+                self._usage_since,
+                kit,
+                parts,
+            )
+        )
+
+        # Learn the interval since the previous replacement, several
+        #  replacements on the same day count once
+        today = self._today
+        if self._last_replaced is not None:
+            if (days := (today - self._last_replaced).days) > 0:
+                self._intervals.add(days)
+        self._last_replaced = today
+
+        # Calculate new date from today
+        self._calculate_new_date()
+
+        # The usage starts again with the new part
+        self._usage = 0.0
+        self._usage_since = today
+        self._usage_date = None
+
+        # Decrement the stock
+        if self._pool is not None:
+            await self._pools.async_consume(self._pool)
+        elif self._stock > 0:
+            self._stock = self._stock - 1
+
+        self._async_update_index()
+
+    @watched
+    async def async_handle_undo(self) -> None:
+        """Restore the replacement before the last replace action"""
+        if not self._history:
+            _LOGGER.warning("No replace action of %s to undo", self.entity_id)
+            raise ValueError
+
+        # The parts replaced with the kit are restored with it, unless they
+        #  were replaced or restored on their own since
+        snapshot = self._history.pop()
+        parts = [
+            part
+            for part in self.kit_parts
+            if part.unique_id in snapshot.parts
+            and part._history
+            and part._history[-1].kit == self._unique_id
+            and part._last_replaced == self._last_replaced
+        ]
+        replacements = [self, *parts]
+
+        await self.async_restore(snapshot)
+        for part in parts:
+            await part.async_restore(part._history.pop())
+
+        # Write the states of the whole kit at once
+        for replacement in replacements:
+            await replacement.async_update()
+        for replacement in replacements:
+            replacement.async_write_ha_state()
+
+    async def async_restore(self, snapshot: ReplaceSnapshot) -> None:
+        """Restore the part from a snapshot, without writing the state."""
+        self._date = datetime.fromordinal(snapshot.ordinal)
+
+        # A part taken from a pool is given back, other replacements may have
+        #  changed the pool since
+        if self._pool is not None:
+            if snapshot.stock > 0:
+                await self._pools.async_release(self._pool)
+        else:
+            self._stock = snapshot.stock
+
+        self._intervals = snapshot.intervals
+        self._last_replaced = snapshot.last_replaced
+        self._usage = snapshot.usage
+        self._usage_since = snapshot.usage_since
+        self._usage_date = None
+
+    @watched
+    async def async_update(self) -> None:
+        """update the sensor"""
+        # Get today's date and calculate remaining days
+        today = self._today
+        if self._usage_entity is not None:
+            self._usage_date = self._estimate_usage_date(today)
+        days_remaining = (self._due_date.date() - today).days
+
+        # Assign bucket and icon according to number of days remaining
+        if days_remaining < 0:
+            self._bucket = BUCKET_EXPIRED
+            self._icon = self._profile.icon_expired
+        elif days_remaining == 0:
+            self._bucket = BUCKET_TODAY
+            self._icon = self._profile.icon_today
+        elif days_remaining <= self._profile.soon:
+            self._bucket = BUCKET_SOON
+            self._icon = self._profile.icon_soon
+        else:
+            self._bucket = BUCKET_NORMAL
+            self._icon = self._profile.icon_normal
+
+        # Update internal state
+        self._days_remaining = days_remaining
+        self._async_update_index()
+
+
+class InventoryPool(SensorEntity):
+    """Representation of the stock of an inventory pool."""
+
+    _attr_should_poll = False
+    _attr_icon = DEFAULT_ICON_POOL
+
+    def __init__(self, entry_id: str, pools: InventoryPools, pool: str) -> None:
+        """Initialize the pool sensor."""
+        self._pools = pools
+        self._pool = pool
+        self._attr_name = f"{pool} pool"
+        self._attr_unique_id = f"{entry_id}_pool_{pool}"
+
+    async def async_added_to_hass(self) -> None:
+        """Run when entity about to be added."""
+        self.async_on_remove(
+            self._pools.async_listen(self._pool, self.async_write_ha_state)
+        )
+
+    @property
+    def native_value(self) -> int:
+        """Return the stock of the pool."""
+        return self._pools.levels.get(self._pool, 0)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes of the sensor."""
+        return {ATTR_POOL: self._pool}
+
+
+class ReplacementsTodoList(SensorEntity):
+    """To do list of the replacements of an entry that are due or soon.
+
+    The state is the number of items. The items are updated from the
+    changed rows of the index, so only the replacements that changed are
+    visited, and the state is only written, and the sorted list of items
+    rebuilt, when an item changed.
+    """
+
+    _attr_should_poll = False
+    _attr_icon = DEFAULT_ICON_TODO
+
+    def __init__(
+        self, config_entry: config_entries.ConfigEntry, replacements: list[Replacement]
+    ) -> None:
+        """Initialize the to do list sensor."""
+        self._replacements = replacements
+        self._entities: dict[str, Replacement] = {}
+        self._items: dict[str, dict[str, Any]] = {}
+        self._attr_extra_state_attributes = {ATTR_ITEMS: []}
+        self._attr_name = f"{config_entry.title} to do"
+        self._attr_unique_id = f"{config_entry.entry_id}_todo"
+
+    @property
+    def _by_entity_id(self) -> dict[str, Replacement]:
+        """Return the replacements of the entry, by entity ID."""
+        # The replacements get their entity IDs as they are added
+        if len(self._entities) < len(self._replacements):
+            self._entities = {
+                replacement.entity_id: replacement
+                for replacement in self._replacements
+                if replacement.entity_id is not None
+            }
+        return self._entities
+
+    async def async_added_to_hass(self) -> None:
+        """Run when entity about to be added."""
+        index = self.hass.data[DOMAIN][DATA_INDEX]
+        for row in index.rows.values():
+            if row.entity_id in self._by_entity_id:
+                self._set_item(row)
+        self._sort_items()
+        self.async_on_remove(index.async_listen(self._async_rows_changed))
+
+    def _sort_items(self) -> None:
+        """Sort the items of the attributes, by date and name."""
+        self._attr_extra_state_attributes = {
+            ATTR_ITEMS: sorted(
+                self._items.values(),
+                key=lambda item: (item[ATTR_DATE], item[ATTR_NAME]),
+            )
+        }
+
+    def _set_item(self, row: ReplacementRow) -> bool:
+        """Add, change or remove the item of a row, return True if it changed."""
+        if row.bucket not in TODO_BUCKETS:
+            return self._items.pop(row.entity_id, None) is not None
+
+        item = {
+            ATTR_NAME: row.name,
+            ATTR_ENTITY_ID: row.entity_id,
+            ATTR_BUCKET: row.bucket,
+            ATTR_DATE: date.fromordinal(row.date).isoformat(),
+        }
+        if self._items.get(row.entity_id) == item:
+            return False
+        self._items[row.entity_id] = item
+        return True
+
+    @callback
+    def _async_rows_changed(
+        self, changed: list[ReplacementRow], removed: list[str]
+    ) -> None:
+        """Update the items of the changed replacements of the entry."""
+        updated = False
+        for row in changed:
+            if row.entity_id in self._by_entity_id:
+                updated |= self._set_item(row)
+        for entity_id in removed:
+            updated |= self._items.pop(entity_id, None) is not None
+
+        if updated:
+            self._sort_items()
+            self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of items."""
+        return len(self._items)
+
+    async def async_handle_complete_item(self, item: str) -> None:
+        """Complete an item, by name or entity ID, replacing it"""
+        entity_id = next(
+            (
+                entity_id
+                for entity_id, listed in self._items.items()
+                if item in (entity_id, listed[ATTR_NAME])
+            ),
+            None,
+        )
+        if entity_id is None:
+            _LOGGER.warning("No item %s in %s", item, self.entity_id)
+            raise ValueError
+
+        await self._by_entity_id[entity_id].async_handle_replace_action()
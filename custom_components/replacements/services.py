@@ -0,0 +1,475 @@
+"""Integration services of the Replacements integration."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import date
+
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.const import (
+    ATTR_AREA_ID,
+    ATTR_DATE,
+    ATTR_ENTITY_ID,
+    ATTR_NAME,
+    CONF_NAME,
+    CONF_UNIT_OF_MEASUREMENT,
+)
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.helpers import entity_registry as er
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.entity_component import DATA_INSTANCES
+import voluptuous as vol
+
+from .config_flow import validate_rrule, validate_soon
+from .const import (
+    BUCKETS,
+    CONF_DAYS_INTERVAL,
+    CONF_ICON_EXPIRED,
+    CONF_ICON_NORMAL,
+    CONF_ICON_SOON,
+    CONF_ICON_TODAY,
+    CONF_INTERVAL_EXCLUSION_ERROR,
+    CONF_MONTHS_INTERVAL,
+    CONF_POOL,
+    CONF_RRULE,
+    CONF_SOON,
+    CONF_TIMESTAMP,
+    CONF_WEEKS_INTERVAL,
+    CONF_YEARS_INTERVAL,
+    DATA_GROUPS,
+    DATA_INDEX,
+    DATA_PROFILES,
+    DATA_TODAY,
+    DEFAULT_ICON_EXPIRED,
+    DEFAULT_ICON_NORMAL,
+    DEFAULT_ICON_SOON,
+    DEFAULT_ICON_TODAY,
+    DEFAULT_SOON,
+    DEFAULT_TIMESTAMP,
+    DEFAULT_UNIT_OF_MEASUREMENT,
+    DOMAIN,
+    EVENT_PROJECTION_RESULT,
+    EVENT_QUERY_RESULT,
+    EVENT_SIMULATION_RESULT,
+    GROUP_INTERVAL,
+    INTERVAL_MODES,
+    INTERVAL_SCHEMA,
+    PLATFORM,
+    SIMULATION_MAX_DAYS,
+)
+from .index import ReplacementRow
+from .profiles import ReplacementProfile
+from .projection import ATTR_REPLACEMENTS, ProjectionItem, project
+from .simulation import SimulationItem, simulate
+from .watchdog import watched
+
+# Service fields
+ATTR_START_DATE = "start_date"
+ATTR_END_DATE = "end_date"
+ATTR_STOCK_BELOW = "stock_below"
+ATTR_QUERY_ID = "query_id"
+ATTR_DAYS_REMAINING = "days_remaining"
+ATTR_STOCK = "stock"
+ATTR_MONTHS = "months"
+ATTR_PROFILE = "profile"
+ATTR_DAYS = "days"
+ATTR_BUCKET = "bucket"
+
+# Services
+SERVICE_QUERY = "query"
+SERVICE_QUERY_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_START_DATE): cv.date,
+            vol.Optional(ATTR_END_DATE): cv.date,
+            vol.Optional(ATTR_STOCK_BELOW): vol.Coerce(int),
+            vol.Optional(ATTR_AREA_ID): cv.string,
+            vol.Optional(ATTR_QUERY_ID): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key(
+        ATTR_START_DATE, ATTR_END_DATE, ATTR_STOCK_BELOW, ATTR_AREA_ID
+    ),
+)
+
+SERVICE_REPLACE_AREA = "replace_area"
+SERVICE_REPLACE_AREA_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_AREA_ID): cv.string,
+        vol.Optional(ATTR_BUCKET): vol.All(cv.ensure_list, [vol.In(BUCKETS)]),
+    }
+)
+SERVICE_PROJECT = "project"
+SERVICE_PROJECT_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_MONTHS, default=12): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=60)
+        ),
+        vol.Optional(ATTR_QUERY_ID): cv.string,
+    }
+)
+
+
+def _validate_rrule(config: dict) -> dict:
+    """Validate the recurrence rule, if present."""
+    try:
+        validate_rrule(config)
+    except ValueError as err:
+        raise vol.Invalid("Invalid recurrence rule", path=[CONF_RRULE]) from err
+    return config
+
+
+SERVICE_SIMULATE = "simulate"
+SERVICE_SIMULATE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_DAYS, default=365): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=SIMULATION_MAX_DAYS)
+            ),
+            vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+            vol.Exclusive(
+                CONF_DAYS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+            ): cv.positive_int,
+            vol.Exclusive(
+                CONF_WEEKS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+            ): cv.positive_int,
+            vol.Exclusive(
+                CONF_MONTHS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+            ): cv.positive_int,
+            vol.Exclusive(
+                CONF_YEARS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+            ): cv.positive_int,
+            vol.Exclusive(
+                CONF_RRULE, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+            ): cv.string,
+            vol.Optional(CONF_SOON): cv.positive_int,
+            vol.Optional(ATTR_QUERY_ID): cv.string,
+        }
+    ),
+    _validate_rrule,
+)
+
+SERVICE_SET_PROFILE = "set_profile"
+
+
+def _validate_profile(config: dict) -> dict:
+    """Validate the rule and soon interval of a profile."""
+    # Without the profile key, which only skips the soon interval validation
+    #  of replacements using a profile
+    settings = {key: value for key, value in config.items() if key != ATTR_PROFILE}
+    _validate_rrule(settings)
+    try:
+        validate_soon(settings)
+    except ValueError as err:
+        raise vol.Invalid(
+            "The soon interval cannot be longer than the interval", path=[CONF_SOON]
+        ) from err
+    return config
+
+
+SERVICE_SET_PROFILE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(ATTR_PROFILE): cv.slug,
+            vol.Exclusive(
+                CONF_DAYS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+            ): cv.positive_int,
+            vol.Exclusive(
+                CONF_WEEKS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+            ): cv.positive_int,
+            vol.Exclusive(
+                CONF_MONTHS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+            ): cv.positive_int,
+            vol.Exclusive(
+                CONF_YEARS_INTERVAL, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+            ): cv.positive_int,
+            vol.Exclusive(
+                CONF_RRULE, GROUP_INTERVAL, msg=CONF_INTERVAL_EXCLUSION_ERROR
+            ): cv.string,
+            vol.Optional(CONF_SOON, default=DEFAULT_SOON): cv.positive_int,
+            vol.Optional(CONF_ICON_NORMAL, default=DEFAULT_ICON_NORMAL): cv.icon,
+            vol.Optional(CONF_ICON_SOON, default=DEFAULT_ICON_SOON): cv.icon,
+            vol.Optional(CONF_ICON_TODAY, default=DEFAULT_ICON_TODAY): cv.icon,
+            vol.Optional(CONF_ICON_EXPIRED, default=DEFAULT_ICON_EXPIRED): cv.icon,
+            vol.Optional(
+                CONF_UNIT_OF_MEASUREMENT, default=DEFAULT_UNIT_OF_MEASUREMENT
+            ): cv.string,
+            vol.Optional(CONF_TIMESTAMP, default=DEFAULT_TIMESTAMP): cv.boolean,
+        }
+    ),
+    INTERVAL_SCHEMA,
+    _validate_profile,
+)
+
+
+def _row_data(row: ReplacementRow) -> dict:
+    """Return the event data of a row."""
+    return {
+        ATTR_ENTITY_ID: row.entity_id,
+        ATTR_NAME: row.name,
+        ATTR_DATE: date.fromordinal(row.date).isoformat(),
+        ATTR_DAYS_REMAINING: row.days_remaining,
+        ATTR_STOCK: row.stock,
+    }
+
+
+@callback
+def async_register_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_handle_query(call: ServiceCall) -> None:
+        """Handle the query service."""
+        async_query(hass, call)
+
+    async def async_handle_project(call: ServiceCall) -> None:
+        """Handle the project service."""
+        await async_project(hass, call)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_QUERY, async_handle_query, SERVICE_QUERY_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROJECT, async_handle_project, SERVICE_PROJECT_SCHEMA
+    )
+
+    async def async_handle_simulate(call: ServiceCall) -> None:
+        """Handle the simulate service."""
+        await async_simulate(hass, call)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_SIMULATE, async_handle_simulate, SERVICE_SIMULATE_SCHEMA
+    )
+
+    async def async_handle_replace_area(call: ServiceCall) -> None:
+        """Handle the replace area service."""
+        await async_replace_area(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REPLACE_AREA,
+        async_handle_replace_area,
+        SERVICE_REPLACE_AREA_SCHEMA,
+    )
+
+    async def async_handle_set_profile(call: ServiceCall) -> None:
+        """Handle the set profile service."""
+        async_set_profile(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_PROFILE,
+        async_handle_set_profile,
+        SERVICE_SET_PROFILE_SCHEMA,
+    )
+
+
+@watched
+@callback
+def async_query(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Find the replacements due in a date range or low on stock.
+
+    Services cannot return data in this version of Home Assistant, so the
+    results are fired in an event with the context of the service call.
+    """
+    index = hass.data[DOMAIN][DATA_INDEX]
+    rows: dict[str, ReplacementRow] = {}
+    by_date = ATTR_START_DATE in call.data or ATTR_END_DATE in call.data
+    start = call.data.get(ATTR_START_DATE)
+    end = call.data.get(ATTR_END_DATE)
+    start, end = start and start.toordinal(), end and end.toordinal()
+
+    if ATTR_AREA_ID in call.data:
+        # Only the members of the area are visited, matching any of the
+        #  other filters, or all of them without other filters
+        members = hass.data[DOMAIN][DATA_GROUPS].members(call.data[ATTR_AREA_ID])
+        stock_below = call.data.get(ATTR_STOCK_BELOW)
+        for row in index.rows_of(members):
+            due = (
+                by_date
+                and (start is None or row.date >= start)
+                and (end is None or row.date <= end)
+            )
+            low = stock_below is not None and row.stock < stock_below
+            if due or low or (not by_date and stock_below is None):
+                rows[row.entity_id] = row
+
+    else:
+        if by_date:
+            for row in index.due_between(start, end):
+                rows[row.entity_id] = row
+
+        if ATTR_STOCK_BELOW in call.data:
+            for row in index.stock_below(call.data[ATTR_STOCK_BELOW]):
+                rows[row.entity_id] = row
+
+    hass.bus.async_fire(
+        EVENT_QUERY_RESULT,
+        {
+            ATTR_QUERY_ID: call.data.get(ATTR_QUERY_ID),
+            ATTR_REPLACEMENTS: [
+                _row_data(row)
+                for row in sorted(
+                    rows.values(), key=lambda row: (row.date, row.entity_id)
+                )
+            ],
+        },
+        context=call.context,
+    )
+
+
+@watched
+async def async_replace_area(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Replace the replacements of an area, optionally only in some buckets.
+
+    Like the replace action service called on each of them, except for the
+    parts of kits in the area, which are already replaced with their kit.
+    """
+    index = hass.data[DOMAIN][DATA_INDEX]
+    component = hass.data[DATA_INSTANCES][SENSOR_DOMAIN]
+    members = hass.data[DOMAIN][DATA_GROUPS].members(call.data[ATTR_AREA_ID])
+    buckets = call.data.get(ATTR_BUCKET, BUCKETS)
+
+    replacements = [
+        entity
+        for row in sorted(index.rows_of(members))
+        if row.bucket in buckets
+        and (entity := component.get_entity(row.entity_id)) is not None
+    ]
+    parts = {
+        part.entity_id for replacement in replacements for part in replacement.kit_parts
+    }
+
+    for replacement in replacements:
+        if replacement.entity_id not in parts:
+            await replacement.async_handle_replace_action()
+
+
+@watched
+@callback
+def async_set_profile(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Add or change a profile, updating all of its replacements."""
+    hass.data[DOMAIN][DATA_PROFILES].async_set(call.data[ATTR_PROFILE], call.data)
+
+
+@callback
+def _async_loaded_replacements(
+    hass: HomeAssistant,
+) -> Iterator[tuple[ReplacementRow, str, ReplacementProfile, str | None]]:
+    """Yield the row, name, profile and pool of all the loaded replacements.
+
+    The pool is the entity ID of the pool sensor, since the pools of each
+    entry are separate even with the same name.
+    """
+    registry = er.async_get(hass)
+    rows = hass.data[DOMAIN][DATA_INDEX].rows
+    profiles = hass.data[DOMAIN][DATA_PROFILES]
+
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if (store := hass.data[DOMAIN].get(entry.entry_id)) is None:
+            continue
+
+        for unique_id, replacement in store.items.items():
+            entity_id = registry.async_get_entity_id(PLATFORM, DOMAIN, unique_id)
+            if (row := rows.get(entity_id)) is None:
+                continue
+
+            pool_id = None
+            if pool := replacement.get(CONF_POOL):
+                pool_id = registry.async_get_entity_id(
+                    PLATFORM, DOMAIN, f"{entry.entry_id}_pool_{pool}"
+                )
+
+            profile = profiles.profile_for(replacement)
+            yield row, replacement[CONF_NAME], profile, pool_id
+
+
+@callback
+def _async_projection_items(hass: HomeAssistant) -> tuple[ProjectionItem, ...]:
+    """Return the projection items of all the loaded replacements."""
+    return tuple(
+        sorted(
+            ProjectionItem(
+                row.entity_id,
+                name,
+                row.date,
+                profile.interval_mode,
+                profile.interval,
+                row.stock,
+                pool_id,
+            )
+            for row, name, profile, pool_id in _async_loaded_replacements(hass)
+        )
+    )
+
+
+@callback
+def _async_simulation_items(
+    hass: HomeAssistant, call: ServiceCall
+) -> tuple[SimulationItem, ...]:
+    """Return the simulation items, with the changes of the service call.
+
+    The changes only apply to the given entities, or to all of them. A new
+    interval applies from the next replacement on, the current dates stay.
+    """
+    entity_ids = call.data.get(ATTR_ENTITY_ID)
+    mode = next((mode for mode in INTERVAL_MODES if mode in call.data), None)
+    items = []
+
+    for row, _name, profile, _pool_id in _async_loaded_replacements(hass):
+        item = SimulationItem(
+            row.entity_id,
+            row.date,
+            profile.interval_mode,
+            profile.interval,
+            profile.soon,
+        )
+        if entity_ids is None or row.entity_id in entity_ids:
+            if mode is not None:
+                item = item._replace(mode=mode, interval=call.data[mode])
+            if CONF_SOON in call.data:
+                item = item._replace(soon=call.data[CONF_SOON])
+        items.append(item)
+
+    return tuple(items)
+
+
+@watched
+async def async_project(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Project the replacements of the next months and compare with the stock.
+
+    The projection runs in the executor, and the results are fired in an
+    event with the context of the service call, like the query service.
+    """
+    projection = await hass.async_add_executor_job(
+        project,
+        _async_projection_items(hass),
+        hass.data[DOMAIN][DATA_TODAY].today,
+        call.data[ATTR_MONTHS],
+    )
+
+    hass.bus.async_fire(
+        EVENT_PROJECTION_RESULT,
+        {ATTR_QUERY_ID: call.data.get(ATTR_QUERY_ID), **projection},
+        context=call.context,
+    )
+
+
+@watched
+async def async_simulate(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Simulate the daily buckets of the replacements with other settings.
+
+    The simulation runs on a copy of the current schedules in the executor,
+    so the replacements are never changed, and the results are fired in an
+    event with the context of the service call, like the query service.
+    """
+    simulation = await hass.async_add_executor_job(
+        simulate,
+        _async_simulation_items(hass, call),
+        hass.data[DOMAIN][DATA_TODAY].today,
+        call.data[ATTR_DAYS],
+    )
+
+    hass.bus.async_fire(
+        EVENT_SIMULATION_RESULT,
+        {ATTR_QUERY_ID: call.data.get(ATTR_QUERY_ID), **simulation},
+        context=call.context,
+    )
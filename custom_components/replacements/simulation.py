@@ -0,0 +1,114 @@
+"""What-if simulation of the replacement buckets, e.g., to tune the intervals."""
+from __future__ import annotations
+
+from array import array
+from datetime import date
+from itertools import accumulate
+from typing import Any, NamedTuple
+
+from .const import (
+    BUCKET_EXPIRED,
+    BUCKET_NORMAL,
+    BUCKET_SOON,
+    BUCKET_TODAY,
+    CONF_DAYS_INTERVAL,
+    CONF_RRULE,
+    CONF_WEEKS_INTERVAL,
+)
+from .recurrence import RRuleRecurrence, next_date
+
+# Simulation fields
+ATTR_BUCKETS = "buckets"
+ATTR_REPLACEMENTS = "replacements"
+ATTR_START = "start"
+
+# Interval modes with a fixed number of days
+FIXED_DAYS = {CONF_DAYS_INTERVAL: 1, CONF_WEEKS_INTERVAL: 7}
+
+
+class SimulationItem(NamedTuple):
+    """Schedule of a replacement, as needed for the simulation."""
+
+    entity_id: str
+    date: int
+    mode: str
+    interval: Any
+    soon: int
+
+
+def _next_ordinal(
+    item: SimulationItem, current: int, recurrence: RRuleRecurrence | None
+) -> int | None:
+    """Return the date ordinal of the replacement following current."""
+    if (days := FIXED_DAYS.get(item.mode)) is not None:
+        return current + days * item.interval
+
+    current_date = date.fromordinal(current)
+    if recurrence is None:
+        return next_date(current_date, item.mode, item.interval).toordinal()
+    if (following := recurrence.next_date(current_date)) is None:
+        return None
+    return following.toordinal()
+
+
+def simulate(
+    items: tuple[SimulationItem, ...], today: date, days: int
+) -> dict[str, Any]:
+    """Count the replacements in each bucket, for every day from today on.
+
+    Every replacement is assumed to happen on its due date, and overdue
+    replacements today. Instead of stepping every item through every day,
+    each replacement adds its "soon" days as a range to a difference array,
+    so the cost grows with the number of replacements, not the horizon.
+    """
+    start = today.toordinal()
+    end = start + days
+    expired = array("l", [0]) * days
+    due_today = array("l", [0]) * days
+    soon_changes = array("l", [0]) * (days + 1)
+    replacements = 0
+
+    for item in items:
+        recurrence = RRuleRecurrence(item.interval) if item.mode == CONF_RRULE else None
+        due: int | None = item.date
+        previous = start - 1
+
+        # Overdue replacements are expired today, and replaced
+        if due < start:
+            expired[0] += 1
+            replacements += 1
+            previous = start
+            due = _next_ordinal(item, start, recurrence)
+
+        while due is not None:
+            # Soon from the soon days before the date, but after the last one
+            soon_start = max(previous + 1, due - item.soon)
+            if soon_start >= end:
+                break
+            soon_changes[soon_start - start] += 1
+            if due >= end:
+                soon_changes[days] -= 1
+                break
+
+            soon_changes[due - start] -= 1
+            due_today[due - start] += 1
+            replacements += 1
+            previous = due
+            due = _next_ordinal(item, due, recurrence)
+
+    soon = array("l", accumulate(soon_changes[:days]))
+    normal = [
+        len(items) - counts[0] - counts[1] - counts[2]
+        for counts in zip(expired, due_today, soon)
+    ]
+
+    return {
+        ATTR_START: today.isoformat(),
+        ATTR_REPLACEMENTS: replacements,
+        ATTR_BUCKETS: {
+            BUCKET_EXPIRED: expired.tolist(),
+            BUCKET_TODAY: due_today.tolist(),
+            BUCKET_SOON: soon.tolist(),
+            BUCKET_NORMAL: normal,
+        },
+    }
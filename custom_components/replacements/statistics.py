@@ -0,0 +1,117 @@
+"""Long-term statistics of the Replacements integration."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import CONF_NAME
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_utc_time_change
+
+from .const import BUCKET_EXPIRED, DATA_INDEX, DOMAIN, PLATFORM, STATISTICS_IMPORT_HOURS
+from .storage import ReplacementsStore
+
+# Statistic IDs
+STATISTIC_STOCK = DOMAIN + ":{}_stock"
+STATISTIC_OVERDUE = DOMAIN + ":overdue_{}"
+
+
+class ReplacementsStatistics:
+    """Hourly stock levels and overdue count of a config entry.
+
+    The samples are kept in memory and imported into the recorder as
+    external statistics every STATISTICS_IMPORT_HOURS, so each statistic
+    costs a single recorder job per batch instead of a state per change.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry_id: str, store: ReplacementsStore
+    ) -> None:
+        """Initialize the statistics of a config entry."""
+        self._hass = hass
+        self._entry_id = entry_id
+        self._store = store
+        self._metadata: dict[str, StatisticMetaData] = {}
+        self._pending: dict[str, list[StatisticData]] = {}
+        self._pending_hours = 0
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start sampling at the start of every hour."""
+        self._unsub = async_track_utc_time_change(
+            self._hass, self._async_sample, minute=0, second=0
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop sampling and import the pending samples."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._async_import()
+
+    @callback
+    def _async_add(
+        self, statistic_id: str, name: str, start: datetime, value: float
+    ) -> None:
+        """Add a sample of a statistic for the hour starting at start."""
+        if statistic_id not in self._metadata:
+            self._metadata[statistic_id] = StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=name,
+                source=DOMAIN,
+                statistic_id=statistic_id,
+                unit_of_measurement=None,
+            )
+        self._pending.setdefault(statistic_id, []).append(
+            StatisticData(start=start, mean=value, min=value, max=value, state=value)
+        )
+
+    @callback
+    def _async_sample(self, now: datetime) -> None:
+        """Sample the hour that just ended."""
+        start = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+        registry = er.async_get(self._hass)
+        rows = self._hass.data[DOMAIN][DATA_INDEX].rows
+        overdue = 0
+
+        for unique_id, replacement in self._store.items.items():
+            entity_id = registry.async_get_entity_id(PLATFORM, DOMAIN, unique_id)
+            if (row := rows.get(entity_id)) is None:
+                continue
+
+            overdue += row.bucket == BUCKET_EXPIRED
+            self._async_add(
+                STATISTIC_STOCK.format(unique_id),
+                f"{replacement[CONF_NAME]} stock",
+                start,
+                row.stock,
+            )
+
+        self._async_add(
+            STATISTIC_OVERDUE.format(self._entry_id),
+            "Overdue replacements",
+            start,
+            overdue,
+        )
+
+        self._pending_hours += 1
+        if self._pending_hours >= STATISTICS_IMPORT_HOURS:
+            self._async_import()
+
+    @callback
+    def _async_import(self) -> None:
+        """Import all pending samples, one batch per statistic."""
+        # Without the recorder the samples are discarded
+        if "recorder" in self._hass.config.components:
+            for statistic_id, statistics in self._pending.items():
+                async_add_external_statistics(
+                    self._hass, self._metadata[statistic_id], statistics
+                )
+
+        self._pending = {}
+        self._pending_hours = 0
@@ -0,0 +1,153 @@
+"""Storage of the replacement definitions."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.const import CONF_NAME, CONF_UNIQUE_ID
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import generate_entity_id
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    CONF_ADD_ANOTHER,
+    CONF_PREFIX,
+    CONF_PROFILE,
+    DEFAULT_PREFIX,
+    PROFILE_FIELDS,
+    STORAGE_CHUNK_SIZE,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    UNIQUE_ID_FORMAT,
+)
+
+# Storage fields
+DATA_CHUNKS = "chunks"
+DATA_ITEMS = "items"
+
+
+def replacement_unique_id(replacement: dict[str, Any]) -> str:
+    """Return the unique ID of a replacement definition."""
+    return generate_entity_id(
+        UNIQUE_ID_FORMAT,
+        replacement.get(CONF_PREFIX, DEFAULT_PREFIX) + replacement[CONF_NAME],
+        [],
+    )
+
+
+class ReplacementsStore:
+    """Replacement definitions of a config entry, saved in chunks.
+
+    The definitions are split in chunks of up to STORAGE_CHUNK_SIZE items,
+    each one saved to its own file, plus an index file with the chunks in
+    use. Changing a replacement only writes its chunk, and several changes
+    within STORAGE_SAVE_DELAY are coalesced into a single write.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store of a config entry."""
+        self._hass = hass
+        self._key = STORAGE_KEY.format(entry_id)
+        self._index = Store(hass, STORAGE_VERSION, self._key)
+        self._stores: dict[int, Store] = {}
+        self._chunks: dict[int, dict[str, dict[str, Any]]] = {}
+        self._item_chunk: dict[str, int] = {}
+        self._dirty: set[int] = set()
+        self._index_dirty = False
+
+    @property
+    def items(self) -> dict[str, dict[str, Any]]:
+        """Return all replacement definitions, by unique ID."""
+        return {
+            unique_id: item
+            for chunk in self._chunks.values()
+            for unique_id, item in chunk.items()
+        }
+
+    def __contains__(self, unique_id: object) -> bool:
+        """Return True if there is a replacement with the unique ID."""
+        return unique_id in self._item_chunk
+
+    def _store(self, chunk_id: int) -> Store:
+        """Return the store of a chunk."""
+        if chunk_id not in self._stores:
+            self._stores[chunk_id] = Store(
+                self._hass, STORAGE_VERSION, f"{self._key}.{chunk_id}"
+            )
+        return self._stores[chunk_id]
+
+    async def async_load(self) -> None:
+        """Load all chunks of the config entry."""
+        index = await self._index.async_load() or {DATA_CHUNKS: []}
+
+        for chunk_id in index[DATA_CHUNKS]:
+            data = await self._store(chunk_id).async_load() or {DATA_ITEMS: {}}
+            self._chunks[chunk_id] = data[DATA_ITEMS]
+            for unique_id in data[DATA_ITEMS]:
+                self._item_chunk[unique_id] = chunk_id
+
+    async def async_flush(self) -> None:
+        """Write all pending changes now."""
+        for chunk_id in sorted(self._dirty):
+            await self._store(chunk_id).async_save(self._chunk_data(chunk_id))
+        if self._index_dirty:
+            await self._index.async_save(self._index_data())
+
+    async def async_remove(self) -> None:
+        """Remove all the files of the config entry."""
+        await self.async_load()
+        for chunk_id in self._chunks:
+            await self._store(chunk_id).async_remove()
+        await self._index.async_remove()
+
+    @callback
+    def async_add(self, replacement: dict[str, Any]) -> str:
+        """Add a replacement definition and return its unique ID."""
+        # Replacements using a profile only keep their own fields
+        excluded = (CONF_ADD_ANOTHER,)
+        if CONF_PROFILE in replacement:
+            excluded += PROFILE_FIELDS
+        item = {key: value for key, value in replacement.items() if key not in excluded}
+        unique_id = item[CONF_UNIQUE_ID] = replacement_unique_id(item)
+
+        # Replace an existing definition in place, or fill the last chunk
+        if (chunk_id := self._item_chunk.get(unique_id)) is None:
+            chunk_id = max(self._chunks, default=0)
+            if len(self._chunks.get(chunk_id, {})) >= STORAGE_CHUNK_SIZE:
+                chunk_id += 1
+            if chunk_id not in self._chunks:
+                self._chunks[chunk_id] = {}
+                self._index_dirty = True
+                self._index.async_delay_save(self._index_data, STORAGE_SAVE_DELAY)
+
+        self._chunks[chunk_id][unique_id] = item
+        self._item_chunk[unique_id] = chunk_id
+        self._async_schedule_save(chunk_id)
+        return unique_id
+
+    @callback
+    def async_remove_item(self, unique_id: str) -> None:
+        """Remove a replacement definition."""
+        if (chunk_id := self._item_chunk.pop(unique_id, None)) is None:
+            return
+
+        self._chunks[chunk_id].pop(unique_id)
+        self._async_schedule_save(chunk_id)
+
+    @callback
+    def _async_schedule_save(self, chunk_id: int) -> None:
+        """Schedule a delayed write of a chunk."""
+        self._dirty.add(chunk_id)
+        self._store(chunk_id).async_delay_save(
+            lambda: self._chunk_data(chunk_id), STORAGE_SAVE_DELAY
+        )
+
+    def _chunk_data(self, chunk_id: int) -> dict[str, Any]:
+        """Return the data to save for a chunk."""
+        self._dirty.discard(chunk_id)
+        return {DATA_ITEMS: self._chunks[chunk_id]}
+
+    def _index_data(self) -> dict[str, Any]:
+        """Return the data to save for the index."""
+        self._index_dirty = False
+        return {DATA_CHUNKS: sorted(self._chunks)}
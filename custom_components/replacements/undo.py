@@ -0,0 +1,74 @@
+"""Snapshots of the replacements to undo the replace actions."""
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, NamedTuple
+
+from homeassistant.const import ATTR_DATE
+import homeassistant.util.dt as dt_util
+
+from .adaptive import IntervalStatistics
+
+# Snapshot fields
+ATTR_INTERVALS = "intervals"
+ATTR_KIT = "kit"
+ATTR_LAST_REPLACED = "last_replaced"
+ATTR_PARTS = "parts"
+ATTR_STOCK = "stock"
+ATTR_USAGE = "usage"
+ATTR_USAGE_SINCE = "usage_since"
+
+
+def _isoformat(value: date | None) -> str | None:
+    """Return the ISO format of an optional date."""
+    return value.isoformat() if value is not None else None
+
+
+def _parse_date(value: str | None) -> date | None:
+    """Return the date of an optional ISO format."""
+    return dt_util.parse_date(value) if value is not None else None
+
+
+class ReplaceSnapshot(NamedTuple):
+    """State of a replacement before a replace action.
+
+    The snapshot of a kit lists the unique IDs of the parts replaced with
+    it, and the snapshots of these parts the unique ID of their kit, so
+    undoing the kit also undoes its parts.
+    """
+
+    ordinal: int
+    stock: int
+    intervals: IntervalStatistics
+    last_replaced: date | None = None
+    usage: float = 0.0
+    usage_since: date | None = None
+    kit: str | None = None
+    parts: tuple[str, ...] = ()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation of the snapshot."""
+        return {
+            ATTR_DATE: date.fromordinal(self.ordinal).isoformat(),
+            ATTR_STOCK: self.stock,
+            ATTR_INTERVALS: self.intervals.as_dict(),
+            ATTR_LAST_REPLACED: _isoformat(self.last_replaced),
+            ATTR_USAGE: self.usage,
+            ATTR_USAGE_SINCE: _isoformat(self.usage_since),
+            ATTR_KIT: self.kit,
+            ATTR_PARTS: list(self.parts),
+        }
+
+    @classmethod
+    def from_dict(cls, restored: dict[str, Any]) -> ReplaceSnapshot:
+        """Initialize a snapshot from a dict."""
+        return cls(
+            dt_util.parse_date(restored[ATTR_DATE]).toordinal(),
+            int(restored[ATTR_STOCK]),
+            IntervalStatistics.from_dict(restored[ATTR_INTERVALS]),
+            _parse_date(restored.get(ATTR_LAST_REPLACED)),
+            float(restored.get(ATTR_USAGE) or 0),
+            _parse_date(restored.get(ATTR_USAGE_SINCE)),
+            restored.get(ATTR_KIT),
+            tuple(restored.get(ATTR_PARTS) or ()),
+        )
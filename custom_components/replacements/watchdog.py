@@ -0,0 +1,238 @@
+"""Watchdog of the integration calls that block the event loop."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Callable, Coroutine, Generator
+from functools import wraps
+import logging
+import sys
+import threading
+from time import monotonic
+import traceback
+from typing import Any, TypeVar
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+
+from .const import DATA_WATCHDOG, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Diagnostics fields
+ATTR_COUNTS = "counts"
+ATTR_SLOWEST = "slowest"
+ATTR_THRESHOLD = "threshold"
+ATTR_TOTAL = "total"
+
+
+class LoopWatchdog:
+    """Log the integration calls that hold the event loop for too long.
+
+    Each call, or each step of a coroutine between two awaits, is timed. The
+    watched calls made by another one are part of its time, so only the
+    outermost call is timed. A sampling thread records the stack of the
+    event loop while a call runs past the threshold, so the log shows where
+    the time is spent. The watchdog is shared by the entries enabling it,
+    using the lowest of their thresholds.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the watchdog."""
+        self._hass = hass
+        self.threshold = 0.0
+        # Threshold in seconds of each entry using the watchdog
+        self._thresholds: dict[str, float] = {}
+        self.counts: Counter[str] = Counter()
+        self.slowest: dict[str, float] = {}
+        self._loop_thread_id: int | None = None
+        # (name, start, token) of the running call, set by the event loop
+        self._running: tuple[str, float, int] | None = None
+        self._token = 0
+        self._samples: dict[int, list[str]] = {}
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._unsub_stop: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add_entry(self, entry_id: str, threshold: float) -> None:
+        """Use the watchdog for an entry, with its threshold in seconds."""
+        self._thresholds[entry_id] = threshold
+        self.threshold = min(self._thresholds.values())
+
+    @callback
+    def async_remove_entry(self, entry_id: str) -> bool:
+        """Stop using the watchdog for an entry, return True if still used."""
+        self._thresholds.pop(entry_id, None)
+        if not self._thresholds:
+            return False
+        self.threshold = min(self._thresholds.values())
+        return True
+
+    @callback
+    def async_start(self) -> None:
+        """Start the sampling thread, if not started yet."""
+        if self._thread is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._thread = threading.Thread(
+            target=self._sample, name=f"{DOMAIN}_watchdog", daemon=True
+        )
+        self._thread.start()
+        self._unsub_stop = self._hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_hass_stop
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the sampling thread, waiting for it in the executor."""
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        if self._thread is not None:
+            self._stop_event.set()
+            self._hass.async_add_executor_job(self._thread.join)
+            self._thread = None
+
+    @callback
+    def _async_hass_stop(self, _event: Event) -> None:
+        """Stop with Home Assistant."""
+        self._unsub_stop = None
+        self.async_stop()
+
+    def _sample(self) -> None:
+        """Record the stack of the event loop when a call runs for too long."""
+        while not self._stop_event.wait(self.threshold / 2):
+            if (running := self._running) is None:
+                continue
+
+            _name, start, token = running
+            if token in self._samples or monotonic() - start < self.threshold:
+                continue
+            # pylint: disable-next=protected-access
+            if (frame := sys._current_frames().get(self._loop_thread_id)) is None:
+                continue
+            self._samples[token] = traceback.format_stack(frame)
+
+    def enter(self, name: str) -> tuple[str, float, int] | None:
+        """Mark the start of a call, unless it is made by another call."""
+        if self._running is not None:
+            return None
+        self._token += 1
+        self._running = (name, monotonic(), self._token)
+        return self._running
+
+    def exit(self, running: tuple[str, float, int] | None) -> None:
+        """Mark the end of a call, and log it if it took too long."""
+        if running is None:
+            return
+        elapsed = monotonic() - running[1]
+        self._running = None
+        stack = self._samples.pop(running[2], None)
+        if elapsed < self.threshold:
+            return
+
+        name = running[0]
+        self.counts[name] += 1
+        self.slowest[name] = max(elapsed, self.slowest.get(name, 0))
+        _LOGGER.warning(
+            "%s blocked the event loop for %.3f seconds%s",
+            name,
+            elapsed,
+            ", sampled stack:\n" + "".join(stack) if stack else "",
+        )
+
+    async def async_run(self, name: str, coro: Coroutine[Any, Any, _T]) -> _T:
+        """Run a coroutine, timing each of its steps."""
+        return await _WatchedCoroutine(self, name, coro)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the diagnostics of the watchdog."""
+        return {
+            ATTR_THRESHOLD: self.threshold,
+            ATTR_TOTAL: sum(self.counts.values()),
+            ATTR_COUNTS: dict(self.counts),
+            ATTR_SLOWEST: {
+                name: round(elapsed, 3) for name, elapsed in self.slowest.items()
+            },
+        }
+
+
+class _WatchedCoroutine:
+    """Awaitable that drives a coroutine, timing each step of it."""
+
+    def __init__(
+        self, watchdog: LoopWatchdog, name: str, coro: Coroutine[Any, Any, _T]
+    ) -> None:
+        """Initialize the watched coroutine."""
+        self._watchdog = watchdog
+        self._name = name
+        self._coro = coro
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        """Forward every step of the coroutine to the awaiting task."""
+        step: Callable[[Any], Any] = self._coro.send
+        message = None
+        while True:
+            running = self._watchdog.enter(self._name)
+            try:
+                future = step(message)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self._watchdog.exit(running)
+
+            try:
+                message = yield future
+            except GeneratorExit:
+                self._coro.close()
+                raise
+            except BaseException as err:  # pylint: disable=broad-except
+                step, message = self._coro.throw, err
+            else:
+                step = self._coro.send
+
+
+def _watchdog(args: tuple) -> LoopWatchdog | None:
+    """Return the watchdog, if enabled, from the hass or entity argument."""
+    if not args:
+        return None
+    hass = args[0]
+    if not isinstance(hass, HomeAssistant):
+        hass = getattr(hass, "hass", None)
+    if hass is None or (data := hass.data.get(DOMAIN)) is None:
+        return None
+    return data.get(DATA_WATCHDOG)
+
+
+def watched(func: Callable[..., _T]) -> Callable[..., _T]:
+    """Time a function or coroutine function with the watchdog, if enabled.
+
+    The first argument must be hass, or an object with a hass attribute,
+    e.g., an entity or a flow.
+    """
+    name = func.__qualname__
+
+    if asyncio.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            if (watchdog := _watchdog(args)) is None:
+                return await func(*args, **kwargs)
+            return await watchdog.async_run(name, func(*args, **kwargs))
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if (watchdog := _watchdog(args)) is None:
+            return func(*args, **kwargs)
+        running = watchdog.enter(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            watchdog.exit(running)
+
+    return wrapper
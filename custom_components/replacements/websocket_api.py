@@ -0,0 +1,183 @@
+"""WebSocket API of the Replacements integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+import voluptuous as vol
+
+from .const import BUCKETS, DATA_GROUPS, DATA_INDEX, DOMAIN
+from .index import ReplacementRow, row_filter
+
+# Commands
+WS_TYPE_COUNT = f"{DOMAIN}/count"
+WS_TYPE_LIST = f"{DOMAIN}/list"
+WS_TYPE_SUBSCRIBE = f"{DOMAIN}/subscribe"
+
+# Command fields
+ATTR_AREA_ID = "area_id"
+ATTR_BUCKET = "bucket"
+ATTR_BUCKETS = "buckets"
+ATTR_COLUMNS = "columns"
+ATTR_DESCENDING = "descending"
+ATTR_LIMIT = "limit"
+ATTR_MAX_DAYS_REMAINING = "max_days_remaining"
+ATTR_MAX_STOCK = "max_stock"
+ATTR_OFFSET = "offset"
+ATTR_REMOVED = "removed"
+ATTR_ROWS = "rows"
+ATTR_SORT_BY = "sort_by"
+ATTR_TOTAL = "total"
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+FILTER_SCHEMA = {
+    vol.Optional(ATTR_AREA_ID): str,
+    vol.Optional(ATTR_BUCKET): vol.All(vol.Coerce(list), [vol.In(BUCKETS)]),
+    vol.Optional(ATTR_MAX_DAYS_REMAINING): vol.Coerce(int),
+    vol.Optional(ATTR_MAX_STOCK): vol.Coerce(int),
+}
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the replacements WebSocket commands."""
+    websocket_api.async_register_command(hass, ws_count)
+    websocket_api.async_register_command(hass, ws_list)
+    websocket_api.async_register_command(hass, ws_subscribe)
+
+
+def _row_filter(hass: HomeAssistant, msg: dict[str, Any]):
+    """Return the row filter of a command."""
+    matches = row_filter(
+        msg.get(ATTR_BUCKET),
+        msg.get(ATTR_MAX_DAYS_REMAINING),
+        msg.get(ATTR_MAX_STOCK),
+    )
+    if (area_id := msg.get(ATTR_AREA_ID)) is None:
+        return matches
+
+    # Checked on every row, as the entities can move between areas
+    groups = hass.data[DOMAIN][DATA_GROUPS]
+    return lambda row: groups.area_of(row.entity_id) == area_id and matches(row)
+
+
+def _query(hass: HomeAssistant, msg: dict[str, Any], **kwargs) -> list:
+    """Return the rows matching a command, only visiting its area if any."""
+    entity_ids = None
+    if (area_id := msg.get(ATTR_AREA_ID)) is not None:
+        entity_ids = hass.data[DOMAIN][DATA_GROUPS].members(area_id)
+
+    return hass.data[DOMAIN][DATA_INDEX].query(
+        _row_filter(hass, msg), entity_ids=entity_ids, **kwargs
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_COUNT,
+        **FILTER_SCHEMA,
+    }
+)
+@callback
+def ws_count(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return the number of matching replacements, in total and per bucket."""
+    rows = _query(hass, msg)
+    buckets = dict.fromkeys(BUCKETS, 0)
+    for row in rows:
+        buckets[row.bucket] += 1
+
+    connection.send_result(msg["id"], {ATTR_TOTAL: len(rows), ATTR_BUCKETS: buckets})
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_LIST,
+        vol.Optional(ATTR_SORT_BY, default="date"): vol.In(ReplacementRow._fields),
+        vol.Optional(ATTR_DESCENDING, default=False): bool,
+        vol.Optional(ATTR_OFFSET, default=0): vol.All(int, vol.Range(min=0)),
+        vol.Optional(ATTR_LIMIT, default=DEFAULT_LIMIT): vol.All(
+            int, vol.Range(min=1, max=MAX_LIMIT)
+        ),
+        **FILTER_SCHEMA,
+    }
+)
+@callback
+def ws_list(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return a sorted page of the replacements, as compact rows."""
+    rows = _query(hass, msg, sort_by=msg[ATTR_SORT_BY], descending=msg[ATTR_DESCENDING])
+    offset = msg[ATTR_OFFSET]
+
+    connection.send_result(
+        msg["id"],
+        {
+            ATTR_COLUMNS: ReplacementRow._fields,
+            ATTR_TOTAL: len(rows),
+            ATTR_ROWS: rows[offset : offset + msg[ATTR_LIMIT]],
+        },
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_SUBSCRIBE,
+        **FILTER_SCHEMA,
+    }
+)
+@callback
+def ws_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Send the matching replacements, followed by their changes only."""
+    index = hass.data[DOMAIN][DATA_INDEX]
+    matches = _row_filter(hass, msg)
+    # Entity IDs of the rows sent, only these can be removed
+    sent: set[str] = set()
+
+    @callback
+    def forward_changes(changed: list[ReplacementRow], removed: list[str]) -> None:
+        """Forward the changed rows, rows that stopped matching are removed."""
+        rows = []
+        removed = [entity_id for entity_id in removed if entity_id in sent]
+        for row in changed:
+            if matches(row):
+                rows.append(row)
+                sent.add(row.entity_id)
+            elif row.entity_id in sent:
+                removed.append(row.entity_id)
+        sent.difference_update(removed)
+        if rows or removed:
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"], {ATTR_ROWS: rows, ATTR_REMOVED: removed}
+                )
+            )
+
+    connection.subscriptions[msg["id"]] = index.async_listen(forward_changes)
+    connection.send_result(msg["id"])
+
+    # Send the initial snapshot
+    rows = _query(hass, msg)
+    sent.update(row.entity_id for row in rows)
+    connection.send_message(
+        websocket_api.event_message(
+            msg["id"],
+            {
+                ATTR_COLUMNS: ReplacementRow._fields,
+                ATTR_ROWS: rows,
+                ATTR_REMOVED: [],
+            },
+        )
+    )
@@ -0,0 +1,95 @@
+"""Working day calendars of the Replacements integration."""
+from __future__ import annotations
+
+from array import array
+from datetime import date, timedelta
+
+# Days of the weekends, Monday being 0
+WEEKEND = frozenset({5, 6})
+
+
+def parse_holidays(holidays: str) -> tuple[set[date], set[tuple[int, int]]]:
+    """Return the dates and the yearly days of a comma separated list.
+
+    Each holiday is either a date, e.g., 2023-04-07, or a day repeated every
+    year, e.g., 12-25. Raises ValueError if any of them is not valid.
+    """
+    dates: set[date] = set()
+    yearly: set[tuple[int, int]] = set()
+
+    for holiday in holidays.split(","):
+        if not (holiday := holiday.strip()):
+            continue
+        if holiday.count("-") == 2:
+            dates.add(date.fromisoformat(holiday))
+            continue
+
+        month, day = (int(part) for part in holiday.split("-"))
+        # Checked on a leap year, so 02-29 is valid
+        date(2000, month, day)
+        yearly.add((month, day))
+
+    return dates, yearly
+
+
+class WorkingCalendar:
+    """Working days of a site, without the weekends and holidays.
+
+    The days to the next working day are precomputed for a whole year, the
+    first time a date of that year is adjusted, so moving a date to the next
+    working day afterwards is a single lookup instead of a loop over days.
+    """
+
+    def __init__(self, skip_weekends: bool, holidays: str = "") -> None:
+        """Initialize the calendar from the options of an entry."""
+        self._weekend = WEEKEND if skip_weekends else frozenset()
+        self._dates, self._yearly = parse_holidays(holidays)
+        self._offsets: dict[int, array] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if any day is not a working day."""
+        return bool(self._weekend or self._dates or self._yearly)
+
+    def is_working_day(self, day: date) -> bool:
+        """Return True if the day is neither on a weekend nor a holiday."""
+        return not (
+            day.weekday() in self._weekend
+            or day in self._dates
+            or (day.month, day.day) in self._yearly
+        )
+
+    def next_working_day(self, day: date) -> date:
+        """Return the day if it is a working day, or the next working day."""
+        offsets = self._year_offsets(day.year)
+        index = day.toordinal() - _first_ordinal(day.year)
+        return day + timedelta(days=offsets[index])
+
+    def _year_offsets(self, year: int) -> array:
+        """Return the days to the next working day of every day of a year."""
+        if (offsets := self._offsets.get(year)) is not None:
+            return offsets
+
+        # Start from the first working day of the next year, and go backwards
+        offset = 0
+        next_year = date(year + 1, 1, 1)
+        while not self.is_working_day(next_year + timedelta(days=offset)):
+            offset += 1
+
+        start = date(year, 1, 1)
+        days = _first_ordinal(year + 1) - _first_ordinal(year)
+        offsets = array("H", bytes(2 * days))
+        for index in range(days - 1, -1, -1):
+            if self.is_working_day(start + timedelta(days=index)):
+                offset = 0
+            else:
+                offset += 1
+            offsets[index] = offset
+
+        self._offsets[year] = offsets
+        return offsets
+
+
+def _first_ordinal(year: int) -> int:
+    """Return the ordinal of the first day of a year."""
+    return date(year, 1, 1).toordinal()
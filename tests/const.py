@@ -8,10 +8,14 @@ from custom_components.replacements.const import (
     CONF_ICON_NORMAL,
     CONF_ICON_SOON,
     CONF_ICON_TODAY,
+    CONF_MONTHS_INTERVAL,
     CONF_PREFIX,
+    CONF_RRULE,
     CONF_SOON,
+    CONF_TIMESTAMP,
     CONF_UNIT_OF_MEASUREMENT,
     CONF_WEEKS_INTERVAL,
+    CONF_YEARS_INTERVAL,
     DEFAULT_ICON_EXPIRED,
     DEFAULT_ICON_NORMAL,
     DEFAULT_ICON_SOON,
@@ -48,6 +52,59 @@ MOCK_CONFIG_WEEKS = {
     CONF_ADD_ANOTHER: False,
 }
 
+MOCK_CONFIG_MONTHS = {
+    CONF_NAME: "Test Months 4",
+    CONF_PREFIX: DEFAULT_PREFIX,
+    CONF_MONTHS_INTERVAL: 3,
+    CONF_SOON: 7,
+    CONF_UNIT_OF_MEASUREMENT: DEFAULT_UNIT_OF_MEASUREMENT,
+    CONF_ICON_NORMAL: DEFAULT_ICON_NORMAL,
+    CONF_ICON_SOON: DEFAULT_ICON_SOON,
+    CONF_ICON_TODAY: DEFAULT_ICON_TODAY,
+    CONF_ICON_EXPIRED: DEFAULT_ICON_EXPIRED,
+    CONF_ADD_ANOTHER: False,
+}
+
+MOCK_CONFIG_YEARS = {
+    CONF_NAME: "Test Years 5",
+    CONF_PREFIX: DEFAULT_PREFIX,
+    CONF_YEARS_INTERVAL: 1,
+    CONF_SOON: 30,
+    CONF_UNIT_OF_MEASUREMENT: DEFAULT_UNIT_OF_MEASUREMENT,
+    CONF_ICON_NORMAL: DEFAULT_ICON_NORMAL,
+    CONF_ICON_SOON: DEFAULT_ICON_SOON,
+    CONF_ICON_TODAY: DEFAULT_ICON_TODAY,
+    CONF_ICON_EXPIRED: DEFAULT_ICON_EXPIRED,
+    CONF_ADD_ANOTHER: False,
+}
+
+MOCK_CONFIG_RRULE = {
+    CONF_NAME: "Test Rule 6",
+    CONF_PREFIX: DEFAULT_PREFIX,
+    CONF_RRULE: "FREQ=MONTHLY;INTERVAL=3;BYDAY=1MO",
+    CONF_SOON: 7,
+    CONF_UNIT_OF_MEASUREMENT: DEFAULT_UNIT_OF_MEASUREMENT,
+    CONF_ICON_NORMAL: DEFAULT_ICON_NORMAL,
+    CONF_ICON_SOON: DEFAULT_ICON_SOON,
+    CONF_ICON_TODAY: DEFAULT_ICON_TODAY,
+    CONF_ICON_EXPIRED: DEFAULT_ICON_EXPIRED,
+    CONF_ADD_ANOTHER: False,
+}
+
+MOCK_CONFIG_TIMESTAMP = {
+    CONF_NAME: "Test Timestamp 7",
+    CONF_PREFIX: DEFAULT_PREFIX,
+    CONF_DAYS_INTERVAL: 30,
+    CONF_SOON: DEFAULT_SOON,
+    CONF_UNIT_OF_MEASUREMENT: DEFAULT_UNIT_OF_MEASUREMENT,
+    CONF_ICON_NORMAL: DEFAULT_ICON_NORMAL,
+    CONF_ICON_SOON: DEFAULT_ICON_SOON,
+    CONF_ICON_TODAY: DEFAULT_ICON_TODAY,
+    CONF_ICON_EXPIRED: DEFAULT_ICON_EXPIRED,
+    CONF_TIMESTAMP: True,
+    CONF_ADD_ANOTHER: False,
+}
+
 MOCK_CONFIG_ADDITIONAL = {
     CONF_NAME: "Test Weeks 3",
     CONF_PREFIX: DEFAULT_PREFIX,
@@ -0,0 +1,97 @@
+"""Accelerated time tests running months of simulated days in seconds.
+
+A clock is injected before the first setup, and moved forward one day at a
+time without waiting for timers, replacing everything on its due date. The
+length of the simulation can be increased through environment variables:
+
+    REPLACEMENTS_ACCELERATED_DAYS=3650 pytest tests/test_accelerated.py -s
+"""
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+import os
+
+from homeassistant.const import CONF_NAME
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.replacements.clock import LocalToday
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONF_DAYS_INTERVAL,
+    DATA_TODAY,
+    DOMAIN,
+)
+from custom_components.replacements.sensor import ENTITY_ID_FORMAT
+
+from .const import MOCK_CONFIG_DAYS
+
+# Simulation size
+ACCELERATED_SIZE = int(os.environ.get("REPLACEMENTS_ACCELERATED_SIZE", "30"))
+ACCELERATED_DAYS = int(os.environ.get("REPLACEMENTS_ACCELERATED_DAYS", "365"))
+
+
+class SimulatedClock:
+    """Clock returning a UTC time that only moves when told to."""
+
+    def __init__(self, now: datetime) -> None:
+        """Initialize the clock at the given time."""
+        self.now = now
+
+    def __call__(self) -> datetime:
+        """Return the current simulated time."""
+        return self.now
+
+
+async def test_accelerated_fleet(hass, record_property):
+    """Test replacing on the due dates keeps a fleet on schedule for months."""
+    hass.config.set_time_zone("UTC")
+    start = dt_util.utcnow().date()
+    clock = SimulatedClock(datetime.combine(start, time(12), tzinfo=dt_util.UTC))
+    local_today = LocalToday(hass, clock)
+    hass.data.setdefault(DOMAIN, {})[DATA_TODAY] = local_today
+
+    test_data = {DOMAIN: []}
+    intervals = [1 + index % 30 for index in range(ACCELERATED_SIZE)]
+    for index, interval in enumerate(intervals):
+        test_data[DOMAIN].append(
+            {
+                **MOCK_CONFIG_DAYS,
+                CONF_NAME: f"Item {index}",
+                CONF_DAYS_INTERVAL: interval,
+            }
+        )
+    config_entry = MockConfigEntry(domain=DOMAIN, title=COMPONENT_NAME, data=test_data)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.data[DOMAIN][DATA_TODAY] is local_today
+
+    component = hass.data["entity_components"]["sensor"]
+    entities = [
+        component.get_entity(ENTITY_ID_FORMAT.format(f"replace_item_{index}"))
+        for index in range(ACCELERATED_SIZE)
+    ]
+    replaced = [[] for _ in entities]
+
+    for day in range(1, ACCELERATED_DAYS + 1):
+        clock.now += timedelta(days=1)
+        local_today.invalidate()
+
+        for index, entity in enumerate(entities):
+            await entity.async_update()
+            assert entity.native_value >= 0, f"{entity.entity_id} expired"
+            if entity.native_value == 0:
+                # Updated afterwards, like the entity service does
+                await entity.async_handle_replace_action()
+                await entity.async_update_ha_state(True)
+                replaced[index].append(day)
+        await hass.async_block_till_done()
+
+    # Everything is replaced exactly on every due date
+    for interval, days in zip(intervals, replaced):
+        assert days == list(range(interval, ACCELERATED_DAYS + 1, interval))
+    assert hass.states.get(entities[0].entity_id).state == "1"
+
+    record_property("replacements", sum(len(days) for days in replaced))
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
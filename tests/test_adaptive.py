@@ -0,0 +1,98 @@
+"""Tests for the adaptive module."""
+from __future__ import annotations
+
+from datetime import timedelta
+from statistics import mean, variance
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.helpers.entity_component import async_update_entity
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry, patch
+
+from custom_components.replacements.adaptive import IntervalStatistics
+from custom_components.replacements.clock import LocalToday
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONF_ADAPTIVE,
+    DATA_TODAY,
+    DOMAIN,
+)
+from custom_components.replacements.sensor import (
+    ATTR_LEARNED_INTERVAL,
+    ENTITY_ID_FORMAT,
+    SERVICE_REPLACED,
+)
+
+from .const import MOCK_CONFIG_DAYS
+
+ENTITY_ID = ENTITY_ID_FORMAT.format("replace_test_days_1")
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+def test_interval_statistics():
+    """Test the running statistics match the statistics of the whole history."""
+    intervals = [30, 35, 28, 40, 31, 33]
+    statistics = IntervalStatistics()
+    assert statistics.variance == 0
+
+    for days in intervals:
+        statistics.add(days)
+
+    assert statistics.count == len(intervals)
+    assert statistics.mean == pytest.approx(mean(intervals))
+    assert statistics.variance == pytest.approx(variance(intervals))
+
+    # The moving average follows the last intervals more closely
+    ewma = intervals[0]
+    for days in intervals[1:]:
+        ewma += 0.3 * (days - ewma)
+    assert statistics.ewma == pytest.approx(ewma)
+
+    assert IntervalStatistics.from_dict(statistics.as_dict()) == statistics
+    assert IntervalStatistics.from_dict(None) == IntervalStatistics()
+
+
+async def test_adaptive_interval(hass):
+    """Test the learned interval is used once there are enough replacements."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=COMPONENT_NAME,
+        data={DOMAIN: [{**MOCK_CONFIG_DAYS, CONF_ADAPTIVE: True}]},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    today = hass.data[DOMAIN][DATA_TODAY].today
+
+    # Intervals of 10, 12 and 12 days
+    for days, expected in ((0, "4"), (10, "4"), (22, "4"), (34, "11")):
+        with patch.object(LocalToday, "today", today + timedelta(days=days)):
+            await hass.services.async_call(
+                DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: ENTITY_ID}, blocking=True
+            )
+            await async_update_entity(hass, ENTITY_ID)
+            assert hass.states.get(ENTITY_ID).state == expected
+
+    # Several replacements on the same day count once
+    with patch.object(LocalToday, "today", today + timedelta(days=34)):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: ENTITY_ID}, blocking=True
+        )
+        await async_update_entity(hass, ENTITY_ID)
+
+    state = hass.states.get(ENTITY_ID)
+    assert state.attributes[ATTR_LEARNED_INTERVAL] == 11
+
+    # The other statistics are only kept in the restore data
+    entity = hass.data["entity_components"]["sensor"].get_entity(ENTITY_ID)
+    data = entity.extra_restore_state_data.as_dict()
+    intervals = IntervalStatistics.from_dict(data["intervals"])
+    assert intervals.count == 3
+    assert intervals.mean == pytest.approx(34 / 3)
+    assert "learned_interval_mean" not in state.attributes
+    assert data["last_replaced"] == str(today + timedelta(days=34))
@@ -0,0 +1,112 @@
+"""Tests for the binary_sensor module."""
+from __future__ import annotations
+
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    CONF_NAME,
+    EVENT_STATE_CHANGED,
+    STATE_OFF,
+    STATE_ON,
+)
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+
+from custom_components.replacements.binary_sensor import ATTR_REORDER_LEVEL
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONF_POOL,
+    CONF_REORDER_LEVEL,
+    DOMAIN,
+)
+from custom_components.replacements.sensor import (
+    ATTR_STOCK,
+    ENTITY_ID_FORMAT,
+    SERVICE_REPLACED,
+    SERVICE_STOCK,
+)
+
+from .const import MOCK_CONFIG_DAYS
+
+ITEM_ID = ENTITY_ID_FORMAT.format("replace_item")
+POOLED_ID = ENTITY_ID_FORMAT.format("replace_pooled_0")
+ITEM_ALERT_ID = "binary_sensor.item_low_stock"
+POOL_ALERT_ID = "binary_sensor.filters_pool_low_stock"
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+async def async_call(hass, service, entity_id, **data):
+    """Call a replacement service and wait for the changes."""
+    await hass.services.async_call(
+        DOMAIN, service, {ATTR_ENTITY_ID: entity_id, **data}, blocking=True
+    )
+    await hass.async_block_till_done()
+
+
+def alert_writes(events, entity_id) -> int:
+    """Return the number of state writes of an alert."""
+    return [event.data[ATTR_ENTITY_ID] for event in events].count(entity_id)
+
+
+async def test_low_stock(hass):
+    """Test the alerts are only written when the reorder level is crossed."""
+    test_data = {
+        DOMAIN: [
+            {**MOCK_CONFIG_DAYS, CONF_NAME: "Item", CONF_REORDER_LEVEL: 1},
+            {**MOCK_CONFIG_DAYS, CONF_NAME: "No level"},
+        ]
+    }
+    for index, level in enumerate((0, 2)):
+        test_data[DOMAIN].append(
+            {
+                **MOCK_CONFIG_DAYS,
+                CONF_NAME: f"Pooled {index}",
+                CONF_POOL: "filters",
+                CONF_REORDER_LEVEL: level,
+            }
+        )
+    config_entry = MockConfigEntry(domain=DOMAIN, title=COMPONENT_NAME, data=test_data)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # Only one alert per replacement with a level, or per pool at its highest
+    assert sorted(hass.states.async_entity_ids("binary_sensor")) == [
+        POOL_ALERT_ID,
+        ITEM_ALERT_ID,
+    ]
+    assert hass.states.get(ITEM_ALERT_ID).state == STATE_ON
+    assert hass.states.get(POOL_ALERT_ID).state == STATE_ON
+    assert hass.states.get(POOL_ALERT_ID).attributes[ATTR_REORDER_LEVEL] == 2
+
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    # Renewing the stock turns the alert off
+    await async_call(hass, SERVICE_STOCK, ITEM_ID, **{ATTR_STOCK: 3})
+    assert hass.states.get(ITEM_ALERT_ID).state == STATE_OFF
+    assert alert_writes(events, ITEM_ALERT_ID) == 1
+
+    # Replacing above the level writes nothing, reaching it turns it on
+    await async_call(hass, SERVICE_REPLACED, ITEM_ID)
+    assert alert_writes(events, ITEM_ALERT_ID) == 1
+    await async_call(hass, SERVICE_REPLACED, ITEM_ID)
+    assert hass.states.get(ITEM_ALERT_ID).state == STATE_ON
+    assert alert_writes(events, ITEM_ALERT_ID) == 2
+
+    # The same for the pool
+    await async_call(hass, SERVICE_STOCK, POOLED_ID, **{ATTR_STOCK: 4})
+    assert hass.states.get(POOL_ALERT_ID).state == STATE_OFF
+    await async_call(hass, SERVICE_REPLACED, POOLED_ID)
+    assert alert_writes(events, POOL_ALERT_ID) == 1
+    await async_call(hass, SERVICE_REPLACED, POOLED_ID)
+    assert hass.states.get(POOL_ALERT_ID).state == STATE_ON
+    assert alert_writes(events, POOL_ALERT_ID) == 2
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
@@ -0,0 +1,91 @@
+"""Tests for the clock module."""
+from datetime import datetime, time, timedelta
+
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed, patch
+
+from custom_components.replacements.clock import LocalToday
+
+
+def utc_time(day, hour, minute=0) -> datetime:
+    """Return a UTC datetime on the given day."""
+    return datetime.combine(day, time(hour, minute), tzinfo=dt_util.UTC)
+
+
+def future_day():
+    """Return a day in the future, so midnight timers are not already due."""
+    return dt_util.utcnow().date() + timedelta(days=10)
+
+
+async def test_local_today_time_zone(hass):
+    """Test today's date follows the configured time zone, not the host."""
+    day = future_day()
+    hass.config.set_time_zone("Pacific/Kiritimati")
+
+    with patch("homeassistant.util.dt.utcnow", return_value=utc_time(day, 12)):
+        local_today = LocalToday(hass)
+
+        # UTC+14 is already on the next day
+        assert local_today.today == day + timedelta(days=1)
+
+
+async def test_local_today_cached_until_midnight(hass):
+    """Test today's date is only calculated again after local midnight."""
+    day = future_day()
+    hass.config.set_time_zone("UTC")
+
+    with patch("homeassistant.util.dt.utcnow", return_value=utc_time(day, 12)):
+        local_today = LocalToday(hass)
+        assert local_today.today == day
+
+    # The cached date is kept without querying the clock again
+    before_midnight = utc_time(day, 23, 59)
+    with patch(
+        "homeassistant.util.dt.utcnow", return_value=before_midnight
+    ) as mock_utcnow:
+        async_fire_time_changed(hass, before_midnight)
+        await hass.async_block_till_done()
+
+        assert local_today.today == day
+        mock_utcnow.assert_not_called()
+
+    after_midnight = utc_time(day + timedelta(days=1), 0, 1)
+    with patch("homeassistant.util.dt.utcnow", return_value=after_midnight):
+        async_fire_time_changed(hass, after_midnight)
+        await hass.async_block_till_done()
+
+        assert local_today.today == day + timedelta(days=1)
+
+
+async def test_local_today_time_zone_change(hass):
+    """Test today's date is calculated again when the time zone changes."""
+    day = future_day()
+    hass.config.set_time_zone("UTC")
+
+    with patch("homeassistant.util.dt.utcnow", return_value=utc_time(day, 22)):
+        local_today = LocalToday(hass)
+        assert local_today.today == day
+
+        await hass.config.async_update(time_zone="Asia/Tokyo")
+        await hass.async_block_till_done()
+
+        assert local_today.today == day + timedelta(days=1)
+
+        await hass.config.async_update(time_zone="America/New_York")
+        await hass.async_block_till_done()
+
+        assert local_today.today == day
+
+
+async def test_local_today_injected_clock(hass):
+    """Test an injected clock is only queried again once invalidated."""
+    hass.config.set_time_zone("UTC")
+    now = utc_time(future_day(), 12)
+    local_today = LocalToday(hass, lambda: now)
+    assert local_today.today == now.date()
+
+    now += timedelta(days=100)
+    assert local_today.today == now.date() - timedelta(days=100)
+
+    local_today.invalidate()
+    assert local_today.today == now.date()
@@ -11,9 +11,25 @@ from custom_components.replacements import config_flow
 from custom_components.replacements.const import (
     COMPONENT_NAME,
     CONF_DAYS_INTERVAL,
+    CONF_HOLIDAYS,
+    CONF_MONTHS_INTERVAL,
+    CONF_NOTIFY,
+    CONF_PARENT,
+    CONF_POOL,
     CONF_PREFIX,
+    CONF_PROFILE,
+    CONF_REORDER_LEVEL,
+    CONF_RRULE,
+    CONF_SKIP_WEEKENDS,
     CONF_SOON,
+    CONF_STATISTICS,
+    CONF_TODO,
+    CONF_USAGE_ENTITY,
+    CONF_USAGE_LIMIT,
+    CONF_WATCHDOG,
+    CONF_WATCHDOG_THRESHOLD,
     CONF_WEEKS_INTERVAL,
+    CONF_YEARS_INTERVAL,
     DOMAIN,
 )
 from custom_components.replacements.sensor import ENTITY_ID_FORMAT
@@ -22,6 +38,7 @@ from .const import (
     MOCK_CONFIG_ADDITIONAL,
     MOCK_CONFIG_DAYS,
     MOCK_CONFIG_ERROR,
+    MOCK_CONFIG_RRULE,
     MOCK_CONFIG_SMALL,
     MOCK_CONFIG_WEEKS,
 )
@@ -68,10 +85,59 @@ def test_validate_soon_valid():
         }
     )
 
+    # Test valid months interval, soon is compared in days
+    test_input.append(
+        {
+            CONF_MONTHS_INTERVAL: 1,
+            CONF_SOON: 14,
+        }
+    )
+
+    # Test valid years interval, soon is compared in days
+    test_input.append(
+        {
+            CONF_YEARS_INTERVAL: 1,
+            CONF_SOON: 60,
+        }
+    )
+
+    # Test recurrence rules are not validated against the soon configuration
+    test_input.append(
+        {
+            CONF_RRULE: "FREQ=DAILY",
+            CONF_SOON: 4,
+        }
+    )
+
     for soon in test_input:
         config_flow.validate_soon(soon)
 
 
+def test_validate_rrule():
+    """Test only invalid recurrence rules raise a ValueError."""
+    config_flow.validate_rrule({CONF_DAYS_INTERVAL: 6})
+    config_flow.validate_rrule({CONF_RRULE: "FREQ=WEEKLY;BYDAY=MO,TH"})
+
+    with pytest.raises(ValueError):
+        config_flow.validate_rrule({CONF_RRULE: "FREQ=SOMETIMES"})
+
+
+def test_validate_usage():
+    """Test the usage entity and a positive limit must be set together."""
+    config_flow.validate_usage({CONF_DAYS_INTERVAL: 6})
+    config_flow.validate_usage(
+        {CONF_USAGE_ENTITY: "sensor.pump_hours", CONF_USAGE_LIMIT: 500}
+    )
+
+    for usage in (
+        {CONF_USAGE_ENTITY: "sensor.pump_hours"},
+        {CONF_USAGE_LIMIT: 500},
+        {CONF_USAGE_ENTITY: "sensor.pump_hours", CONF_USAGE_LIMIT: 0},
+    ):
+        with pytest.raises(ValueError):
+            config_flow.validate_usage(usage)
+
+
 def test_validate_soon_invalid():
     """Test a ValueError is raised when the soon configuration is not valid."""
     test_input = []
@@ -92,6 +158,22 @@ def test_validate_soon_invalid():
         }
     )
 
+    # Test invalid months interval
+    test_input.append(
+        {
+            CONF_MONTHS_INTERVAL: 1,
+            CONF_SOON: 29,
+        }
+    )
+
+    # Test invalid years interval
+    test_input.append(
+        {
+            CONF_YEARS_INTERVAL: 1,
+            CONF_SOON: 366,
+        }
+    )
+
     for soon in test_input:
         with pytest.raises(ValueError):
             config_flow.validate_soon(soon)
@@ -140,7 +222,7 @@ async def test_flow_user_creates_config_entry(hass):
         await hass.async_block_till_done()
 
     expected = {
-        "version": 1,
+        "version": 2,
         "type": "create_entry",
         "flow_id": mock.ANY,
         "handler": DOMAIN,
@@ -181,7 +263,7 @@ async def test_flow_user_creates_config_entry_multiple(hass):
         await hass.async_block_till_done()
 
     expected = {
-        "version": 1,
+        "version": 2,
         "type": "create_entry",
         "flow_id": mock.ANY,
         "handler": DOMAIN,
@@ -236,6 +318,47 @@ async def test_options_flow_init(hass):
         assert entity in result["data_schema"].schema[DOMAIN].options
 
 
+async def test_options_flow_only_replacements(hass):
+    """Test the multi-select only lists, and removes, the replacements."""
+    pooled = {
+        **MOCK_CONFIG_WEEKS,
+        CONF_NAME: "Pooled",
+        CONF_POOL: "filter",
+        CONF_REORDER_LEVEL: 1,
+    }
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=COMPONENT_NAME,
+        unique_id="config_entry_test",
+        data={DOMAIN: [MOCK_CONFIG_DAYS, pooled]},
+        options={CONF_TODO: True},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # The pool, to do list and alert are not listed
+    replacements = [
+        ENTITY_ID_FORMAT.format("replace_test_days_1"),
+        ENTITY_ID_FORMAT.format("replace_pooled"),
+    ]
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+    assert sorted(result["data_schema"].schema[DOMAIN].options) == sorted(replacements)
+
+    # Keeping all the replacements keeps the other entities too
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={DOMAIN: replacements}
+    )
+    assert result["type"] == "create_entry"
+    await hass.async_block_till_done()
+    for entity_id in (
+        "sensor.filter_pool",
+        "sensor.replacements_to_do",
+        "binary_sensor.filter_pool_low_stock",
+    ):
+        assert hass.states.get(entity_id) is not None
+
+
 async def test_options_flow_add_replacement(hass):
     """Test config flow options."""
     test_data = {}
@@ -279,8 +402,30 @@ async def test_options_flow_add_replacement(hass):
     assert result["title"] == COMPONENT_NAME
     assert result["result"] is True
     assert result["data"] == {
-        DOMAIN: [MOCK_CONFIG_ADDITIONAL, MOCK_CONFIG_DAYS, MOCK_CONFIG_WEEKS]
+        CONF_STATISTICS: False,
+        CONF_NOTIFY: "",
+        CONF_TODO: False,
+        CONF_SKIP_WEEKENDS: False,
+        CONF_HOLIDAYS: "",
+        CONF_WATCHDOG: False,
+        CONF_WATCHDOG_THRESHOLD: 100,
     }
+    await hass.async_block_till_done()
+
+    # The new replacement is stored and its entity created by the reload
+    store = hass.data[DOMAIN][config_entry.entry_id]
+    assert [item[CONF_NAME] for item in store.items.values()] == [
+        MOCK_CONFIG_DAYS[CONF_NAME],
+        MOCK_CONFIG_WEEKS[CONF_NAME],
+        MOCK_CONFIG_ADDITIONAL[CONF_NAME],
+    ]
+    assert hass.states.get(
+        generate_entity_id(
+            ENTITY_ID_FORMAT,
+            MOCK_CONFIG_ADDITIONAL[CONF_PREFIX] + MOCK_CONFIG_ADDITIONAL[CONF_NAME],
+            [],
+        )
+    )
 
 
 async def test_options_flow_add_error_replacement(hass):
@@ -360,6 +505,14 @@ async def test_options_flow_remove_replacement(hass):
     # Show initial options form
     result = await hass.config_entries.options.async_init(config_entry.entry_id)
 
+    # Invalid holidays are rejected
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        user_input={DOMAIN: [save_entity], CONF_HOLIDAYS: "2023-04-07, 13-25"},
+    )
+    assert result["type"] == "form"
+    assert result["errors"] == {"base": "invalid_holidays"}
+
     # Remove one of the entries
     remove_data = {DOMAIN: [save_entity]}
 
@@ -370,4 +523,110 @@ async def test_options_flow_remove_replacement(hass):
     assert result["type"] == "create_entry"
     assert result["title"] == COMPONENT_NAME
     assert result["result"] is True
-    assert result["data"] == {DOMAIN: [MOCK_CONFIG_DAYS]}
+    assert result["data"] == {
+        CONF_STATISTICS: False,
+        CONF_NOTIFY: "",
+        CONF_TODO: False,
+        CONF_SKIP_WEEKENDS: False,
+        CONF_HOLIDAYS: "",
+        CONF_WATCHDOG: False,
+        CONF_WATCHDOG_THRESHOLD: 100,
+    }
+    await hass.async_block_till_done()
+
+    # Only the kept replacement is stored
+    store = hass.data[DOMAIN][config_entry.entry_id]
+    assert [item[CONF_NAME] for item in store.items.values()] == [
+        MOCK_CONFIG_DAYS[CONF_NAME]
+    ]
+    assert len(hass.states.async_all()) == 1
+
+
+async def test_flow_user_invalid_rrule(hass):
+    """Test the form is shown again with an error for an invalid rule."""
+    result = await hass.config_entries.flow.async_init(
+        config_flow.DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={**MOCK_CONFIG_RRULE, CONF_RRULE: "FREQ=SOMETIMES"},
+    )
+
+    assert result["type"] == "form"
+    assert result["step_id"] == "user"
+    assert result["errors"] == {"base": "invalid_rrule"}
+
+
+async def test_options_flow_add_invalid_rrule(hass):
+    """Test the options form is shown again with an error for an invalid rule."""
+    test_data = {}
+    test_data[DOMAIN] = []
+    test_data[DOMAIN].append(MOCK_CONFIG_DAYS)
+
+    expected_entities = [
+        generate_entity_id(
+            ENTITY_ID_FORMAT,
+            MOCK_CONFIG_DAYS[CONF_PREFIX] + MOCK_CONFIG_DAYS[CONF_NAME],
+            [],
+        )
+    ]
+
+    # Generate a config entry
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="config_entry_test",
+        data=test_data,
+    )
+
+    # Add the entry to home assistant
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # Show initial options form
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+
+    # Add a new entry with an invalid rule
+    add_data = {DOMAIN: expected_entities}
+    add_data.update({**MOCK_CONFIG_RRULE, CONF_RRULE: "FREQ=SOMETIMES"})
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        user_input=add_data,
+    )
+    assert result["type"] == "form"
+    assert result["step_id"] == "init"
+    assert result["errors"] == {"base": "invalid_rrule"}
+
+
+async def test_flow_user_unknown_profile(hass):
+    """Test the form is shown again with an error for an unknown profile."""
+    result = await hass.config_entries.flow.async_init(
+        config_flow.DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={CONF_NAME: "Test Profile", CONF_PROFILE: "water_filter"},
+    )
+
+    assert result["type"] == "form"
+    assert result["step_id"] == "user"
+    assert result["errors"] == {"base": "unknown_profile"}
+
+
+async def test_flow_user_unknown_parent(hass):
+    """Test the form is shown again with an error for an unknown parent."""
+    result = await hass.config_entries.flow.async_init(
+        config_flow.DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={**MOCK_CONFIG_DAYS, CONF_PARENT: "Pump Kit"},
+    )
+
+    assert result["type"] == "form"
+    assert result["step_id"] == "user"
+    assert result["errors"] == {"base": "unknown_parent"}
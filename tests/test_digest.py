@@ -0,0 +1,97 @@
+"""Tests for the digest module."""
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+
+from homeassistant.const import CONF_NAME
+from homeassistant.helpers import area_registry as ar, entity_registry as er
+import homeassistant.util.dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    async_mock_service,
+    patch,
+)
+
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONF_DAYS_INTERVAL,
+    CONF_NOTIFY,
+    DOMAIN,
+)
+from custom_components.replacements.digest import parse_targets
+from custom_components.replacements.sensor import ENTITY_ID_FORMAT
+
+from .const import MOCK_CONFIG_DAYS
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+def test_parse_targets():
+    """Test the notify services are parsed with or without their domain."""
+    assert parse_targets("notify.phone, tablet,, ") == ["phone", "tablet"]
+    assert parse_targets("") == []
+
+
+async def test_digest(hass, caplog):
+    """Test a single digest per target, grouped by bucket and area, in batches."""
+    test_data = {DOMAIN: []}
+    for index, days in enumerate((1, 2, 3, 30)):
+        test_data[DOMAIN].append(
+            {
+                **MOCK_CONFIG_DAYS,
+                CONF_NAME: f"Item {index}",
+                CONF_DAYS_INTERVAL: days,
+            }
+        )
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=COMPONENT_NAME,
+        data=test_data,
+        options={CONF_NOTIFY: "notify.phone, tablet, missing"},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # Place one of the replacements in an area
+    area = ar.async_get(hass).async_create("Kitchen")
+    er.async_get(hass).async_update_entity(
+        ENTITY_ID_FORMAT.format("replace_item_1"), area_id=area.id
+    )
+    await hass.async_block_till_done()
+
+    phone = async_mock_service(hass, "notify", "phone")
+    tablet = async_mock_service(hass, "notify", "tablet")
+    caplog.set_level(logging.WARNING)
+
+    # Two days later the first one is late, the second due today, and the
+    #  third soon, in two batches
+    midnight = dt_util.start_of_local_day(dt_util.now().date() + timedelta(days=2))
+    with patch("custom_components.replacements.digest.DIGEST_BATCH_SIZE", 2), patch(
+        "custom_components.replacements.digest.DIGEST_SEND_INTERVAL", 0
+    ):
+        async_fire_time_changed(hass, midnight)
+        await hass.async_block_till_done()
+
+    assert len(phone) == 2
+    assert [call.data for call in phone] == [call.data for call in tablet]
+    assert phone[0].data["title"] == f"{COMPONENT_NAME}: 3 need attention (1/2)"
+    assert phone[0].data["message"] == (
+        "Overdue:\n- No area: Item 0 (1 days late)\nToday:\n- Kitchen: Item 1"
+    )
+    assert phone[1].data["message"] == "Soon:\n- No area: Item 2 (in 1 days)"
+    assert "Unable to send the digest to missing" in caplog.text
+
+    # Nothing is sent once the digest is disabled
+    hass.config_entries.async_update_entry(config_entry, options={CONF_NOTIFY: ""})
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, midnight + timedelta(days=1))
+    await hass.async_block_till_done()
+    assert len(phone) == 2
@@ -0,0 +1,119 @@
+"""Tests for the groups module."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.const import ATTR_AREA_ID, CONF_NAME, EVENT_STATE_CHANGED
+from homeassistant.helpers import area_registry as ar, entity_registry as er
+from homeassistant.helpers.entity_component import async_update_entity
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    patch,
+)
+
+from custom_components.replacements.clock import LocalToday
+from custom_components.replacements.const import (
+    BUCKET_NORMAL,
+    BUCKET_SOON,
+    BUCKET_TODAY,
+    COMPONENT_NAME,
+    CONF_DAYS_INTERVAL,
+    DATA_GROUPS,
+    DATA_TODAY,
+    DOMAIN,
+    EVENT_QUERY_RESULT,
+)
+from custom_components.replacements.sensor import ENTITY_ID_FORMAT
+from custom_components.replacements.services import (
+    ATTR_BUCKET,
+    SERVICE_QUERY,
+    SERVICE_REPLACE_AREA,
+)
+from custom_components.replacements.websocket_api import WS_TYPE_COUNT
+
+from .const import MOCK_CONFIG_DAYS
+
+ENTITY_IDS = [ENTITY_ID_FORMAT.format(f"replace_item_{index}") for index in range(3)]
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+async def test_groups(hass, hass_ws_client):
+    """Test the area groups follow the registry, and the group operations."""
+    test_data = {DOMAIN: []}
+    for index, days in enumerate((1, 2, 30)):
+        test_data[DOMAIN].append(
+            {**MOCK_CONFIG_DAYS, CONF_NAME: f"Item {index}", CONF_DAYS_INTERVAL: days}
+        )
+    config_entry = MockConfigEntry(domain=DOMAIN, title=COMPONENT_NAME, data=test_data)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    for entity_id in ENTITY_IDS:
+        await async_update_entity(hass, entity_id)
+
+    # Place the first two replacements in the kitchen
+    area = ar.async_get(hass).async_create("Kitchen")
+    registry = er.async_get(hass)
+    for entity_id in ENTITY_IDS[:2]:
+        registry.async_update_entity(entity_id, area_id=area.id)
+    await hass.async_block_till_done()
+
+    groups = hass.data[DOMAIN][DATA_GROUPS]
+    assert groups.members(area.id) == set(ENTITY_IDS[:2])
+    assert groups.area_of(ENTITY_IDS[2]) is None
+
+    # Querying and counting only return the members
+    events = async_capture_events(hass, EVENT_QUERY_RESULT)
+    await hass.services.async_call(
+        DOMAIN, SERVICE_QUERY, {ATTR_AREA_ID: area.id}, blocking=True
+    )
+    assert [row["entity_id"] for row in events[0].data["replacements"]] == (
+        ENTITY_IDS[:2]
+    )
+
+    client = await hass_ws_client(hass)
+    await client.send_json({"id": 1, "type": WS_TYPE_COUNT, ATTR_AREA_ID: area.id})
+    msg = await client.receive_json()
+    assert msg["result"]["total"] == 2
+    assert msg["result"]["buckets"][BUCKET_SOON] == 1
+    assert msg["result"]["buckets"][BUCKET_NORMAL] == 1
+
+    # Only the members due today are replaced
+    today = hass.data[DOMAIN][DATA_TODAY].today
+    with patch.object(LocalToday, "today", today + timedelta(days=1)):
+        for entity_id in ENTITY_IDS:
+            await async_update_entity(hass, entity_id)
+        writes = async_capture_events(hass, EVENT_STATE_CHANGED)
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_REPLACE_AREA,
+            {ATTR_AREA_ID: area.id, ATTR_BUCKET: BUCKET_TODAY},
+            blocking=True,
+        )
+        await hass.async_block_till_done()
+        assert [hass.states.get(entity_id).state for entity_id in ENTITY_IDS] == [
+            "1",
+            "1",
+            "29",
+        ]
+
+        # Only the replaced member is written, and only once
+        assert [event.data["entity_id"] for event in writes] == ENTITY_IDS[:1]
+
+    # Moved, renamed and removed entities leave the group
+    registry.async_update_entity(ENTITY_IDS[0], area_id=None)
+    registry.async_update_entity(ENTITY_IDS[1], new_entity_id="sensor.renamed")
+    await hass.async_block_till_done()
+    assert groups.members(area.id) == {"sensor.renamed"}
+
+    registry.async_remove("sensor.renamed")
+    await hass.async_block_till_done()
+    assert groups.members(area.id) == set()
+    assert groups.area_of("sensor.renamed") is None
@@ -0,0 +1,100 @@
+"""Tests for the index module."""
+from __future__ import annotations
+
+from custom_components.replacements.const import (
+    BUCKET_EXPIRED,
+    BUCKET_NORMAL,
+    BUCKET_SOON,
+)
+from custom_components.replacements.index import (
+    ReplacementIndex,
+    ReplacementRow,
+    row_filter,
+)
+
+ROW_A = ReplacementRow("sensor.a", "A", 738000, -2, 0, BUCKET_EXPIRED)
+ROW_B = ReplacementRow("sensor.b", "B", 738003, 1, 5, BUCKET_SOON)
+ROW_C = ReplacementRow("sensor.c", "C", 738010, 8, 2, BUCKET_NORMAL)
+
+
+def test_row_filter():
+    """Test the filters combined by row_filter."""
+    assert row_filter()(ROW_A)
+    assert row_filter(buckets=[BUCKET_SOON])(ROW_B)
+    assert not row_filter(buckets=[BUCKET_SOON])(ROW_A)
+    assert row_filter(max_days_remaining=1)(ROW_B)
+    assert not row_filter(max_days_remaining=1)(ROW_C)
+    assert row_filter(max_stock=2)(ROW_C)
+    assert not row_filter(max_stock=2)(ROW_B)
+
+
+async def test_query(hass):
+    """Test sorting and filtering the rows."""
+    index = ReplacementIndex(hass)
+    for row in (ROW_C, ROW_A, ROW_B):
+        index.async_update(row)
+
+    assert index.query(row_filter()) == [ROW_A, ROW_B, ROW_C]
+    assert index.query(row_filter(), "stock") == [ROW_A, ROW_C, ROW_B]
+    assert index.query(row_filter(), "name", descending=True) == [ROW_C, ROW_B, ROW_A]
+    assert index.query(row_filter(max_days_remaining=1)) == [ROW_A, ROW_B]
+
+
+async def test_listeners_batch_changes(hass):
+    """Test the listeners get a single batch with the actual changes."""
+    index = ReplacementIndex(hass)
+    batches = []
+    unsub = index.async_listen(lambda *batch: batches.append(batch))
+
+    index.async_update(ROW_A)
+    index.async_update(ROW_B)
+    index.async_update(ROW_B._replace(stock=4))
+    await hass.async_block_till_done()
+
+    assert batches == [([ROW_A, ROW_B._replace(stock=4)], [])]
+
+    # Unchanged rows and unknown entities are not notified
+    index.async_update(ROW_A)
+    index.async_remove("sensor.unknown")
+    await hass.async_block_till_done()
+    assert len(batches) == 1
+
+    index.async_remove(ROW_A.entity_id)
+    await hass.async_block_till_done()
+    assert batches[-1] == ([], [ROW_A.entity_id])
+    assert list(index.rows) == [ROW_B.entity_id]
+
+    # No more batches after unsubscribing
+    unsub()
+    index.async_update(ROW_C)
+    await hass.async_block_till_done()
+    assert len(batches) == 2
+
+
+async def test_sorted_queries(hass):
+    """Test the date range and stock queries follow the row changes."""
+    index = ReplacementIndex(hass)
+    for row in (ROW_C, ROW_A, ROW_B):
+        index.async_update(row)
+
+    assert index.due_between() == [ROW_A, ROW_B, ROW_C]
+    assert index.due_between(738001, 738010) == [ROW_B, ROW_C]
+    assert index.due_between(end=738003) == [ROW_A, ROW_B]
+    assert index.stock_below(5) == [ROW_A, ROW_C]
+
+    # Moving and removing rows updates the sorted lists
+    moved = ROW_A._replace(date=738020, stock=9)
+    index.async_update(moved)
+    index.async_remove(ROW_C.entity_id)
+
+    assert index.due_between(738001) == [ROW_B, moved]
+    assert index.stock_below(5) == []
+    assert index.stock_below(10) == [ROW_B, moved]
+
+    # Changing only the date or the stock keeps the other list sorted
+    restocked = ROW_B._replace(stock=1)
+    moved_back = moved._replace(date=738000)
+    index.async_update(restocked)
+    index.async_update(moved_back)
+    assert index.due_between() == [moved_back, restocked]
+    assert index.stock_below(10) == [restocked, moved_back]
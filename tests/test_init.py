@@ -1,7 +1,7 @@
 """Test Replacmeents setup process."""
 from __future__ import annotations
 
-from datetime import date, datetime
+from datetime import datetime
 
 # Import everything provided by home assistant and the test component
 from homeassistant.const import ATTR_DATE, CONF_NAME
@@ -16,6 +16,7 @@ from custom_components.replacements.const import (
     CONF_DAYS_INTERVAL,
     CONF_PREFIX,
     DOMAIN,
+    STORAGE_KEY,
 )
 from custom_components.replacements.sensor import ENTITY_ID_FORMAT
 
@@ -51,13 +52,13 @@ async def test_restore_state(hass):
     new_date: datetime | None = dt_util.parse_datetime(state.attributes[ATTR_DATE])
 
     # Check that the new date is correct. This must be equal to the configured interval
-    today = date.today()
+    today = dt_util.now().date()
     days_remaining = (new_date.date() - today).days
 
     assert days_remaining == MOCK_CONFIG_DAYS[CONF_DAYS_INTERVAL]
 
 
-async def test_setup_and_remove_config_entry_single_entity(hass) -> None:
+async def test_setup_and_remove_config_entry_single_entity(hass, hass_storage) -> None:
     """Test setting up and removing a config entry."""
     registry = er.async_get(hass)
 
@@ -87,17 +88,25 @@ async def test_setup_and_remove_config_entry_single_entity(hass) -> None:
         assert hass.states.get(entity)
         assert entity in registry.entities
 
+    # The replacements were moved from the config entry into our storage
+    assert DOMAIN not in config_entry.data
+    storage_key = STORAGE_KEY.format(config_entry.entry_id)
+    assert storage_key in hass_storage
+
     # Reload the entry and assert that the data from above is still there
     assert await hass.config_entries.async_reload(config_entry.entry_id)
     assert DOMAIN in hass.data and config_entry.entry_id in hass.data[DOMAIN]
+    for entity in expected_entities:
+        assert hass.states.get(entity)
 
     # Remove the config entry
     assert await hass.config_entries.async_remove(config_entry.entry_id)
     await hass.async_block_till_done()
 
-    # Check the state and entity registry entry are removed
+    # Check the state, entity registry entry and storage are removed
     assert len(hass.states.async_all()) == 0
     assert len(registry.entities) == 0
+    assert not [key for key in hass_storage if key.startswith(storage_key)]
 
 
 async def test_setup_and_remove_config_entry_multiple_entities(hass) -> None:
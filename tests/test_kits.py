@@ -0,0 +1,156 @@
+"""Tests for the kits module."""
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+
+from homeassistant.const import ATTR_ENTITY_ID, CONF_NAME, EVENT_STATE_CHANGED
+from homeassistant.helpers.entity_component import async_update_entity
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    patch,
+)
+
+from custom_components.replacements.clock import LocalToday
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONF_DAYS_INTERVAL,
+    CONF_PARENT,
+    DATA_TODAY,
+    DOMAIN,
+)
+from custom_components.replacements.kits import ReplacementKits
+from custom_components.replacements.sensor import (
+    ATTR_STOCK,
+    ENTITY_ID_FORMAT,
+    SERVICE_REPLACED,
+    SERVICE_STOCK,
+)
+
+from .const import MOCK_CONFIG_DAYS
+
+KIT = {**MOCK_CONFIG_DAYS, CONF_NAME: "Pump Kit", CONF_DAYS_INTERVAL: 10}
+FILTER = {
+    **KIT,
+    CONF_NAME: "Pump Filter",
+    CONF_DAYS_INTERVAL: 4,
+    CONF_PARENT: "Pump Kit",
+}
+GASKET = {
+    **KIT,
+    CONF_NAME: "Pump Gasket",
+    CONF_DAYS_INTERVAL: 6,
+    CONF_PARENT: "Pump Kit",
+}
+MESH = {
+    **KIT,
+    CONF_NAME: "Filter Mesh",
+    CONF_DAYS_INTERVAL: 2,
+    CONF_PARENT: "Pump Filter",
+}
+
+KIT_ID = ENTITY_ID_FORMAT.format("replace_pump_kit")
+FILTER_ID = ENTITY_ID_FORMAT.format("replace_pump_filter")
+GASKET_ID = ENTITY_ID_FORMAT.format("replace_pump_gasket")
+MESH_ID = ENTITY_ID_FORMAT.format("replace_filter_mesh")
+OTHER_ID = ENTITY_ID_FORMAT.format("replace_test_days_1")
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+def test_replacement_kits(caplog):
+    """Test the descendants are listed parents first, without cycles."""
+    kits = ReplacementKits(
+        {
+            "mesh": {CONF_NAME: "Mesh", CONF_PARENT: "Filter"},
+            "filter": {CONF_NAME: "Filter", CONF_PARENT: "Kit"},
+            "kit": {CONF_NAME: "Kit"},
+            "gasket": {CONF_NAME: "Gasket", CONF_PARENT: "Kit"},
+            "a": {CONF_NAME: "A", CONF_PARENT: "B"},
+            "b": {CONF_NAME: "B", CONF_PARENT: "A"},
+            "lost": {CONF_NAME: "Lost", CONF_PARENT: "Unknown"},
+        }
+    )
+    caplog.set_level(logging.ERROR)
+
+    assert kits.descendants("kit") == ("filter", "gasket", "mesh")
+    assert kits.descendants("filter") == ("mesh",)
+    assert kits.descendants("mesh") == ()
+    assert kits.descendants("kit") is kits.descendants("kit")
+
+    # The cycle is broken, and the unknown parent is ignored
+    assert "a" not in kits.parents
+    assert kits.descendants("a") == ("b",)
+    assert "lost" not in kits.parents
+    assert "Unknown parent Unknown of Lost" in caplog.text
+    assert "The parents of A form a cycle" in caplog.text
+
+
+async def test_kit_replaced(hass):
+    """Test a kit replaces its parts once, and a part does not replace its kit."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=COMPONENT_NAME,
+        data={DOMAIN: [MESH, FILTER, KIT, GASKET, MOCK_CONFIG_DAYS]},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    today = hass.data[DOMAIN][DATA_TODAY].today
+
+    # The static parent is not written with the states
+    assert CONF_PARENT not in hass.states.get(FILTER_ID).attributes
+
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+    await hass.services.async_call(
+        DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: KIT_ID}, blocking=True
+    )
+    await hass.async_block_till_done()
+
+    # The whole kit is written once, and nothing else
+    changed = [event.data["entity_id"] for event in events]
+    assert sorted(changed) == sorted([KIT_ID, FILTER_ID, GASKET_ID, MESH_ID])
+    assert hass.states.get(KIT_ID).state == "10"
+    assert hass.states.get(FILTER_ID).state == "4"
+    assert hass.states.get(GASKET_ID).state == "6"
+    assert hass.states.get(MESH_ID).state == "2"
+
+    # A part of the kit only replaces its own parts
+    with patch.object(LocalToday, "today", today + timedelta(days=1)):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: FILTER_ID}, blocking=True
+        )
+        for entity_id in (KIT_ID, FILTER_ID, GASKET_ID, MESH_ID):
+            await async_update_entity(hass, entity_id)
+
+    assert hass.states.get(KIT_ID).state == "9"
+    assert hass.states.get(FILTER_ID).state == "4"
+    assert hass.states.get(GASKET_ID).state == "5"
+    assert hass.states.get(MESH_ID).state == "2"
+
+    # Targeting a kit and its parts replaces each of them once
+    kit_ids = [MESH_ID, FILTER_ID, GASKET_ID, KIT_ID]
+    await hass.services.async_call(
+        DOMAIN, SERVICE_STOCK, {ATTR_ENTITY_ID: kit_ids, ATTR_STOCK: 5}, blocking=True
+    )
+    component = hass.data["entity_components"]["sensor"]
+    history = {
+        entity_id: len(component.get_entity(entity_id)._history)
+        for entity_id in kit_ids
+    }
+    events.clear()
+    await hass.services.async_call(
+        DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: kit_ids}, blocking=True
+    )
+    await hass.async_block_till_done()
+
+    for entity_id in kit_ids:
+        assert hass.states.get(entity_id).attributes[ATTR_STOCK] == 4
+        assert len(component.get_entity(entity_id)._history) == history[entity_id] + 1
+    assert sorted(event.data["entity_id"] for event in events) == sorted(kit_ids)
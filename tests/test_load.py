@@ -0,0 +1,186 @@
+"""Load tests simulating large fleets of replacements.
+
+The size of the simulation can be increased through environment variables,
+e.g., to check the scaling limits before rolling out more sites:
+
+    REPLACEMENTS_LOAD_SIZE=5000 pytest tests/test_load.py --junitxml=load.xml
+
+The measured metrics are recorded as test properties, e.g., in the JUnit XML
+report.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import os
+import time
+import tracemalloc
+
+from homeassistant.const import ATTR_ENTITY_ID, CONF_NAME, EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant, callback
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    patch,
+)
+
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONF_DAYS_INTERVAL,
+    CONF_PREFIX,
+    DOMAIN,
+)
+from custom_components.replacements.sensor import (
+    ATTR_STOCK,
+    ENTITY_ID_FORMAT,
+    SERVICE_REPLACED,
+    SERVICE_STOCK,
+)
+
+from .const import MOCK_CONFIG_DAYS
+
+# Simulation size
+LOAD_SIZE = int(os.environ.get("REPLACEMENTS_LOAD_SIZE", "100"))
+LOAD_DAYS = int(os.environ.get("REPLACEMENTS_LOAD_DAYS", "7"))
+LOAD_BURST = int(os.environ.get("REPLACEMENTS_LOAD_BURST", "20"))
+
+# Interval between event loop lag probes, in seconds
+LAG_PROBE_INTERVAL = 0.001
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop runs a periodic probe."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the monitor."""
+        self._loop = hass.loop
+        self._expected = 0.0
+        self._handle: asyncio.TimerHandle | None = None
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        """Start probing the event loop."""
+        self._schedule()
+
+    def stop(self) -> None:
+        """Stop probing the event loop."""
+        if self._handle is not None:
+            self._handle.cancel()
+
+    def _schedule(self) -> None:
+        """Schedule the next probe."""
+        self._expected = self._loop.time() + LAG_PROBE_INTERVAL
+        self._handle = self._loop.call_at(self._expected, self._probe)
+
+    def _probe(self) -> None:
+        """Record the lag of this probe and schedule the next one."""
+        self.max_lag = max(self.max_lag, self._loop.time() - self._expected)
+        self._schedule()
+
+
+class StateWriteCounter:
+    """Count the state changes of the replacements."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Start counting the state changed events."""
+        self.count = 0
+        hass.bus.async_listen(EVENT_STATE_CHANGED, self._async_state_changed)
+
+    @callback
+    def _async_state_changed(self, event) -> None:
+        """Count a state change of a replacement."""
+        if event.data[ATTR_ENTITY_ID].startswith(ENTITY_ID_FORMAT.format("load_")):
+            self.count += 1
+
+
+async def async_setup_fleet(hass: HomeAssistant, size: int) -> list[str]:
+    """Set up a config entry with synthetic replacements and return their IDs."""
+    test_data = {DOMAIN: []}
+    for index in range(size):
+        test_data[DOMAIN].append(
+            {
+                **MOCK_CONFIG_DAYS,
+                CONF_NAME: f"Load {index}",
+                CONF_PREFIX: "load_",
+                CONF_DAYS_INTERVAL: 1 + index % 30,
+            }
+        )
+
+    config_entry = MockConfigEntry(domain=DOMAIN, title=COMPONENT_NAME, data=test_data)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    return [ENTITY_ID_FORMAT.format(f"load_load_{index}") for index in range(size)]
+
+
+async def test_load_fleet(hass, record_property):
+    """Simulate days passing and bursts of service calls on a large fleet."""
+    hass.config.set_time_zone("UTC")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    entity_ids = await async_setup_fleet(hass, LOAD_SIZE)
+    setup_time = time.perf_counter() - start
+
+    assert all(hass.states.get(entity_id) for entity_id in entity_ids)
+
+    monitor = LoopLagMonitor(hass)
+    counter = StateWriteCounter(hass)
+    writes_per_day = []
+    monitor.start()
+
+    # Start in the future, so all the scheduled timers are due every day
+    now = dt_util.utcnow().replace(hour=12) + timedelta(days=1)
+
+    for _ in range(LOAD_DAYS):
+        now += timedelta(days=1)
+        counter.count = 0
+
+        with patch("homeassistant.util.dt.utcnow", return_value=now):
+            async_fire_time_changed(hass, now)
+            await hass.async_block_till_done()
+
+            # A burst of concurrent service calls on part of the fleet
+            burst = entity_ids[:LOAD_BURST]
+            await asyncio.gather(
+                *(
+                    hass.services.async_call(
+                        DOMAIN,
+                        SERVICE_STOCK,
+                        {ATTR_ENTITY_ID: entity_id, ATTR_STOCK: 10},
+                        blocking=True,
+                    )
+                    for entity_id in burst
+                ),
+            )
+            await hass.services.async_call(
+                DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: burst}, blocking=True
+            )
+
+        writes_per_day.append(counter.count)
+
+    monitor.stop()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    metrics = {
+        "replacements": LOAD_SIZE,
+        "simulated_days": LOAD_DAYS,
+        "setup_seconds": round(setup_time, 3),
+        "max_loop_lag_seconds": round(monitor.max_lag, 3),
+        "max_state_writes_per_day": max(writes_per_day),
+        "peak_memory_mb": round(peak_memory / 2**20, 1),
+    }
+    for name, value in metrics.items():
+        record_property(name, value)
+
+    # Every replacement counts down once per day, plus the service calls. The
+    #  replace action writes twice, before and after its forced update
+    assert max(writes_per_day) <= LOAD_SIZE + 3 * LOAD_BURST
+    assert min(writes_per_day) >= LOAD_SIZE - LOAD_BURST
+
+    # The burst replaced the items today and left them with one less in stock
+    state = hass.states.get(entity_ids[0])
+    assert state.attributes[ATTR_STOCK] == 9
@@ -0,0 +1,82 @@
+"""Tests for the migration module."""
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_NAME
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry, patch
+
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONFIG_ENTRY_VERSION,
+    DOMAIN,
+)
+from custom_components.replacements.migration import (
+    async_chunks,
+    async_import_replacements,
+)
+from custom_components.replacements.storage import ReplacementsStore
+
+from .const import MOCK_CONFIG_DAYS
+
+REPLACEMENTS = [{**MOCK_CONFIG_DAYS, CONF_NAME: f"Item {index}"} for index in range(7)]
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+async def test_chunks():
+    """Test the items are split in chunks."""
+    with patch("custom_components.replacements.migration.MIGRATION_CHUNK_SIZE", 3):
+        chunks = [chunk async for chunk in async_chunks(list(range(7)))]
+    assert chunks == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+async def test_migrate_entry(hass, hass_storage):
+    """Test a version 1 entry is migrated to the current version."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=COMPONENT_NAME,
+        data={DOMAIN: REPLACEMENTS, "other": True},
+        options={DOMAIN: REPLACEMENTS, "other": True},
+        version=1,
+    )
+    config_entry.add_to_hass(hass)
+    with patch("custom_components.replacements.migration.MIGRATION_CHUNK_SIZE", 3):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert config_entry.version == CONFIG_ENTRY_VERSION
+    assert config_entry.data == {"other": True}
+    assert config_entry.options == {"other": True}
+    assert len(hass.data[DOMAIN][config_entry.entry_id].items) == 7
+    assert len(hass.states.async_entity_ids("sensor")) == 7
+
+
+async def test_import_again(hass, hass_storage):
+    """Test importing the same replacements again does not duplicate them."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, title=COMPONENT_NAME, data={DOMAIN: REPLACEMENTS}
+    )
+    store = ReplacementsStore(hass, config_entry.entry_id)
+    await store.async_load()
+
+    for _ in range(2):
+        assert await async_import_replacements(hass, config_entry, store) == {}
+    assert len(store.items) == 7
+
+
+async def test_migrate_newer_entry(hass):
+    """Test entries of a newer version are not set up."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=COMPONENT_NAME,
+        data={},
+        version=CONFIG_ENTRY_VERSION + 1,
+    )
+    config_entry.add_to_hass(hass)
+    assert not await hass.config_entries.async_setup(config_entry.entry_id)
+    assert config_entry.state is ConfigEntryState.MIGRATION_ERROR
@@ -0,0 +1,186 @@
+"""Tests for the pools module."""
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.const import (
+    ATTR_DATE,
+    ATTR_ENTITY_ID,
+    CONF_NAME,
+    ENTITY_MATCH_ALL,
+    EVENT_STATE_CHANGED,
+)
+from homeassistant.core import callback
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONF_POOL,
+    DOMAIN,
+    EVENT_PROJECTION_RESULT,
+    STORAGE_KEY,
+)
+from custom_components.replacements.pools import DATA_LEVELS, InventoryPools
+from custom_components.replacements.projection import ATTR_POOLS, ATTR_REPLACEMENTS
+from custom_components.replacements.sensor import (
+    ATTR_NEW_DATE,
+    ATTR_POOL,
+    ATTR_STOCK,
+    ENTITY_ID_FORMAT,
+    SERVICE_DATE,
+    SERVICE_REPLACED,
+    SERVICE_STOCK,
+    SERVICE_UNDO,
+)
+from custom_components.replacements.services import ATTR_MONTHS, SERVICE_PROJECT
+
+from .const import MOCK_CONFIG_DAYS
+
+POOL = "filter"
+POOL_ENTITY_ID = "sensor.filter_pool"
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+async def test_concurrent_consume(hass, hass_storage):
+    """Test concurrent consumers never lose a decrement, nor go below zero."""
+    pools = InventoryPools(hass, "entry")
+    await pools.async_load()
+    notified = []
+    unsub = pools.async_listen(
+        POOL, callback(lambda: notified.append(pools.levels[POOL]))
+    )
+
+    await pools.async_set(POOL, 40)
+    await hass.async_block_till_done()
+    assert notified == [40]
+
+    # A single notification for the whole batch
+    await asyncio.gather(*(pools.async_consume(POOL) for _ in range(30)))
+    await hass.async_block_till_done()
+    assert pools.levels[POOL] == 10
+    assert notified == [40, 10]
+
+    await asyncio.gather(*(pools.async_consume(POOL) for _ in range(30)))
+    await hass.async_block_till_done()
+    assert notified == [40, 10, 0]
+
+    # Setting the same level does not notify
+    unsub()
+    await pools.async_set(POOL, 0)
+    await hass.async_block_till_done()
+    assert notified == [40, 10, 0]
+
+    # The levels are written when flushed
+    await pools.async_flush()
+    key = f"{STORAGE_KEY.format('entry')}.pools"
+    assert hass_storage[key]["data"] == {DATA_LEVELS: {POOL: 0}}
+
+    pools = InventoryPools(hass, "entry")
+    await pools.async_load()
+    assert pools.levels == {POOL: 0}
+
+    await pools.async_remove()
+    assert key not in hass_storage
+
+
+async def test_pool_sensor(hass):
+    """Test replacements sharing the stock of a pool."""
+    test_data = {DOMAIN: []}
+    for index in range(3):
+        test_data[DOMAIN].append(
+            {**MOCK_CONFIG_DAYS, CONF_NAME: f"Fountain {index}", CONF_POOL: POOL}
+        )
+    config_entry = MockConfigEntry(domain=DOMAIN, title=COMPONENT_NAME, data=test_data)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_ids = [
+        ENTITY_ID_FORMAT.format(f"replace_fountain_{index}") for index in range(3)
+    ]
+    assert hass.states.get(POOL_ENTITY_ID).state == "0"
+
+    # Renewing the stock of any replacement renews the pool
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_STOCK,
+        {ATTR_ENTITY_ID: entity_ids[0], ATTR_STOCK: 10},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get(POOL_ENTITY_ID).state == "10"
+
+    # The static pool is not written with the states
+    state = hass.states.get(entity_ids[1])
+    assert ATTR_POOL not in state.attributes
+    assert ATTR_STOCK not in state.attributes
+
+    # Replacing all of them at once writes the pool once
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+    await hass.services.async_call(
+        DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: entity_ids}, blocking=True
+    )
+    await hass.async_block_till_done()
+
+    assert hass.states.get(POOL_ENTITY_ID).state == "7"
+    pool_events = [
+        event for event in events if event.data[ATTR_ENTITY_ID] == POOL_ENTITY_ID
+    ]
+    assert len(pool_events) == 1
+
+    # The projection takes the units of all of them from the pool
+    events = async_capture_events(hass, EVENT_PROJECTION_RESULT)
+    await hass.services.async_call(
+        DOMAIN, SERVICE_PROJECT, {ATTR_MONTHS: 1}, blocking=True
+    )
+    await hass.async_block_till_done()
+    assert events[0].data[ATTR_POOLS][POOL_ENTITY_ID][ATTR_STOCK] == 7
+    assert {row[ATTR_POOL] for row in events[0].data[ATTR_REPLACEMENTS]} == {
+        POOL_ENTITY_ID
+    }
+
+
+async def test_services_with_pool(hass):
+    """Test the replacement services skip the pool sensors of the platform."""
+    test_data = {
+        DOMAIN: [
+            MOCK_CONFIG_DAYS,
+            {**MOCK_CONFIG_DAYS, CONF_NAME: "Fountain", CONF_POOL: POOL},
+        ]
+    }
+    config_entry = MockConfigEntry(domain=DOMAIN, title=COMPONENT_NAME, data=test_data)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    entity_id = ENTITY_ID_FORMAT.format("replace_test_days_1")
+
+    for service, data in (
+        (SERVICE_STOCK, {ATTR_STOCK: 5}),
+        (SERVICE_REPLACED, {}),
+        (SERVICE_UNDO, {}),
+        (SERVICE_DATE, {ATTR_NEW_DATE: "2030-01-01"}),
+    ):
+        await hass.services.async_call(
+            DOMAIN, service, {ATTR_ENTITY_ID: ENTITY_MATCH_ALL, **data}, blocking=True
+        )
+        await hass.async_block_till_done()
+
+    # The services were only called on the replacements
+    assert hass.states.get(POOL_ENTITY_ID).state == "5"
+    assert hass.states.get(entity_id).attributes[ATTR_STOCK] == 5
+    assert hass.states.get(entity_id).attributes[ATTR_DATE] == "2030-01-01"
+
+    # Also when the pool is targeted directly
+    await hass.services.async_call(
+        DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: POOL_ENTITY_ID}, blocking=True
+    )
+    assert hass.states.get(POOL_ENTITY_ID).state == "5"
@@ -0,0 +1,153 @@
+"""Tests for the profiles module."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.const import CONF_NAME, CONF_PREFIX, CONF_UNIT_OF_MEASUREMENT
+import homeassistant.util.dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+import voluptuous as vol
+
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONF_DAYS_INTERVAL,
+    CONF_ICON_SOON,
+    CONF_MONTHS_INTERVAL,
+    CONF_PROFILE,
+    CONF_SOON,
+    DATA_PROFILES,
+    DEFAULT_PREFIX,
+    DOMAIN,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from custom_components.replacements.profiles import ReplacementProfiles
+from custom_components.replacements.sensor import ENTITY_ID_FORMAT
+from custom_components.replacements.services import ATTR_PROFILE, SERVICE_SET_PROFILE
+
+from .const import MOCK_CONFIG_DAYS
+
+PROFILE = "water_filter"
+PROFILE_KEY = STORAGE_KEY.format("profiles")
+PROFILE_CONFIG = {
+    CONF_MONTHS_INTERVAL: 3,
+    CONF_SOON: 7,
+    CONF_UNIT_OF_MEASUREMENT: "Days",
+    "icon_normal": "mdi:water",
+    CONF_ICON_SOON: "mdi:water-alert",
+    "icon_today": "mdi:water-check",
+    "icon_expired": "mdi:water-remove",
+}
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+async def test_profile_shared(hass, hass_storage):
+    """Test replacements share their profile, and follow its changes."""
+    hass_storage[PROFILE_KEY] = {
+        "version": STORAGE_VERSION,
+        "key": PROFILE_KEY,
+        "data": {"profiles": {PROFILE: PROFILE_CONFIG}},
+    }
+
+    test_data = {DOMAIN: []}
+    for index in range(3):
+        test_data[DOMAIN].append(
+            {
+                CONF_NAME: f"Tap {index}",
+                CONF_PREFIX: DEFAULT_PREFIX,
+                CONF_PROFILE: PROFILE,
+            }
+        )
+    test_data[DOMAIN].append(
+        {CONF_NAME: "Unknown", CONF_PREFIX: DEFAULT_PREFIX, CONF_PROFILE: "missing"}
+    )
+    test_data[DOMAIN].append(MOCK_CONFIG_DAYS)
+    config_entry = MockConfigEntry(domain=DOMAIN, title=COMPONENT_NAME, data=test_data)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_ids = [ENTITY_ID_FORMAT.format(f"replace_tap_{index}") for index in range(3)]
+
+    # Replacements with an unknown profile are not created
+    assert hass.states.get(ENTITY_ID_FORMAT.format("replace_unknown")) is None
+
+    entities = [
+        hass.data["entity_components"]["sensor"].get_entity(entity_id)
+        for entity_id in entity_ids
+    ]
+    profile = hass.data[DOMAIN][DATA_PROFILES].profiles[PROFILE]
+    assert all(entity._profile is profile for entity in entities)
+
+    state = hass.states.get(entity_ids[0])
+    assert state.attributes[CONF_MONTHS_INTERVAL] == 3
+    assert ATTR_PROFILE not in state.attributes
+
+    # Replacements without a profile keep their own settings
+    state = hass.states.get(ENTITY_ID_FORMAT.format("replace_test_days_1"))
+    assert state.attributes[CONF_DAYS_INTERVAL] == 4
+
+    # Changing the profile updates all of its replacements
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_PROFILE,
+        {ATTR_PROFILE: PROFILE, CONF_DAYS_INTERVAL: 10, CONF_SOON: 2},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    profile = hass.data[DOMAIN][DATA_PROFILES].profiles[PROFILE]
+    assert profile.interval == 10
+    for entity_id, entity in zip(entity_ids, entities):
+        assert entity._profile is profile
+        state = hass.states.get(entity_id)
+        assert state.attributes[CONF_DAYS_INTERVAL] == 10
+        assert CONF_MONTHS_INTERVAL not in state.attributes
+
+    # The profile is saved after a delay, without the service fields
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=STORAGE_SAVE_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+
+    profiles = ReplacementProfiles(hass)
+    await profiles.async_load()
+    assert profiles.profiles[PROFILE] == profile
+    stored = hass_storage[PROFILE_KEY]["data"]["profiles"][PROFILE]
+    assert ATTR_PROFILE not in stored
+
+    # The stored replacements do not keep the fields of their profile
+    store = hass.data[DOMAIN][config_entry.entry_id]
+    assert CONF_SOON not in store.items["replace_tap_0"]
+
+
+async def test_profile_invalid(hass):
+    """Test invalid profiles are rejected by the service."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, title=COMPONENT_NAME, data={DOMAIN: [MOCK_CONFIG_DAYS]}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    for data in (
+        {ATTR_PROFILE: PROFILE},
+        {ATTR_PROFILE: PROFILE, CONF_DAYS_INTERVAL: 2, CONF_SOON: 5},
+        {ATTR_PROFILE: PROFILE, "rrule": "FREQ=NEVER"},
+    ):
+        with pytest.raises(vol.Invalid):
+            await hass.services.async_call(
+                DOMAIN, SERVICE_SET_PROFILE, data, blocking=True
+            )
+
+    assert hass.data[DOMAIN][DATA_PROFILES].profiles == {}
@@ -0,0 +1,157 @@
+"""Tests for the projection module."""
+from __future__ import annotations
+
+from datetime import date
+from itertools import islice
+
+from custom_components.replacements.const import (
+    CONF_DAYS_INTERVAL,
+    CONF_MONTHS_INTERVAL,
+    CONF_RRULE,
+)
+from custom_components.replacements.projection import (
+    ATTR_DEMAND,
+    ATTR_DEPLETED,
+    ATTR_PERIODS,
+    ATTR_POOLS,
+    ATTR_REPLACEMENTS,
+    ATTR_SHORTFALL,
+    ATTR_TOTAL,
+    ATTR_TOTALS,
+    ProjectionItem,
+    project,
+    replacement_dates,
+)
+from custom_components.replacements.sensor import ATTR_POOL, ATTR_STOCK
+
+TODAY = date(2023, 1, 15)
+
+ITEM_WEEKLY = ProjectionItem(
+    "sensor.weekly", "Weekly", date(2023, 1, 20).toordinal(), CONF_DAYS_INTERVAL, 7, 6
+)
+ITEM_QUARTERLY = ProjectionItem(
+    "sensor.quarterly",
+    "Quarterly",
+    date(2022, 12, 31).toordinal(),
+    CONF_MONTHS_INTERVAL,
+    3,
+    10,
+)
+ITEM_RRULE = ProjectionItem(
+    "sensor.rule",
+    "Rule",
+    date(2023, 2, 6).toordinal(),
+    CONF_RRULE,
+    "FREQ=MONTHLY;BYDAY=1MO;COUNT=16",
+    0,
+)
+
+
+def test_replacement_dates():
+    """Test the dates are generated lazily from the current date."""
+    assert list(islice(replacement_dates(ITEM_WEEKLY, TODAY), 3)) == [
+        date(2023, 1, 20),
+        date(2023, 1, 27),
+        date(2023, 2, 3),
+    ]
+
+    # Overdue replacements happen today, and the next ones from today
+    assert list(islice(replacement_dates(ITEM_QUARTERLY, TODAY), 3)) == [
+        date(2023, 1, 15),
+        date(2023, 4, 15),
+        date(2023, 7, 15),
+    ]
+    assert list(islice(replacement_dates(ITEM_RRULE, TODAY), 2)) == [
+        date(2023, 2, 6),
+        date(2023, 3, 6),
+    ]
+
+    # Finished recurrence rules stop the generator
+    assert list(replacement_dates(ITEM_RRULE, TODAY))[-1] == date(2023, 4, 3)
+
+
+def test_project():
+    """Test the demand per month, and its comparison with the stock."""
+    projection = project((ITEM_WEEKLY, ITEM_QUARTERLY, ITEM_RRULE), TODAY, 3)
+
+    assert projection[ATTR_PERIODS] == ["2023-01", "2023-02", "2023-03"]
+    weekly, quarterly, rule = projection[ATTR_REPLACEMENTS]
+
+    # Jan 20, 27, Feb 3, 10, 17, 24, Mar 3, 10, 17, 24, 31
+    assert weekly[ATTR_DEMAND] == [2, 4, 5]
+    assert weekly[ATTR_TOTAL] == 11
+    assert weekly[ATTR_SHORTFALL] == 5
+    assert weekly[ATTR_DEPLETED] == "2023-03"
+
+    # The overdue replacement counts today, the next one is in April
+    assert quarterly[ATTR_DEMAND] == [1, 0, 0]
+    assert quarterly[ATTR_SHORTFALL] == 0
+    assert quarterly[ATTR_DEPLETED] is None
+
+    assert rule[ATTR_DEMAND] == [0, 1, 1]
+    assert rule[ATTR_DEPLETED] == "2023-02"
+
+    assert projection[ATTR_TOTALS] == [3, 5, 6]
+
+
+def test_project_overdue():
+    """Test a replacement overdue for several weeks counts once."""
+    overdue = ITEM_WEEKLY._replace(date=date(2022, 12, 1).toordinal())
+    (replacement,) = project((overdue,), TODAY, 2)[ATTR_REPLACEMENTS]
+
+    # Today, then Jan 22, 29, Feb 5, 12, 19, 26
+    assert replacement[ATTR_DEMAND] == [3, 4]
+
+    # Also when it fell due earlier in the current month
+    overdue = ITEM_WEEKLY._replace(date=date(2023, 1, 3).toordinal())
+    (replacement,) = project((overdue,), TODAY, 1)[ATTR_REPLACEMENTS]
+    assert replacement[ATTR_DEMAND] == [3]
+
+
+def test_project_pool():
+    """Test the replacements of a pool share its stock."""
+    pooled = [
+        ProjectionItem(
+            f"sensor.pooled_{index}",
+            f"Pooled {index}",
+            date(2023, 1, 20).toordinal(),
+            CONF_MONTHS_INTERVAL,
+            6,
+            1,
+            "sensor.filters_pool",
+        )
+        for index in range(2)
+    ]
+    projection = project(tuple(pooled), TODAY, 3)
+
+    # Each replacement alone is covered, but not both of them
+    for replacement in projection[ATTR_REPLACEMENTS]:
+        assert replacement[ATTR_POOL] == "sensor.filters_pool"
+        assert replacement[ATTR_TOTAL] == 1
+        assert replacement[ATTR_SHORTFALL] == 1
+        assert replacement[ATTR_DEPLETED] == "2023-01"
+
+    assert projection[ATTR_POOLS] == {
+        "sensor.filters_pool": {
+            ATTR_STOCK: 1,
+            ATTR_DEMAND: [2, 0, 0],
+            ATTR_TOTAL: 2,
+            ATTR_SHORTFALL: 1,
+            ATTR_DEPLETED: "2023-01",
+        }
+    }
+
+
+def test_project_cache():
+    """Test repeated projections are served from the cache."""
+    project.cache_clear()
+    items = (ITEM_WEEKLY, ITEM_QUARTERLY)
+
+    first = project(items, TODAY, 12)
+    assert project(items, TODAY, 12) is first
+    assert project.cache_info().hits == 1
+
+    # Any change of the stock or schedule is a new projection
+    changed = (ITEM_WEEKLY._replace(stock=20), ITEM_QUARTERLY)
+    assert project(changed, TODAY, 12) is not first
+    assert project.cache_info().misses == 2
@@ -0,0 +1,55 @@
+"""Tests for the recorded states of the replacements."""
+from __future__ import annotations
+
+from homeassistant.components.recorder import get_instance, history
+from homeassistant.const import ATTR_DATE, ATTR_ENTITY_ID
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.replacements.const import COMPONENT_NAME, CONF_ADAPTIVE, DOMAIN
+from custom_components.replacements.sensor import (
+    ATTR_DAYS_INTERVAL,
+    ATTR_LEARNED_INTERVAL,
+    ATTR_STOCK,
+    ENTITY_ID_FORMAT,
+    SERVICE_REPLACED,
+)
+
+from .const import MOCK_CONFIG_DAYS
+
+ENTITY_ID = ENTITY_ID_FORMAT.format("replace_test_days_1")
+
+
+async def test_recorded_attributes(hass, recorder_mock):
+    """Test the learned statistics are not recorded with the states."""
+    start = dt_util.utcnow()
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=COMPONENT_NAME,
+        data={DOMAIN: [{**MOCK_CONFIG_DAYS, CONF_ADAPTIVE: True}]},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    await hass.services.async_call(
+        DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: ENTITY_ID}, blocking=True
+    )
+    await async_wait_recording_done(hass)
+
+    states = await get_instance(hass).async_add_executor_job(
+        history.state_changes_during_period, hass, start, None, ENTITY_ID
+    )
+    assert states[ENTITY_ID]
+    for state in states[ENTITY_ID]:
+        assert set(state.attributes) <= {
+            ATTR_DAYS_INTERVAL,
+            ATTR_DATE,
+            ATTR_STOCK,
+            ATTR_LEARNED_INTERVAL,
+            "unit_of_measurement",
+            "friendly_name",
+            "icon",
+        }
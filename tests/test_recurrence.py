@@ -0,0 +1,74 @@
+"""Tests for the recurrence module."""
+from datetime import date
+
+import pytest
+
+from custom_components.replacements.const import (
+    CONF_DAYS_INTERVAL,
+    CONF_MONTHS_INTERVAL,
+    CONF_WEEKS_INTERVAL,
+    CONF_YEARS_INTERVAL,
+)
+from custom_components.replacements.recurrence import RRuleRecurrence, next_date
+
+
+def test_next_date_fixed_intervals():
+    """Test days and weeks are added as a fixed number of days."""
+    start = date(2022, 12, 30)
+
+    assert next_date(start, CONF_DAYS_INTERVAL, 4) == date(2023, 1, 3)
+    assert next_date(start, CONF_WEEKS_INTERVAL, 2) == date(2023, 1, 13)
+
+
+def test_next_date_calendar_intervals():
+    """Test months and years are added on the calendar."""
+    assert next_date(date(2022, 5, 15), CONF_MONTHS_INTERVAL, 3) == date(2022, 8, 15)
+    assert next_date(date(2022, 5, 15), CONF_YEARS_INTERVAL, 2) == date(2024, 5, 15)
+
+    # Days that do not exist in the target month are clamped to its end
+    assert next_date(date(2022, 1, 31), CONF_MONTHS_INTERVAL, 1) == date(2022, 2, 28)
+    assert next_date(date(2024, 1, 31), CONF_MONTHS_INTERVAL, 1) == date(2024, 2, 29)
+    assert next_date(date(2022, 8, 31), CONF_MONTHS_INTERVAL, 3) == date(2022, 11, 30)
+    assert next_date(date(2024, 2, 29), CONF_YEARS_INTERVAL, 1) == date(2025, 2, 28)
+
+
+def test_next_date_cache():
+    """Test repeated calculations are served from the cache."""
+    next_date.cache_clear()
+    start = date(2022, 3, 31)
+
+    for _ in range(10):
+        assert next_date(start, CONF_MONTHS_INTERVAL, 1) == date(2022, 4, 30)
+
+    info = next_date.cache_info()
+    assert info.misses == 1
+    assert info.hits == 9
+
+
+def test_rrule_next_date():
+    """Test the next occurrences of a recurrence rule."""
+    recurrence = RRuleRecurrence("FREQ=MONTHLY;INTERVAL=3;BYDAY=1MO")
+
+    # The first Monday of every quarter, always after the start date
+    assert recurrence.next_date(date(2022, 10, 19)) == date(2023, 1, 2)
+    assert recurrence.next_date(date(2023, 1, 2)) == date(2023, 4, 3)
+    assert recurrence.next_date(date(2024, 6, 1)) == date(2024, 7, 1)
+
+    # Going back in time expands the rule again
+    assert recurrence.next_date(date(2022, 2, 1)) == date(2022, 4, 4)
+
+
+def test_rrule_dtstart_and_exhausted():
+    """Test rules with their own start and a limited number of occurrences."""
+    recurrence = RRuleRecurrence("DTSTART:20230105T000000\nRRULE:FREQ=YEARLY;COUNT=2")
+
+    assert recurrence.next_date(date(2022, 1, 1)) == date(2023, 1, 5)
+    assert recurrence.next_date(date(2023, 1, 5)) == date(2024, 1, 5)
+    assert recurrence.next_date(date(2024, 1, 5)) is None
+
+
+def test_rrule_invalid():
+    """Test a ValueError is raised for invalid rules."""
+    for rule in ("", "FREQ=FORTNIGHTLY", "not a rule"):
+        with pytest.raises(ValueError):
+            RRuleRecurrence(rule)
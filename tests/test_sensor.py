@@ -6,11 +6,13 @@ from datetime import date, datetime, timedelta
 # Import everything provided by home assistant and the test component
 from homeassistant.const import (
     ATTR_DATE,
+    ATTR_DEVICE_CLASS,
     ATTR_ENTITY_ID,
     ATTR_UNIT_OF_MEASUREMENT,
     CONF_NAME,
     CONF_UNIT_OF_MEASUREMENT,
     EVENT_HOMEASSISTANT_START,
+    EVENT_STATE_CHANGED,
 )
 from homeassistant.core import State
 from homeassistant.helpers.entity import generate_entity_id
@@ -18,35 +20,51 @@ import homeassistant.util.dt as dt_util
 import pytest
 from pytest_homeassistant_custom_component.common import (
     MockConfigEntry,
+    async_capture_events,
     async_fire_time_changed,
     mock_restore_cache_with_extra_data,
     patch,
 )
 
 # Import everything from the integration
+from custom_components.replacements.clock import LocalToday
 from custom_components.replacements.const import (
     COMPONENT_NAME,
     CONF_DAYS_INTERVAL,
+    CONF_MONTHS_INTERVAL,
     CONF_PREFIX,
+    CONF_RRULE,
     CONF_WEEKS_INTERVAL,
+    CONF_YEARS_INTERVAL,
+    DATA_INDEX,
+    DATA_TODAY,
     DOMAIN,
+    UNIQUE_ID_FORMAT,
 )
+from custom_components.replacements.recurrence import RRuleRecurrence, next_date
 from custom_components.replacements.sensor import (
     ATTR_DAYS_INTERVAL,
+    ATTR_MONTHS_INTERVAL,
     ATTR_NEW_DATE,
+    ATTR_RRULE,
     ATTR_STOCK,
     ATTR_WEEKS_INTERVAL,
+    ATTR_YEARS_INTERVAL,
     ENTITY_ID_FORMAT,
     SERVICE_DATE,
     SERVICE_REPLACED,
     SERVICE_STOCK,
-    UNIQUE_ID_FORMAT,
 )
 
 # Import everything from the tests
-from .const import MOCK_CONFIG_DAYS, MOCK_CONFIG_WEEKS
-
-# from .mock_datetime import mock_datetime
+from .const import (
+    MOCK_CONFIG_DAYS,
+    MOCK_CONFIG_MONTHS,
+    MOCK_CONFIG_RRULE,
+    MOCK_CONFIG_TIMESTAMP,
+    MOCK_CONFIG_WEEKS,
+    MOCK_CONFIG_YEARS,
+)
 
 
 def calculate_days_remaining(hass, entity_id) -> int:
@@ -58,7 +76,7 @@ def calculate_days_remaining(hass, entity_id) -> int:
     new_date: datetime | None = dt_util.parse_datetime(state.attributes[ATTR_DATE])
 
     # Check that the new date is correct. This must be equal to the configured interval
-    today = date.today()
+    today = dt_util.now().date()
     return (new_date.date() - today).days
 
 
@@ -78,12 +96,11 @@ async def test_state(hass):
     # Definitions for state restore test
     test_store_native_value = 6
     test_store_days = 5
-    test_store_date = date.today() + timedelta(days=test_store_days)
+    test_store_date = dt_util.now().date() + timedelta(days=test_store_days)
     test_store_stock = 5
 
     # Definitions for state update test
     test_elapse_days = 3
-    test_elapsed_date = date.today() + timedelta(days=test_elapse_days)
 
     # Generate IDs for the entities
 
@@ -152,7 +169,7 @@ async def test_state(hass):
     await hass.async_block_till_done()
 
     # Assert that all properties are as expected for the normal entity
-    expected_normal_date = date.today() + timedelta(
+    expected_normal_date = dt_util.now().date() + timedelta(
         weeks=yaml_normal_mock[CONF_WEEKS_INTERVAL]
     )
     state = hass.states.get(yaml_normal_entity_id)
@@ -182,12 +199,9 @@ async def test_state(hass):
     # Force refresh of the configured entities, simulating some days have passed
     now = dt_util.utcnow() + timedelta(days=test_elapse_days)
 
-    with patch("tests.test_sensor.date") as mock_test_date, patch(
-        "custom_components.replacements.sensor.date"
-    ) as mock_sensor_date, patch("homeassistant.util.dt.utcnow", return_value=now):
-        mock_test_date.today.return_value = test_elapsed_date
-        mock_sensor_date.today.return_value = test_elapsed_date
-
+    with patch("homeassistant.util.dt.now", return_value=now), patch(
+        "homeassistant.util.dt.utcnow", return_value=now
+    ):
         async_fire_time_changed(hass, now)
         await hass.async_block_till_done()
 
@@ -232,7 +246,7 @@ async def test_no_stored_extra_data(hass):
 
     # Definitions for state restore test
     test_days = 5
-    test_date = date.today() + timedelta(days=test_days)
+    test_date = dt_util.now().date() + timedelta(days=test_days)
     test_stock = 5
 
     # Generate IDs for the entities
@@ -280,7 +294,7 @@ async def test_no_stored_extra_data(hass):
     await hass.async_block_till_done()
 
     # Assert that all properties are as expected for the restored entity
-    expected_date = date.today() + timedelta(days=yaml_mock[CONF_DAYS_INTERVAL])
+    expected_date = dt_util.now().date() + timedelta(days=yaml_mock[CONF_DAYS_INTERVAL])
     state = hass.states.get(yaml_entity_id)
 
     assert int(state.state) == 0
@@ -306,7 +320,7 @@ async def test_no_stored_stock(hass):
     # Definitions for state restore test
     test_native_value = 10
     test_days = 5
-    test_date = date.today() + timedelta(days=test_days)
+    test_date = dt_util.now().date() + timedelta(days=test_days)
 
     # Generate IDs for the entities
     yaml_unique_id = generate_entity_id(
@@ -350,7 +364,7 @@ async def test_no_stored_stock(hass):
     await hass.async_block_till_done()
 
     # Assert that all properties are as expected for the restored entity
-    expected_date = date.today() + timedelta(days=yaml_mock[CONF_DAYS_INTERVAL])
+    expected_date = dt_util.now().date() + timedelta(days=yaml_mock[CONF_DAYS_INTERVAL])
     state = hass.states.get(yaml_entity_id)
 
     assert int(state.state) == 0
@@ -419,7 +433,7 @@ async def test_no_stored_date(hass):
     await hass.async_block_till_done()
 
     # Assert that all properties are as expected for the restored entity
-    expected_date = date.today() + timedelta(days=yaml_mock[CONF_DAYS_INTERVAL])
+    expected_date = dt_util.now().date() + timedelta(days=yaml_mock[CONF_DAYS_INTERVAL])
     state = hass.states.get(yaml_entity_id)
 
     assert int(state.state) == 0
@@ -488,7 +502,7 @@ async def test_wrong_stored_date(hass):
     await hass.async_block_till_done()
 
     # Assert that all properties are as expected for the restored entity
-    expected_date = date.today() + timedelta(days=yaml_mock[CONF_DAYS_INTERVAL])
+    expected_date = dt_util.now().date() + timedelta(days=yaml_mock[CONF_DAYS_INTERVAL])
     state = hass.states.get(yaml_entity_id)
 
     assert int(state.state) == 0
@@ -505,7 +519,7 @@ async def test_services(hass):
     """Test replacement sensor services with a config entry."""
     entry_mock = MOCK_CONFIG_DAYS
     test_elapse_days = 3
-    test_date = date.today() + timedelta(days=test_elapse_days)
+    test_date = dt_util.now().date() + timedelta(days=test_elapse_days)
     test_stock = 10
 
     # Generate the entities in the entry
@@ -586,3 +600,182 @@ async def test_services(hass):
             {ATTR_ENTITY_ID: entry_entity_id, ATTR_NEW_DATE: "1991-04-26"},
             blocking=True,
         )
+
+
+async def test_calendar_intervals(hass):
+    """Test replacement sensors with months and years intervals."""
+
+    # Generate the entities in the entry
+    test_data = {}
+    test_data[DOMAIN] = []
+    test_data[DOMAIN].append(MOCK_CONFIG_MONTHS)
+    test_data[DOMAIN].append(MOCK_CONFIG_YEARS)
+
+    months_entity_id = generate_entity_id(
+        ENTITY_ID_FORMAT,
+        MOCK_CONFIG_MONTHS[CONF_PREFIX] + MOCK_CONFIG_MONTHS[CONF_NAME],
+        [],
+    )
+    years_entity_id = generate_entity_id(
+        ENTITY_ID_FORMAT,
+        MOCK_CONFIG_YEARS[CONF_PREFIX] + MOCK_CONFIG_YEARS[CONF_NAME],
+        [],
+    )
+
+    # Add the config entry
+    config_entry = MockConfigEntry(domain=DOMAIN, title=COMPONENT_NAME, data=test_data)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # Assert the months entity has the calendar date and interval attribute
+    expected_months_date = next_date(
+        dt_util.now().date(),
+        CONF_MONTHS_INTERVAL,
+        MOCK_CONFIG_MONTHS[CONF_MONTHS_INTERVAL],
+    )
+    state = hass.states.get(months_entity_id)
+    assert (
+        state.attributes[ATTR_MONTHS_INTERVAL]
+        == MOCK_CONFIG_MONTHS[CONF_MONTHS_INTERVAL]
+    )
+    assert ATTR_DAYS_INTERVAL not in state.attributes
+    assert state.attributes[ATTR_DATE] == expected_months_date.isoformat()
+
+    # Assert the years entity has the calendar date and interval attribute
+    expected_years_date = next_date(
+        dt_util.now().date(),
+        CONF_YEARS_INTERVAL,
+        MOCK_CONFIG_YEARS[CONF_YEARS_INTERVAL],
+    )
+    state = hass.states.get(years_entity_id)
+    assert (
+        state.attributes[ATTR_YEARS_INTERVAL] == MOCK_CONFIG_YEARS[CONF_YEARS_INTERVAL]
+    )
+    assert state.attributes[ATTR_DATE] == expected_years_date.isoformat()
+
+
+async def test_rrule(hass):
+    """Test replacement sensors with a recurrence rule."""
+    entry_mock = MOCK_CONFIG_RRULE
+
+    test_data = {}
+    test_data[DOMAIN] = []
+    test_data[DOMAIN].append(entry_mock)
+
+    entry_entity_id = generate_entity_id(
+        ENTITY_ID_FORMAT, entry_mock[CONF_PREFIX] + entry_mock[CONF_NAME], []
+    )
+
+    # Add the config entry
+    config_entry = MockConfigEntry(domain=DOMAIN, title=COMPONENT_NAME, data=test_data)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # The date is the next occurrence of the rule
+    expected_date = RRuleRecurrence(entry_mock[CONF_RRULE]).next_date(
+        dt_util.now().date()
+    )
+    state = hass.states.get(entry_entity_id)
+    assert state.attributes[ATTR_RRULE] == entry_mock[CONF_RRULE]
+    assert state.attributes[ATTR_DATE] == expected_date.isoformat()
+
+    # Replacing on the due date moves to the following occurrence
+    with patch.object(LocalToday, "today", expected_date):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_REPLACED,
+            {ATTR_ENTITY_ID: entry_entity_id},
+            blocking=True,
+        )
+
+    expected_next_date = RRuleRecurrence(entry_mock[CONF_RRULE]).next_date(
+        expected_date
+    )
+    state = hass.states.get(entry_entity_id)
+    assert expected_next_date > expected_date
+    assert state.attributes[ATTR_DATE] == expected_next_date.isoformat()
+
+
+async def test_rrule_exhausted(hass):
+    """Test replacement sensors with a recurrence rule without occurrences left."""
+    entry_mock = {**MOCK_CONFIG_RRULE, CONF_RRULE: "FREQ=DAILY;UNTIL=20220101"}
+
+    test_data = {}
+    test_data[DOMAIN] = []
+    test_data[DOMAIN].append(entry_mock)
+
+    entry_entity_id = generate_entity_id(
+        ENTITY_ID_FORMAT, entry_mock[CONF_PREFIX] + entry_mock[CONF_NAME], []
+    )
+
+    # Add the config entry
+    config_entry = MockConfigEntry(domain=DOMAIN, title=COMPONENT_NAME, data=test_data)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # Without occurrences, the replacement is due today
+    state = hass.states.get(entry_entity_id)
+    assert state.attributes[ATTR_DATE] == dt_util.now().date().isoformat()
+
+    # Replacing keeps the last date
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_REPLACED,
+        {ATTR_ENTITY_ID: entry_entity_id},
+        blocking=True,
+    )
+    state = hass.states.get(entry_entity_id)
+    assert state.attributes[ATTR_DATE] == dt_util.now().date().isoformat()
+
+
+async def test_timestamp_state(hass):
+    """Test the timestamp state only changes when the date changes."""
+    test_data = {DOMAIN: [MOCK_CONFIG_TIMESTAMP]}
+    entity_id = ENTITY_ID_FORMAT.format(
+        generate_entity_id(
+            UNIQUE_ID_FORMAT,
+            MOCK_CONFIG_TIMESTAMP[CONF_PREFIX] + MOCK_CONFIG_TIMESTAMP[CONF_NAME],
+            [],
+        )
+    )
+
+    config_entry = MockConfigEntry(domain=DOMAIN, title=COMPONENT_NAME, data=test_data)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # The state is the start of the next replacement day, without a unit
+    expected_date = dt_util.now().date() + timedelta(
+        days=MOCK_CONFIG_TIMESTAMP[CONF_DAYS_INTERVAL]
+    )
+    state = hass.states.get(entity_id)
+    assert state.state == dt_util.start_of_local_day(expected_date).isoformat()
+    assert state.attributes[ATTR_DEVICE_CLASS] == "timestamp"
+    assert ATTR_UNIT_OF_MEASUREMENT not in state.attributes
+
+    # No state writes while the days pass, the frontend counts them down
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+    for elapsed_days in range(1, 4):
+        now = dt_util.utcnow() + timedelta(days=elapsed_days)
+        with patch("homeassistant.util.dt.utcnow", return_value=now):
+            hass.data[DOMAIN][DATA_TODAY].invalidate()
+            async_fire_time_changed(hass, now)
+            await hass.async_block_till_done()
+
+    # The countdown still happened, it is just not part of the state
+    row = hass.data[DOMAIN][DATA_INDEX].rows[entity_id]
+    assert row.days_remaining == MOCK_CONFIG_TIMESTAMP[CONF_DAYS_INTERVAL] - 3
+    assert events == []
+
+    # Replacing the item sets a new date
+    await hass.services.async_call(
+        DOMAIN, SERVICE_DATE, {ATTR_ENTITY_ID: entity_id, ATTR_NEW_DATE: "2099-01-01"}
+    )
+    await hass.async_block_till_done()
+
+    state = hass.states.get(entity_id)
+    assert state.state == dt_util.start_of_local_day(date(2099, 1, 1)).isoformat()
+    assert len(events) == 1
@@ -0,0 +1,199 @@
+"""Tests for the services module."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.const import ATTR_ENTITY_ID, CONF_NAME
+from homeassistant.core import Context
+import homeassistant.util.dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+import voluptuous as vol
+
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONF_DAYS_INTERVAL,
+    CONF_SOON,
+    DOMAIN,
+    EVENT_PROJECTION_RESULT,
+    EVENT_QUERY_RESULT,
+    EVENT_SIMULATION_RESULT,
+)
+from custom_components.replacements.projection import (
+    ATTR_PERIODS,
+    ATTR_SHORTFALL,
+    ATTR_TOTAL,
+)
+from custom_components.replacements.sensor import ENTITY_ID_FORMAT, SERVICE_STOCK
+from custom_components.replacements.services import (
+    ATTR_DAYS,
+    ATTR_END_DATE,
+    ATTR_MONTHS,
+    ATTR_QUERY_ID,
+    ATTR_REPLACEMENTS,
+    ATTR_START_DATE,
+    ATTR_STOCK,
+    ATTR_STOCK_BELOW,
+    SERVICE_PROJECT,
+    SERVICE_QUERY,
+    SERVICE_SIMULATE,
+)
+from custom_components.replacements.simulation import ATTR_BUCKETS
+
+from .const import MOCK_CONFIG_DAYS
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+async def test_query(hass):
+    """Test querying the replacements by date range and stock."""
+    test_data = {DOMAIN: []}
+    for index in range(4):
+        test_data[DOMAIN].append(
+            {
+                **MOCK_CONFIG_DAYS,
+                CONF_NAME: f"Item {index}",
+                CONF_DAYS_INTERVAL: index + 1,
+            }
+        )
+    config_entry = MockConfigEntry(domain=DOMAIN, title=COMPONENT_NAME, data=test_data)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_ids = [
+        ENTITY_ID_FORMAT.format(f"replace_item_{index}") for index in range(4)
+    ]
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_STOCK,
+        {ATTR_ENTITY_ID: entity_ids[3], ATTR_STOCK: 5},
+        blocking=True,
+    )
+
+    events = async_capture_events(hass, EVENT_QUERY_RESULT)
+    today = dt_util.now().date()
+    context = Context()
+
+    # Due in the next two days, or with less than one in stock
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_QUERY,
+        {
+            ATTR_START_DATE: str(today + timedelta(days=2)),
+            ATTR_END_DATE: str(today + timedelta(days=3)),
+            ATTR_QUERY_ID: "soon",
+        },
+        blocking=True,
+        context=context,
+    )
+    await hass.services.async_call(
+        DOMAIN, SERVICE_QUERY, {ATTR_STOCK_BELOW: 1}, blocking=True
+    )
+    await hass.async_block_till_done()
+
+    assert events[0].context is context
+    assert events[0].data[ATTR_QUERY_ID] == "soon"
+    result = events[0].data[ATTR_REPLACEMENTS]
+    assert [item[ATTR_ENTITY_ID] for item in result] == entity_ids[1:3]
+    assert result[0]["date"] == str(today + timedelta(days=2))
+
+    result = events[1].data[ATTR_REPLACEMENTS]
+    assert [item[ATTR_ENTITY_ID] for item in result] == entity_ids[:3]
+
+    # At least one of the filters is required
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(DOMAIN, SERVICE_QUERY, {}, blocking=True)
+
+
+async def test_project(hass):
+    """Test projecting the replacements of the next months."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, title=COMPONENT_NAME, data={DOMAIN: [MOCK_CONFIG_DAYS]}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = ENTITY_ID_FORMAT.format("replace_test_days_1")
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_STOCK,
+        {ATTR_ENTITY_ID: entity_id, ATTR_STOCK: 5},
+        blocking=True,
+    )
+
+    events = async_capture_events(hass, EVENT_PROJECTION_RESULT)
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PROJECT,
+        {ATTR_MONTHS: 2, ATTR_QUERY_ID: "purchases"},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    assert events[0].data[ATTR_QUERY_ID] == "purchases"
+    assert len(events[0].data[ATTR_PERIODS]) == 2
+    (replacement,) = events[0].data[ATTR_REPLACEMENTS]
+    assert replacement[ATTR_ENTITY_ID] == entity_id
+    assert replacement[ATTR_STOCK] == 5
+
+    # Every 4 days, from the next replacement date until the end of next month
+    today = dt_util.now().date()
+    end = (today.replace(day=1) + timedelta(days=62)).replace(day=1)
+    first = today + timedelta(days=MOCK_CONFIG_DAYS[CONF_DAYS_INTERVAL])
+    expected = len(range(first.toordinal(), end.toordinal(), 4))
+    assert replacement[ATTR_TOTAL] == expected
+    assert replacement[ATTR_SHORTFALL] == max(0, expected - 5)
+
+
+async def test_simulate(hass):
+    """Test simulating other settings without changing the replacements."""
+    test_data = {DOMAIN: []}
+    for index in range(2):
+        test_data[DOMAIN].append({**MOCK_CONFIG_DAYS, CONF_NAME: f"Item {index}"})
+    config_entry = MockConfigEntry(domain=DOMAIN, title=COMPONENT_NAME, data=test_data)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = ENTITY_ID_FORMAT.format("replace_item_0")
+    state = hass.states.get(entity_id)
+
+    events = async_capture_events(hass, EVENT_SIMULATION_RESULT)
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SIMULATE,
+        {
+            ATTR_DAYS: 9,
+            ATTR_ENTITY_ID: entity_id,
+            CONF_DAYS_INTERVAL: 2,
+            CONF_SOON: 0,
+            ATTR_QUERY_ID: "what_if",
+        },
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    # Both are due in 4 days, then item 0 every 2 days and item 1 every 4
+    assert events[0].data[ATTR_QUERY_ID] == "what_if"
+    buckets = events[0].data[ATTR_BUCKETS]
+    assert buckets["today"] == [0, 0, 0, 0, 2, 0, 1, 0, 2]
+    assert buckets["soon"] == [0, 0, 0, 1, 0, 0, 0, 1, 0]
+    assert events[0].data[ATTR_REPLACEMENTS] == 5
+
+    # The replacement is not changed
+    assert hass.states.get(entity_id) == state
+
+    # Invalid rules are rejected
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_SIMULATE, {"rrule": "FREQ=SOMETIMES"}, blocking=True
+        )
@@ -0,0 +1,81 @@
+"""Tests for the simulation module."""
+from __future__ import annotations
+
+from datetime import date
+
+from custom_components.replacements.const import (
+    BUCKET_EXPIRED,
+    BUCKET_NORMAL,
+    BUCKET_SOON,
+    BUCKET_TODAY,
+    CONF_DAYS_INTERVAL,
+    CONF_MONTHS_INTERVAL,
+    CONF_RRULE,
+    CONF_WEEKS_INTERVAL,
+)
+from custom_components.replacements.simulation import (
+    ATTR_BUCKETS,
+    ATTR_REPLACEMENTS,
+    ATTR_START,
+    SimulationItem,
+    simulate,
+)
+
+TODAY = date(2023, 1, 15)
+
+ITEM_DAYS = SimulationItem(
+    "sensor.days", date(2023, 1, 18).toordinal(), CONF_DAYS_INTERVAL, 4, 2
+)
+ITEM_OVERDUE = SimulationItem(
+    "sensor.overdue", date(2023, 1, 10).toordinal(), CONF_WEEKS_INTERVAL, 1, 3
+)
+ITEM_MONTHS = SimulationItem(
+    "sensor.months", date(2023, 1, 16).toordinal(), CONF_MONTHS_INTERVAL, 1, 0
+)
+ITEM_RRULE = SimulationItem(
+    "sensor.rule", date(2023, 1, 16).toordinal(), CONF_RRULE, "FREQ=WEEKLY;BYDAY=MO", 2
+)
+
+
+def test_simulate():
+    """Test the daily buckets, from the current dates on."""
+    simulation = simulate((ITEM_DAYS, ITEM_OVERDUE, ITEM_MONTHS, ITEM_RRULE), TODAY, 10)
+
+    assert simulation[ATTR_START] == "2023-01-15"
+    buckets = simulation[ATTR_BUCKETS]
+
+    # The overdue replacement is replaced today, and weekly from then on
+    assert buckets[BUCKET_EXPIRED] == [1, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+
+    # Days on the 18th, 22nd, weeks on the 22nd, months on the 16th, and the
+    #  rule on the 16th and 23rd
+    assert buckets[BUCKET_TODAY] == [0, 2, 0, 1, 0, 0, 0, 2, 1, 0]
+    assert buckets[BUCKET_SOON] == [1, 1, 1, 0, 1, 2, 3, 1, 0, 1]
+    assert buckets[BUCKET_NORMAL] == [
+        4 - expired - today - soon
+        for expired, today, soon in zip(
+            buckets[BUCKET_EXPIRED], buckets[BUCKET_TODAY], buckets[BUCKET_SOON]
+        )
+    ]
+    assert simulation[ATTR_REPLACEMENTS] == 7
+
+
+def test_simulate_fleet():
+    """Test simulating thousands of replacements over five years."""
+    items = tuple(
+        SimulationItem(
+            f"sensor.item_{index}",
+            TODAY.toordinal() + index % 30,
+            CONF_DAYS_INTERVAL,
+            30,
+            7,
+        )
+        for index in range(3000)
+    )
+    simulation = simulate(items, TODAY, 5 * 366)
+    buckets = simulation[ATTR_BUCKETS]
+
+    # One replacement per day after the first month, and 7 soon ones
+    assert buckets[BUCKET_TODAY][100:] == [100] * (5 * 366 - 100)
+    assert buckets[BUCKET_SOON][100:] == [700] * (5 * 366 - 100)
+    assert simulation[ATTR_REPLACEMENTS] == 100 * 5 * 366
@@ -0,0 +1,104 @@
+"""Tests for the statistics module."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.const import ATTR_ENTITY_ID
+import homeassistant.util.dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    patch,
+)
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONF_STATISTICS,
+    DOMAIN,
+    STATISTICS_IMPORT_HOURS,
+)
+from custom_components.replacements.sensor import (
+    ATTR_STOCK,
+    ENTITY_ID_FORMAT,
+    SERVICE_STOCK,
+)
+from custom_components.replacements.statistics import STATISTIC_OVERDUE, STATISTIC_STOCK
+
+from .const import MOCK_CONFIG_DAYS
+
+UNIQUE_ID = "replace_test_days_1"
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+async def async_fire_hours(hass, start, hours):
+    """Fire the time just after the start of the next hours."""
+    for hour in range(1, hours + 1):
+        now = start + timedelta(hours=hour, seconds=1)
+        with patch(
+            "homeassistant.helpers.event.time_tracker_utcnow", return_value=now
+        ), patch("homeassistant.util.dt.utcnow", return_value=now):
+            async_fire_time_changed(hass, now)
+            await hass.async_block_till_done()
+
+
+async def test_statistics(hass, recorder_mock):
+    """Test the hourly samples are imported in batches."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=COMPONENT_NAME,
+        data={DOMAIN: [MOCK_CONFIG_DAYS]},
+        options={CONF_STATISTICS: True},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_STOCK,
+        {ATTR_ENTITY_ID: ENTITY_ID_FORMAT.format(UNIQUE_ID), ATTR_STOCK: 3},
+        blocking=True,
+    )
+
+    # Nothing is imported before a full batch of samples
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    stock_id = STATISTIC_STOCK.format(UNIQUE_ID)
+    overdue_id = STATISTIC_OVERDUE.format(config_entry.entry_id)
+
+    await async_fire_hours(hass, start, STATISTICS_IMPORT_HOURS - 1)
+    await async_wait_recording_done(hass)
+    stats = await get_instance(hass).async_add_executor_job(
+        statistics_during_period, hass, start, None, [stock_id]
+    )
+    assert stats == {}
+
+    await async_fire_hours(
+        hass, start + timedelta(hours=STATISTICS_IMPORT_HOURS - 1), 1
+    )
+    await async_wait_recording_done(hass)
+    stats = await get_instance(hass).async_add_executor_job(
+        statistics_during_period, hass, start, None, [stock_id, overdue_id]
+    )
+    assert len(stats[stock_id]) == STATISTICS_IMPORT_HOURS
+    assert {row["mean"] for row in stats[stock_id]} == {3}
+    assert {row["mean"] for row in stats[overdue_id]} == {0}
+
+    # The pending samples are imported when the entry is unloaded
+    await async_fire_hours(hass, start + timedelta(hours=STATISTICS_IMPORT_HOURS), 2)
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await async_wait_recording_done(hass)
+    stats = await get_instance(hass).async_add_executor_job(
+        statistics_during_period, hass, start, None, [stock_id]
+    )
+    assert len(stats[stock_id]) == STATISTICS_IMPORT_HOURS + 2
@@ -0,0 +1,103 @@
+"""Tests for the storage module."""
+from datetime import timedelta
+
+from homeassistant.const import CONF_NAME, CONF_UNIQUE_ID
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed, patch
+
+from custom_components.replacements.const import (
+    CONF_ADD_ANOTHER,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY,
+)
+from custom_components.replacements.storage import ReplacementsStore
+
+from .const import MOCK_CONFIG_DAYS, MOCK_CONFIG_SMALL, MOCK_CONFIG_WEEKS
+
+TEST_ENTRY_ID = "test_entry"
+TEST_KEY = STORAGE_KEY.format(TEST_ENTRY_ID)
+
+
+def mock_replacement(index: int) -> dict:
+    """Return a replacement definition with a unique name."""
+    return {**MOCK_CONFIG_SMALL, CONF_NAME: f"Test Chunk {index}"}
+
+
+async def test_store_add_and_load(hass, hass_storage):
+    """Test replacements are saved after a delay and loaded again."""
+    store = ReplacementsStore(hass, TEST_ENTRY_ID)
+    await store.async_load()
+    assert store.items == {}
+
+    unique_id = store.async_add(MOCK_CONFIG_DAYS)
+    store.async_add(MOCK_CONFIG_WEEKS)
+
+    # Nothing is written until the delay has passed
+    assert TEST_KEY + ".0" not in hass_storage
+
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=STORAGE_SAVE_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+
+    assert hass_storage[TEST_KEY]["data"] == {"chunks": [0]}
+    assert len(hass_storage[TEST_KEY + ".0"]["data"]["items"]) == 2
+
+    # The config flow only fields are not stored, and the unique ID is added
+    item = hass_storage[TEST_KEY + ".0"]["data"]["items"][unique_id]
+    assert CONF_ADD_ANOTHER not in item
+    assert item[CONF_UNIQUE_ID] == unique_id
+
+    # Load the stored replacements again
+    store = ReplacementsStore(hass, TEST_ENTRY_ID)
+    await store.async_load()
+    assert list(store.items) == [unique_id, "replace_test_weeks_2"]
+
+
+async def test_store_chunks(hass, hass_storage):
+    """Test a change only writes the chunk of the changed replacement."""
+    with patch("custom_components.replacements.storage.STORAGE_CHUNK_SIZE", 3):
+        store = ReplacementsStore(hass, TEST_ENTRY_ID)
+        await store.async_load()
+
+        unique_ids = [store.async_add(mock_replacement(index)) for index in range(7)]
+        await store.async_flush()
+
+    assert hass_storage[TEST_KEY]["data"] == {"chunks": [0, 1, 2]}
+    for chunk_id, size in ((0, 3), (1, 3), (2, 1)):
+        assert len(hass_storage[f"{TEST_KEY}.{chunk_id}"]["data"]["items"]) == size
+
+    # Removing a replacement only writes its own chunk
+    with patch("homeassistant.helpers.storage.Store._write_data") as mock_write_data:
+        store.async_remove_item(unique_ids[4])
+        store.async_remove_item("not_stored")
+        await store.async_flush()
+
+    assert mock_write_data.call_count == 1
+    assert mock_write_data.call_args[0][1]["key"] == f"{TEST_KEY}.1"
+    assert len(store.items) == 6
+    assert unique_ids[3] in store
+    assert unique_ids[4] not in store
+
+    # Nothing is written when there are no pending changes
+    with patch("homeassistant.helpers.storage.Store._write_data") as mock_write_data:
+        await store.async_flush()
+
+    assert mock_write_data.call_count == 0
+
+
+async def test_store_remove(hass, hass_storage):
+    """Test all the files of an entry are removed."""
+    with patch("custom_components.replacements.storage.STORAGE_CHUNK_SIZE", 1):
+        store = ReplacementsStore(hass, TEST_ENTRY_ID)
+        await store.async_load()
+
+        store.async_add(MOCK_CONFIG_DAYS)
+        store.async_add(MOCK_CONFIG_WEEKS)
+        await store.async_flush()
+
+    assert len([key for key in hass_storage if key.startswith(TEST_KEY)]) == 3
+
+    await ReplacementsStore(hass, TEST_ENTRY_ID).async_remove()
+
+    assert not [key for key in hass_storage if key.startswith(TEST_KEY)]
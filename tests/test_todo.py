@@ -0,0 +1,158 @@
+"""Tests for the to do lists of the replacements."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    CONF_NAME,
+    ENTITY_MATCH_ALL,
+    EVENT_STATE_CHANGED,
+)
+from homeassistant.helpers.entity_component import async_update_entity
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    patch,
+)
+
+from custom_components.replacements.clock import LocalToday
+from custom_components.replacements.const import (
+    BUCKET_SOON,
+    COMPONENT_NAME,
+    CONF_DAYS_INTERVAL,
+    CONF_TODO,
+    DATA_TODAY,
+    DOMAIN,
+)
+from custom_components.replacements.sensor import (
+    ATTR_BUCKET,
+    ATTR_ITEM,
+    ATTR_ITEMS,
+    ATTR_NEW_DATE,
+    ATTR_STOCK,
+    ENTITY_ID_FORMAT,
+    SERVICE_COMPLETE,
+    SERVICE_DATE,
+    SERVICE_REPLACED,
+    SERVICE_STOCK,
+    SERVICE_UNDO,
+)
+
+from .const import MOCK_CONFIG_DAYS
+
+TODO_ID = ENTITY_ID_FORMAT.format("replacements_to_do")
+ITEM_IDS = [ENTITY_ID_FORMAT.format(f"replace_item_{index}") for index in range(2)]
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+async def test_todo_list(hass):
+    """Test the list only changes with the items, and completing replaces them."""
+    test_data = {DOMAIN: []}
+    for index, days in enumerate((2, 30)):
+        test_data[DOMAIN].append(
+            {**MOCK_CONFIG_DAYS, CONF_NAME: f"Item {index}", CONF_DAYS_INTERVAL: days}
+        )
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, title=COMPONENT_NAME, data=test_data, options={CONF_TODO: True}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    today = hass.data[DOMAIN][DATA_TODAY].today
+    assert hass.states.get(TODO_ID).state == "0"
+
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+    with patch.object(LocalToday, "today", today + timedelta(days=1)):
+        for entity_id in ITEM_IDS:
+            await async_update_entity(hass, entity_id)
+        await hass.async_block_till_done()
+
+        # Only the first one is soon, and the list is written once
+        state = hass.states.get(TODO_ID)
+        assert state.state == "1"
+        (item,) = state.attributes[ATTR_ITEMS]
+        assert item[ATTR_ENTITY_ID] == ITEM_IDS[0]
+        assert item[ATTR_BUCKET] == BUCKET_SOON
+        assert [event.data["entity_id"] for event in events].count(TODO_ID) == 1
+
+        # Nothing changes on the next update
+        for entity_id in ITEM_IDS:
+            await async_update_entity(hass, entity_id)
+        await hass.async_block_till_done()
+        assert [event.data["entity_id"] for event in events].count(TODO_ID) == 1
+
+        # Completing the item replaces it, writing its state once
+        events.clear()
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_COMPLETE,
+            {ATTR_ENTITY_ID: TODO_ID, ATTR_ITEM: "Item 0"},
+            blocking=True,
+        )
+        await hass.async_block_till_done()
+
+        assert hass.states.get(TODO_ID).state == "0"
+        assert hass.states.get(ITEM_IDS[0]).state == "2"
+        assert [event.data["entity_id"] for event in events].count(ITEM_IDS[0]) == 1
+
+        # Only listed items can be completed
+        with pytest.raises(ValueError):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_COMPLETE,
+                {ATTR_ENTITY_ID: TODO_ID, ATTR_ITEM: ITEM_IDS[1]},
+                blocking=True,
+            )
+
+    # The replacement is listed again once it is soon
+    with patch.object(LocalToday, "today", today + timedelta(days=2)):
+        await async_update_entity(hass, ITEM_IDS[0])
+        await hass.async_block_till_done()
+    assert hass.states.get(TODO_ID).state == "1"
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_services_with_todo_list(hass):
+    """Test each entity service only applies to its own sensors."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=COMPONENT_NAME,
+        data={DOMAIN: [{**MOCK_CONFIG_DAYS, CONF_NAME: "Item 0"}]},
+        options={CONF_TODO: True},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    today = hass.data[DOMAIN][DATA_TODAY].today
+
+    # The replacement services skip the to do list
+    for service, data in (
+        (SERVICE_STOCK, {ATTR_STOCK: 5}),
+        (SERVICE_REPLACED, {}),
+        (SERVICE_UNDO, {}),
+        (SERVICE_DATE, {ATTR_NEW_DATE: str(today + timedelta(days=1))}),
+    ):
+        await hass.services.async_call(
+            DOMAIN, service, {ATTR_ENTITY_ID: ENTITY_MATCH_ALL, **data}, blocking=True
+        )
+        await hass.async_block_till_done()
+    assert hass.states.get(TODO_ID).state == "1"
+
+    # Completing an item skips the replacements
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_COMPLETE,
+        {ATTR_ENTITY_ID: ENTITY_MATCH_ALL, ATTR_ITEM: "Item 0"},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get(TODO_ID).state == "0"
+    assert hass.states.get(ITEM_IDS[0]).attributes[ATTR_STOCK] == 4
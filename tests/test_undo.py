@@ -0,0 +1,236 @@
+"""Tests for undoing the replace actions."""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+from homeassistant.const import ATTR_DATE, ATTR_ENTITY_ID, CONF_NAME
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry, patch
+
+from custom_components.replacements.adaptive import IntervalStatistics
+from custom_components.replacements.clock import LocalToday
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONF_ADAPTIVE,
+    CONF_DAYS_INTERVAL,
+    CONF_PARENT,
+    CONF_POOL,
+    CONF_USAGE_ENTITY,
+    CONF_USAGE_LIMIT,
+    DATA_POOLS,
+    DATA_TODAY,
+    DOMAIN,
+    UNDO_HISTORY_SIZE,
+)
+from custom_components.replacements.sensor import (
+    ATTR_HISTORY,
+    ATTR_INTERVALS,
+    ATTR_LAST_REPLACED,
+    ATTR_STOCK,
+    ATTR_USAGE,
+    ATTR_USAGE_SINCE,
+    ENTITY_ID_FORMAT,
+    SERVICE_REPLACED,
+    SERVICE_STOCK,
+    SERVICE_UNDO,
+    ReplacementSensorExtraStoredData,
+)
+from custom_components.replacements.undo import ReplaceSnapshot
+
+from .const import MOCK_CONFIG_DAYS
+
+ENTITY_ID = ENTITY_ID_FORMAT.format("replace_test_days_1")
+SOURCE = "sensor.pump_cycles"
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+async def _async_setup(hass, config):
+    """Set up an entry with a single replacement."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, title=COMPONENT_NAME, data={DOMAIN: [config]}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    return config_entry
+
+
+async def test_undo(hass):
+    """Test the last replace actions are undone in reverse order."""
+    await _async_setup(hass, MOCK_CONFIG_DAYS)
+    today = hass.data[DOMAIN][DATA_TODAY].today
+    await hass.services.async_call(
+        DOMAIN, SERVICE_STOCK, {ATTR_ENTITY_ID: ENTITY_ID, ATTR_STOCK: 5}, blocking=True
+    )
+
+    for days in (1, 2):
+        with patch.object(LocalToday, "today", today + timedelta(days=days)):
+            await hass.services.async_call(
+                DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: ENTITY_ID}, blocking=True
+            )
+    state = hass.states.get(ENTITY_ID)
+    assert state.attributes[ATTR_DATE] == str(today + timedelta(days=6))
+    assert state.attributes[ATTR_STOCK] == 3
+
+    for days, stock in ((5, 4), (4, 5)):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_UNDO, {ATTR_ENTITY_ID: ENTITY_ID}, blocking=True
+        )
+        state = hass.states.get(ENTITY_ID)
+        assert state.attributes[ATTR_DATE] == str(today + timedelta(days=days))
+        assert state.attributes[ATTR_STOCK] == stock
+
+    # Nothing left to undo
+    with pytest.raises(ValueError):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_UNDO, {ATTR_ENTITY_ID: ENTITY_ID}, blocking=True
+        )
+
+    # Only the last replace actions are kept
+    for _ in range(UNDO_HISTORY_SIZE + 5):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: ENTITY_ID}, blocking=True
+        )
+    entity = hass.data["entity_components"]["sensor"].get_entity(ENTITY_ID)
+    data = entity.extra_restore_state_data.as_dict()
+    assert len(data[ATTR_HISTORY]) == UNDO_HISTORY_SIZE
+    assert data[ATTR_HISTORY][-1][ATTR_DATE] == str(today + timedelta(days=4))
+    assert data[ATTR_HISTORY][-1][ATTR_STOCK] == 0
+
+
+def test_undo_restore_data():
+    """Test the history is restored, and optional for previously stored data."""
+    history = [
+        ReplaceSnapshot(
+            date(2022, 5, 1).toordinal(),
+            3,
+            IntervalStatistics(1, 30.0, 0.0, 30.0),
+            date(2022, 4, 1),
+            12.5,
+            date(2022, 4, 1),
+            None,
+            ("replace_part",),
+        )
+    ]
+    data = ReplacementSensorExtraStoredData(
+        4, "Days", 2, datetime(2022, 5, 5), history=history
+    ).as_dict()
+    assert ReplacementSensorExtraStoredData.from_dict(data).history == history
+
+    del data[ATTR_HISTORY]
+    assert ReplacementSensorExtraStoredData.from_dict(data).history == []
+
+
+async def test_undo_snapshot(hass):
+    """Test the learned intervals and the usage are restored too."""
+    hass.states.async_set(SOURCE, "100")
+    await _async_setup(
+        hass,
+        {
+            **MOCK_CONFIG_DAYS,
+            CONF_ADAPTIVE: True,
+            CONF_USAGE_ENTITY: SOURCE,
+            CONF_USAGE_LIMIT: 50,
+        },
+    )
+    today = hass.data[DOMAIN][DATA_TODAY].today
+    entity = hass.data["entity_components"]["sensor"].get_entity(ENTITY_ID)
+
+    with patch.object(LocalToday, "today", today + timedelta(days=10)):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: ENTITY_ID}, blocking=True
+        )
+        hass.states.async_set(SOURCE, "120")
+        await hass.async_block_till_done()
+
+    with patch.object(LocalToday, "today", today + timedelta(days=20)):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: ENTITY_ID}, blocking=True
+        )
+        data = entity.extra_restore_state_data.as_dict()
+        assert data[ATTR_INTERVALS]["count"] == 1
+        assert hass.states.get(ENTITY_ID).attributes[ATTR_USAGE] == 0
+
+        await hass.services.async_call(
+            DOMAIN, SERVICE_UNDO, {ATTR_ENTITY_ID: ENTITY_ID}, blocking=True
+        )
+
+    data = entity.extra_restore_state_data.as_dict()
+    assert data[ATTR_INTERVALS]["count"] == 0
+    assert data[ATTR_LAST_REPLACED] == str(today + timedelta(days=10))
+    assert data[ATTR_USAGE_SINCE] == str(today + timedelta(days=10))
+    assert hass.states.get(ENTITY_ID).attributes[ATTR_USAGE] == 20
+
+
+async def test_undo_kit(hass):
+    """Test undoing a kit undoes the parts replaced with it."""
+    kit = {**MOCK_CONFIG_DAYS, CONF_NAME: "Pump Kit", CONF_DAYS_INTERVAL: 10}
+    part = {**kit, CONF_NAME: "Pump Filter", CONF_PARENT: "Pump Kit"}
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, title=COMPONENT_NAME, data={DOMAIN: [kit, part]}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    today = hass.data[DOMAIN][DATA_TODAY].today
+    kit_id = ENTITY_ID_FORMAT.format("replace_pump_kit")
+    part_id = ENTITY_ID_FORMAT.format("replace_pump_filter")
+
+    def dates():
+        return [
+            hass.states.get(entity_id).attributes[ATTR_DATE]
+            for entity_id in (kit_id, part_id)
+        ]
+
+    initial = dates()
+    with patch.object(LocalToday, "today", today + timedelta(days=1)):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: kit_id}, blocking=True
+        )
+        assert dates() == [str(today + timedelta(days=11))] * 2
+
+        await hass.services.async_call(
+            DOMAIN, SERVICE_UNDO, {ATTR_ENTITY_ID: kit_id}, blocking=True
+        )
+        assert dates() == initial
+
+    # A part replaced on its own since is not undone with its kit
+    with patch.object(LocalToday, "today", today + timedelta(days=1)):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: kit_id}, blocking=True
+        )
+    with patch.object(LocalToday, "today", today + timedelta(days=2)):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: part_id}, blocking=True
+        )
+        await hass.services.async_call(
+            DOMAIN, SERVICE_UNDO, {ATTR_ENTITY_ID: kit_id}, blocking=True
+        )
+    assert dates() == [initial[0], str(today + timedelta(days=12))]
+
+
+async def test_undo_pool(hass):
+    """Test undoing a replacement gives its part back to the pool."""
+    await _async_setup(hass, {**MOCK_CONFIG_DAYS, CONF_POOL: "filter"})
+    pools = next(iter(hass.data[DOMAIN][DATA_POOLS].values()))
+    await hass.services.async_call(
+        DOMAIN, SERVICE_STOCK, {ATTR_ENTITY_ID: ENTITY_ID, ATTR_STOCK: 1}, blocking=True
+    )
+
+    # The first replacement takes the last part, the second none
+    for _ in range(2):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: ENTITY_ID}, blocking=True
+        )
+    assert pools.levels["filter"] == 0
+
+    for level in (0, 1):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_UNDO, {ATTR_ENTITY_ID: ENTITY_ID}, blocking=True
+        )
+        assert pools.levels["filter"] == level
@@ -0,0 +1,144 @@
+"""Tests for the usage based replacements."""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+from homeassistant.const import ATTR_ENTITY_ID, CONF_NAME, EVENT_STATE_CHANGED
+from homeassistant.helpers.entity_component import async_update_entity
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    patch,
+)
+
+from custom_components.replacements.clock import LocalToday
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONF_DAYS_INTERVAL,
+    CONF_USAGE_ENTITY,
+    CONF_USAGE_LIMIT,
+    CONF_USAGE_MODE,
+    DATA_TODAY,
+    DOMAIN,
+    USAGE_MODE_CYCLES,
+)
+from custom_components.replacements.sensor import (
+    ATTR_USAGE,
+    ATTR_USAGE_DATE,
+    ATTR_USAGE_REMAINING,
+    ENTITY_ID_FORMAT,
+    SERVICE_REPLACED,
+    ReplacementSensorExtraStoredData,
+)
+
+from .const import MOCK_CONFIG_DAYS
+
+SOURCE = "sensor.pump_hours"
+ENTITY_ID = ENTITY_ID_FORMAT.format("replace_pump_seal")
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+async def setup_usage(hass, **config) -> None:
+    """Set up a replacement following the usage of the source entity."""
+    replacement = {
+        **MOCK_CONFIG_DAYS,
+        CONF_NAME: "Pump Seal",
+        CONF_DAYS_INTERVAL: 365,
+        CONF_USAGE_ENTITY: SOURCE,
+        **config,
+    }
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, title=COMPONENT_NAME, data={DOMAIN: [replacement]}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    await async_update_entity(hass, ENTITY_ID)
+
+
+async def test_usage_total(hass):
+    """Test the usage follows the increase of the source, without state writes."""
+    hass.states.async_set(SOURCE, "100")
+    await setup_usage(hass, **{CONF_USAGE_LIMIT: 50})
+    today = hass.data[DOMAIN][DATA_TODAY].today
+
+    state = hass.states.get(ENTITY_ID)
+    assert state.state == "365"
+    assert state.attributes[ATTR_USAGE] == 0
+    assert state.attributes[ATTR_USAGE_DATE] is None
+
+    # Decreases are resets, and unknown states are ignored
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+    for value in ("110", "105", "120", "unavailable", "130", "130"):
+        hass.states.async_set(SOURCE, value)
+    await hass.async_block_till_done()
+    assert [event.data[ATTR_ENTITY_ID] for event in events] == [SOURCE] * 5
+
+    # The usage is only written with the next update
+    await async_update_entity(hass, ENTITY_ID)
+    state = hass.states.get(ENTITY_ID)
+    assert state.attributes[ATTR_USAGE] == 25
+    assert state.attributes[ATTR_USAGE_REMAINING] == 25
+    assert state.attributes[ATTR_USAGE_DATE] is None
+
+    # The due date is estimated from the average usage per day
+    with patch.object(LocalToday, "today", today + timedelta(days=5)):
+        await async_update_entity(hass, ENTITY_ID)
+        state = hass.states.get(ENTITY_ID)
+        assert state.state == "5"
+        assert state.attributes[ATTR_USAGE_DATE] == str(today + timedelta(days=10))
+
+        # Reaching the limit makes it due today
+        hass.states.async_set(SOURCE, "160")
+        await async_update_entity(hass, ENTITY_ID)
+        state = hass.states.get(ENTITY_ID)
+        assert state.state == "0"
+        assert state.attributes[ATTR_USAGE_REMAINING] == 0
+
+        # The usage starts again after the replacement
+        await hass.services.async_call(
+            DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: ENTITY_ID}, blocking=True
+        )
+        await hass.async_block_till_done()
+        state = hass.states.get(ENTITY_ID)
+        assert state.state == "365"
+        assert state.attributes[ATTR_USAGE] == 0
+
+
+async def test_usage_cycles(hass):
+    """Test the usage counts the times the source turns on."""
+    hass.states.async_set(SOURCE, "off")
+    await setup_usage(
+        hass, **{CONF_USAGE_LIMIT: 10, CONF_USAGE_MODE: USAGE_MODE_CYCLES}
+    )
+
+    for value in ("on", "off", "on", "unavailable", "on"):
+        hass.states.async_set(SOURCE, value)
+    hass.states.async_set(SOURCE, "on", {"power": 5})
+    await async_update_entity(hass, ENTITY_ID)
+
+    state = hass.states.get(ENTITY_ID)
+    assert state.attributes[ATTR_USAGE] == 3
+    assert state.attributes[ATTR_USAGE_REMAINING] == 7
+
+
+def test_usage_restore_data():
+    """Test the usage is restored, and optional for previously stored data."""
+    data = ReplacementSensorExtraStoredData(
+        4, "Days", 2, datetime(2022, 5, 5), 12.5, date(2022, 5, 1)
+    ).as_dict()
+    restored = ReplacementSensorExtraStoredData.from_dict(data)
+    assert restored.usage == 12.5
+    assert restored.usage_since == date(2022, 5, 1)
+
+    del data[ATTR_USAGE]
+    del data["usage_since"]
+    restored = ReplacementSensorExtraStoredData.from_dict(data)
+    assert restored.usage == 0
+    assert restored.usage_since is None
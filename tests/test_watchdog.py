@@ -0,0 +1,183 @@
+"""Tests for the watchdog module."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import callback
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONF_WATCHDOG,
+    CONF_WATCHDOG_THRESHOLD,
+    DATA_WATCHDOG,
+    DOMAIN,
+)
+from custom_components.replacements.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.replacements.sensor import ENTITY_ID_FORMAT, SERVICE_STOCK
+from custom_components.replacements.watchdog import LoopWatchdog, watched
+
+from .const import MOCK_CONFIG_DAYS
+
+THRESHOLD = 0.05
+
+
+@watched
+@callback
+def blocking_callback(hass, seconds: float) -> str:
+    """Block the event loop."""
+    time.sleep(seconds)
+    return "done"
+
+
+@watched
+async def blocking_coroutine(hass, seconds: float) -> str:
+    """Block the event loop in a single step, between two awaits."""
+    await asyncio.sleep(seconds)
+    time.sleep(seconds)
+    await asyncio.sleep(0)
+    return "done"
+
+
+@watched
+@callback
+def nesting_callback(hass, seconds: float) -> str:
+    """Block the event loop, also in a nested call."""
+    time.sleep(seconds)
+    return blocking_callback(hass, seconds)
+
+
+@watched
+async def nesting_coroutine(hass, seconds: float) -> str:
+    """Block the event loop in a nested coroutine, between two awaits."""
+    await asyncio.sleep(0)
+    return await blocking_coroutine(hass, seconds)
+
+
+@watched
+async def failing_coroutine(hass) -> None:
+    """Raise an error after an await."""
+    await asyncio.sleep(0)
+    raise ValueError
+
+
+async def test_watchdog(hass, caplog):
+    """Test only the calls that hold the event loop are counted."""
+    hass.data[DOMAIN] = {}
+
+    # Without the watchdog the calls are not timed
+    assert blocking_callback(hass, 0) == "done"
+
+    watchdog = LoopWatchdog(hass)
+    watchdog.async_add_entry("entry", THRESHOLD)
+    watchdog.async_start()
+    hass.data[DOMAIN][DATA_WATCHDOG] = watchdog
+    caplog.set_level(logging.WARNING)
+
+    # Awaiting does not hold the event loop
+    assert await blocking_coroutine(hass, 0.01) == "done"
+    await asyncio.wait_for(blocking_coroutine(hass, 0), 1)
+    assert watchdog.counts == {}
+
+    assert blocking_callback(hass, THRESHOLD * 3) == "done"
+    assert await blocking_coroutine(hass, THRESHOLD * 3) == "done"
+    with pytest.raises(ValueError):
+        await failing_coroutine(hass)
+
+    # Cancellation is forwarded to the watched coroutine
+    task = hass.async_create_task(blocking_coroutine(hass, 10))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert watchdog.counts == {"blocking_callback": 1, "blocking_coroutine": 1}
+    assert watchdog.as_dict()["total"] == 2
+
+    # Nested calls are only timed as part of the outermost call
+    watchdog.counts.clear()
+    assert nesting_callback(hass, THRESHOLD * 2) == "done"
+    assert await nesting_coroutine(hass, THRESHOLD * 2) == "done"
+    assert watchdog.counts == {"nesting_callback": 1, "nesting_coroutine": 1}
+    assert watchdog.slowest["nesting_callback"] >= THRESHOLD * 4
+
+    # The stack of the event loop is sampled while it is blocked
+    assert "blocking_callback blocked the event loop" in caplog.text
+    assert "sampled stack" in caplog.text
+    assert "time.sleep(seconds)" in caplog.text
+
+    # The sampling thread is joined in the executor
+    thread = watchdog._thread
+    watchdog.async_stop()
+    watchdog.async_stop()
+    await hass.async_block_till_done()
+    assert not thread.is_alive()
+
+
+async def test_watchdog_diagnostics(hass):
+    """Test the watchdog is enabled in the options, and counted in diagnostics."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=COMPONENT_NAME,
+        data={DOMAIN: [MOCK_CONFIG_DAYS]},
+        options={CONF_WATCHDOG: True, CONF_WATCHDOG_THRESHOLD: 1000},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    watchdog = hass.data[DOMAIN][DATA_WATCHDOG]
+    assert watchdog.threshold == 1
+
+    # The entity services are watched
+    watchdog.threshold = 0
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_STOCK,
+        {ATTR_ENTITY_ID: ENTITY_ID_FORMAT.format("replace_test_days_1"), "stock": 4},
+        blocking=True,
+    )
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+    assert diagnostics["replacements"] == 1
+    assert diagnostics["options"][CONF_WATCHDOG] is True
+    assert diagnostics["watchdog"]["counts"]["Replacement.async_handle_renew_stock"]
+
+    # The watchdog stops with the entry
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert DATA_WATCHDOG not in hass.data[DOMAIN]
+
+
+async def test_watchdog_entries(hass):
+    """Test the watchdog is shared by the entries, with the lowest threshold."""
+    config_entries = [
+        MockConfigEntry(
+            domain=DOMAIN,
+            title=f"{COMPONENT_NAME} {threshold}",
+            data={DOMAIN: []},
+            options={CONF_WATCHDOG: True, CONF_WATCHDOG_THRESHOLD: threshold},
+        )
+        for threshold in (1000, 200)
+    ]
+    for config_entry in config_entries:
+        config_entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    watchdog = hass.data[DOMAIN][DATA_WATCHDOG]
+    assert watchdog.threshold == 0.2
+
+    # Unloading an entry keeps the watchdog for the other one
+    assert await hass.config_entries.async_unload(config_entries[1].entry_id)
+    assert hass.data[DOMAIN][DATA_WATCHDOG] is watchdog
+    assert watchdog.threshold == 1
+
+    assert await hass.config_entries.async_unload(config_entries[0].entry_id)
+    await hass.async_block_till_done()
+    assert DATA_WATCHDOG not in hass.data[DOMAIN]
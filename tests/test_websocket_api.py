@@ -0,0 +1,149 @@
+"""Tests for the websocket_api module."""
+from __future__ import annotations
+
+from homeassistant.const import ATTR_ENTITY_ID, CONF_NAME
+from homeassistant.helpers.entity_component import async_update_entity
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.replacements.const import (
+    BUCKET_NORMAL,
+    COMPONENT_NAME,
+    CONF_DAYS_INTERVAL,
+    DOMAIN,
+)
+from custom_components.replacements.sensor import (
+    ATTR_STOCK,
+    ENTITY_ID_FORMAT,
+    SERVICE_STOCK,
+)
+from custom_components.replacements.websocket_api import WS_TYPE_LIST, WS_TYPE_SUBSCRIBE
+
+from .const import MOCK_CONFIG_DAYS
+
+FLEET_SIZE = 5
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+async def async_setup_fleet(hass) -> list[str]:
+    """Set up a few replacements with increasing intervals."""
+    test_data = {DOMAIN: []}
+    for index in range(FLEET_SIZE):
+        test_data[DOMAIN].append(
+            {
+                **MOCK_CONFIG_DAYS,
+                CONF_NAME: f"Item {index}",
+                CONF_DAYS_INTERVAL: index + 1,
+            }
+        )
+
+    config_entry = MockConfigEntry(domain=DOMAIN, title=COMPONENT_NAME, data=test_data)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    # Calculate the days remaining, as done by the first poll
+    entity_ids = [
+        ENTITY_ID_FORMAT.format(f"replace_item_{index}") for index in range(FLEET_SIZE)
+    ]
+    for entity_id in entity_ids:
+        await async_update_entity(hass, entity_id)
+    await hass.async_block_till_done()
+
+    return entity_ids
+
+
+async def test_list(hass, hass_ws_client):
+    """Test listing pages of sorted replacements."""
+    entity_ids = await async_setup_fleet(hass)
+    client = await hass_ws_client(hass)
+
+    await client.send_json(
+        {"id": 1, "type": WS_TYPE_LIST, "descending": True, "offset": 1, "limit": 2}
+    )
+    msg = await client.receive_json()
+    assert msg["success"]
+    result = msg["result"]
+    assert result["total"] == FLEET_SIZE
+    assert result["columns"][0] == "entity_id"
+    assert [row[0] for row in result["rows"]] == [entity_ids[3], entity_ids[2]]
+
+    # Filtered by stock after renewing the stock of one replacement
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_STOCK,
+        {ATTR_ENTITY_ID: entity_ids[0], ATTR_STOCK: 3},
+        blocking=True,
+    )
+    await client.send_json(
+        {"id": 2, "type": WS_TYPE_LIST, "sort_by": "stock", "max_stock": 0}
+    )
+    msg = await client.receive_json()
+    assert msg["result"]["total"] == FLEET_SIZE - 1
+    assert entity_ids[0] not in [row[0] for row in msg["result"]["rows"]]
+
+    # Unknown sort fields are rejected
+    await client.send_json({"id": 3, "type": WS_TYPE_LIST, "sort_by": "icon"})
+    msg = await client.receive_json()
+    assert not msg["success"]
+
+
+async def test_subscribe(hass, hass_ws_client):
+    """Test subscribing to the changes of the replacements."""
+    entity_ids = await async_setup_fleet(hass)
+    client = await hass_ws_client(hass)
+
+    await client.send_json(
+        {"id": 1, "type": WS_TYPE_SUBSCRIBE, "bucket": [BUCKET_NORMAL], "max_stock": 5}
+    )
+    msg = await client.receive_json()
+    assert msg["success"]
+
+    # Initial snapshot of the matching replacements, the first one is due soon
+    msg = await client.receive_json()
+    assert msg["type"] == "event"
+    assert [row[0] for row in msg["event"]["rows"]] == entity_ids[1:]
+
+    # Only the changed replacement is sent
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_STOCK,
+        {ATTR_ENTITY_ID: entity_ids[1], ATTR_STOCK: 2},
+        blocking=True,
+    )
+    msg = await client.receive_json()
+    assert [row[0] for row in msg["event"]["rows"]] == [entity_ids[1]]
+    assert msg["event"]["removed"] == []
+
+    # A replacement that stops matching the filters is removed
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_STOCK,
+        {ATTR_ENTITY_ID: entity_ids[1], ATTR_STOCK: 10},
+        blocking=True,
+    )
+    msg = await client.receive_json()
+    assert msg["event"] == {"rows": [], "removed": [entity_ids[1]]}
+
+    # Rows that were never sent, or already removed, are not removed again
+    for entity_id in entity_ids[:2]:
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_STOCK,
+            {ATTR_ENTITY_ID: entity_id, ATTR_STOCK: 10},
+            blocking=True,
+        )
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_STOCK,
+        {ATTR_ENTITY_ID: entity_ids[2], ATTR_STOCK: 1},
+        blocking=True,
+    )
+    msg = await client.receive_json()
+    assert msg["event"]["removed"] == []
+    assert [row[0] for row in msg["event"]["rows"]] == [entity_ids[2]]
@@ -0,0 +1,80 @@
+"""Tests for the workdays module."""
+from __future__ import annotations
+
+from datetime import date
+
+from homeassistant.const import ATTR_DATE, ATTR_ENTITY_ID
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry, patch
+
+from custom_components.replacements.clock import LocalToday
+from custom_components.replacements.const import (
+    COMPONENT_NAME,
+    CONF_DAYS_INTERVAL,
+    CONF_HOLIDAYS,
+    CONF_SKIP_WEEKENDS,
+    DOMAIN,
+)
+from custom_components.replacements.sensor import ENTITY_ID_FORMAT, SERVICE_REPLACED
+from custom_components.replacements.workdays import WorkingCalendar, parse_holidays
+
+from .const import MOCK_CONFIG_DAYS
+
+
+@pytest.fixture(autouse=True)
+def set_utc(hass):
+    """Set timezone to UTC."""
+    hass.config.set_time_zone("UTC")
+
+
+def test_parse_holidays():
+    """Test the holidays are dates or days of every year."""
+    assert parse_holidays("2023-04-07, 12-25,, 02-29") == (
+        {date(2023, 4, 7)},
+        {(12, 25), (2, 29)},
+    )
+    for holidays in ("2023-4-7", "12-32", "christmas", "1-2-3-4"):
+        with pytest.raises(ValueError):
+            parse_holidays(holidays)
+
+
+def test_next_working_day():
+    """Test the weekends and holidays are skipped, also across years."""
+    calendar = WorkingCalendar(True, "12-25, 12-26, 01-01, 2021-01-04")
+    assert calendar.enabled
+    assert not WorkingCalendar(False).enabled
+
+    # Wednesday stays, Saturday moves to Monday
+    assert calendar.next_working_day(date(2023, 3, 1)) == date(2023, 3, 1)
+    assert calendar.next_working_day(date(2023, 3, 4)) == date(2023, 3, 6)
+
+    # From Christmas 2020, on a Friday, over the weekend, New Year's Day and
+    #  the Monday after it
+    assert calendar.next_working_day(date(2020, 12, 25)) == date(2020, 12, 28)
+    assert calendar.next_working_day(date(2021, 1, 1)) == date(2021, 1, 5)
+    assert calendar.next_working_day(date(2020, 12, 31)) == date(2020, 12, 31)
+
+
+async def test_replacement_on_working_day(hass):
+    """Test a new date on a weekend or a holiday is moved forward."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=COMPONENT_NAME,
+        data={DOMAIN: [{**MOCK_CONFIG_DAYS, CONF_DAYS_INTERVAL: 1}]},
+        options={CONF_SKIP_WEEKENDS: True, CONF_HOLIDAYS: "2023-03-06"},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    entity_id = ENTITY_ID_FORMAT.format("replace_test_days_1")
+
+    # Replaced on Friday, the next day is Saturday, then Monday is a holiday
+    with patch.object(LocalToday, "today", date(2023, 3, 3)):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_REPLACED, {ATTR_ENTITY_ID: entity_id}, blocking=True
+        )
+        await hass.async_block_till_done()
+
+    state = hass.states.get(entity_id)
+    assert state.attributes[ATTR_DATE] == "2023-03-07"
+    assert state.state == "4"